@@ -0,0 +1,113 @@
+"""
+WebSocket 消息解码微基准测试。
+
+用与 OKX 推送结构相同的合成消息（books 快照 / 增量、books5、orders、account、positions、订阅确认、
+不关心的频道），对比原先 stdlib json.loads 后再判断频道的路径，与 WsMessageUtil.decode_message
+在各个已安装 JSON 后端下的耗时。
+
+Usage:
+    python -m benchmarks.bench_json_decode [--repeat 2000]
+"""
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+
+from okx_market_maker.utils import WsMessageUtil
+from okx_market_maker.market_data_service.WssMarketDataService import ORDER_BOOK_CHANNELS
+from okx_market_maker.order_management_service.WssOrderManagementService import ORDER_CHANNELS
+from okx_market_maker.position_management_service.WssPositionManagementService import POSITION_CHANNELS
+
+
+def _levels(rng: random.Random, start: float, step: float, count: int) -> List[List[str]]:
+    return [[f"{start + i * step:.1f}", str(rng.randint(1, 500)), "0", str(rng.randint(1, 20))]
+            for i in range(count)]
+
+
+def generate_messages(seed: int = 7) -> Dict[str, tuple]:
+    """
+    生成各类代表性消息，返回 名称 -> (原始字符串, 该消息所属服务关心的频道)。
+    """
+    rng = random.Random(seed)
+    book_arg = {"channel": "books", "instId": "BTC-USDT-SWAP"}
+    shapes = {
+        "books-snapshot": ({"arg": book_arg, "action": "snapshot", "data": [{
+            "asks": _levels(rng, 30000.1, 0.1, 400), "bids": _levels(rng, 30000.0, -0.1, 400),
+            "ts": "1597026383085", "checksum": -855196043, "prevSeqId": -1, "seqId": 123456}]},
+            ORDER_BOOK_CHANNELS),
+        "books-update": ({"arg": book_arg, "action": "update", "data": [{
+            "asks": _levels(rng, 30000.1, 0.3, 20), "bids": _levels(rng, 30000.0, -0.3, 20),
+            "ts": "1597026383085", "checksum": -855196043, "prevSeqId": 123456, "seqId": 123457}]},
+            ORDER_BOOK_CHANNELS),
+        "books5": ({"arg": {"channel": "books5", "instId": "BTC-USDT-SWAP"}, "data": [{
+            "asks": _levels(rng, 30000.1, 0.1, 5), "bids": _levels(rng, 30000.0, -0.1, 5),
+            "instId": "BTC-USDT-SWAP", "ts": "1597026383085", "seqId": 123457}]}, ORDER_BOOK_CHANNELS),
+        "orders": ({"arg": {"channel": "orders", "instType": "ANY", "uid": "77982378738415879"}, "data": [{
+            "accFillSz": "0", "avgPx": "", "cTime": "1597026383085", "ccy": "", "clOrdId": "order1",
+            "fee": "0", "feeCcy": "USDT", "fillPx": "", "fillSz": "0", "fillTime": "", "instId": "BTC-USDT-SWAP",
+            "instType": "SWAP", "lever": "3", "ordId": "312269865356374016", "ordType": "post_only",
+            "pnl": "0", "posSide": "net", "px": "30000.1", "rebate": "0", "rebateCcy": "USDT", "side": "buy",
+            "state": "live", "sz": "1", "tag": "", "tdMode": "cross", "uTime": "1597026383085"}]},
+            ORDER_CHANNELS),
+        "account": ({"arg": {"channel": "account", "uid": "77982378738415879"}, "data": [{
+            "uTime": "1597026383085", "totalEq": "41624.32", "isoEq": "0", "adjEq": "41624.32",
+            "ordFroz": "0", "imr": "0", "mmr": "0", "notionalUsd": "", "mgnRatio": "",
+            "details": [{"ccy": ccy, "eq": "1000", "cashBal": "1000", "availBal": "1000", "frozenBal": "0",
+                         "ordFrozen": "0", "eqUsd": "1000", "upl": "0", "uTime": "1597026383085"}
+                        for ccy in ("USDT", "BTC", "ETH", "USDC")]}]}, POSITION_CHANNELS),
+        "positions": ({"arg": {"channel": "positions", "instType": "ANY", "uid": "77982378738415879"}, "data": [{
+            "instId": inst_id, "instType": "SWAP", "mgnMode": "cross", "posSide": "net", "pos": "10",
+            "avgPx": "30000", "markPx": "30001", "upl": "0.1", "lever": "3", "notionalUsd": "3000",
+            "uTime": "1597026383085"} for inst_id in ("BTC-USDT-SWAP", "ETH-USDT-SWAP")]}, POSITION_CHANNELS),
+        "subscribe-ack": ({"event": "subscribe", "arg": book_arg, "connId": "a4d3ae55"}, ORDER_BOOK_CHANNELS),
+        "ignored-channel": ({"arg": {"channel": "tickers", "instId": "BTC-USDT-SWAP"}, "data": [{
+            "instId": "BTC-USDT-SWAP", "last": "30000.1", "askPx": "30000.2", "bidPx": "30000.1",
+            "ts": "1597026383085"}]}, ORDER_BOOK_CHANNELS),
+    }
+    return {name: (json.dumps(message, separators=(",", ":")), channels)
+            for name, (message, channels) in shapes.items()}
+
+
+def decode_stdlib(raw: str, channels) -> Dict:
+    """
+    原先的解码路径：先完整解码，再判断 event 和频道。
+    """
+    message = json.loads(raw)
+    arg = message.get("arg")
+    if not arg or not arg.get("channel") or message.get("event"):
+        return None
+    return message if arg.get("channel") in channels else None
+
+
+def time_decode(decode, raw: str, channels, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        decode(raw, channels)
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    messages = generate_messages()
+    backends = []
+    for name in ("json", "orjson", "msgspec"):
+        if WsMessageUtil.set_json_backend(name) == name:
+            backends.append(name)
+    print(f"{'message':>16} {'bytes':>7} {'stdlib-legacy':>14} " + " ".join(f"{b:>10}" for b in backends))
+    for message_name, (raw, channels) in messages.items():
+        row = [time_decode(decode_stdlib, raw, channels, args.repeat)]
+        for backend in backends:
+            WsMessageUtil.set_json_backend(backend)
+            assert WsMessageUtil.decode_message(raw, channels) == decode_stdlib(raw, channels)
+            row.append(time_decode(WsMessageUtil.decode_message, raw, channels, args.repeat))
+        print(f"{message_name:>16} {len(raw):>7} " + f"{row[0] * 1e6:>11.2f} us "
+              + " ".join(f"{t * 1e6:>7.2f} us" for t in row[1:]))
+    WsMessageUtil.set_json_backend("auto")
+
+
+if __name__ == "__main__":
+    main()
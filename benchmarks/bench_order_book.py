@@ -0,0 +1,190 @@
+"""
+OrderBook 增量更新微基准测试。
+
+用与 OKX `books` 频道相同结构的合成快照 + 增量消息流（400 档、每条 update 携带数十个增量），
+对比有序价格索引（bisect）实现与原先逐档线性扫描实现的耗时，并校验两者最终盘口一致；
+另外对比从解码后的 [px, sz, _, cnt] 列表到订单簿的完整写入路径：逐档构造 OrderBookLevel 与直接写入原始列表。
+
+Usage:
+    python -m benchmarks.bench_order_book [--levels 400] [--messages 5000] [--deltas 40]
+"""
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from okx_market_maker.market_data_service.model.OrderBook import OrderBook, OrderBookLevel
+
+
+class ListScanOrderBook(OrderBook):
+    """
+    原先的线性扫描实现（档位保存为 OrderBookLevel 对象），仅用于基准对比。
+    """
+    def set_bids_on_snapshot(self, order_book_level_list: List[OrderBookLevel]) -> None:
+        self._bids = sorted(order_book_level_list, reverse=True)
+
+    def set_asks_on_snapshot(self, order_book_level_list: List[OrderBookLevel]) -> None:
+        self._asks = sorted(order_book_level_list, reverse=False)
+
+    def set_bids_on_update(self, order_book_level: OrderBookLevel) -> None:
+        if not self._bids or self._bids[-1] > order_book_level:
+            self._bids.append(order_book_level)
+        else:
+            for i in range(len(self._bids)):
+                if order_book_level > self._bids[i]:
+                    self._bids.insert(i, order_book_level)
+                    break
+                elif order_book_level == self._bids[i]:
+                    if order_book_level.quantity == 0:
+                        self._bids.pop(i)
+                    else:
+                        self._bids[i] = order_book_level
+                    break
+
+    def set_asks_on_update(self, order_book_level: OrderBookLevel) -> None:
+        if not self._asks or self._asks[-1] < order_book_level:
+            self._asks.append(order_book_level)
+        else:
+            for i in range(len(self._asks)):
+                if order_book_level < self._asks[i]:
+                    self._asks.insert(i, order_book_level)
+                    break
+                elif order_book_level == self._asks[i]:
+                    if order_book_level.quantity == 0:
+                        self._asks.pop(i)
+                    else:
+                        self._asks[i] = order_book_level
+                    break
+
+
+def _price_string(ticks: int) -> str:
+    return f"{ticks / 10:.1f}".rstrip("0").rstrip(".")
+
+
+def generate_messages(levels: int, messages: int, deltas: int, seed: int = 7) -> List[Dict]:
+    """
+    生成一条快照及若干 update 消息。增量集中在盘口附近，包含改量、新增档位与删档（数量 "0"），
+    删档只针对当前存在的档位，与交易所行为一致。
+    """
+    rng = random.Random(seed)
+    mid = 300000  # 30000.0, tick 0.1
+    bids = {mid - i: rng.randint(1, 500) for i in range(1, levels + 1)}
+    asks = {mid + i: rng.randint(1, 500) for i in range(1, levels + 1)}
+
+    def _level(ticks: int, qty: int) -> List[str]:
+        return [_price_string(ticks), str(qty), "0", str(rng.randint(1, 20))]
+
+    result = [{
+        "arg": {"channel": "books", "instId": "BTC-USDT-SWAP"},
+        "action": "snapshot",
+        "data": [{"bids": [_level(p, q) for p, q in sorted(bids.items(), reverse=True)],
+                  "asks": [_level(p, q) for p, q in sorted(asks.items())]}],
+    }]
+    for _ in range(messages):
+        message_bids, message_asks = [], []
+        for _ in range(deltas):
+            side, book, sign = (bids, message_bids, -1) if rng.random() < 0.5 else (asks, message_asks, 1)
+            distance = int(rng.expovariate(1 / 20)) + 1
+            ticks = mid + sign * distance
+            roll = rng.random()
+            if ticks in side and roll < 0.3 and len(side) > levels // 2:
+                del side[ticks]
+                book.append([_price_string(ticks), "0", "0", "0"])
+            else:
+                side[ticks] = rng.randint(1, 500)
+                book.append(_level(ticks, side[ticks]))
+        result.append({
+            "arg": {"channel": "books", "instId": "BTC-USDT-SWAP"},
+            "action": "update",
+            "data": [{"bids": message_bids, "asks": message_asks}],
+        })
+    return result
+
+
+def _to_level(level_info: List[str]) -> OrderBookLevel:
+    return OrderBookLevel(price=float(level_info[0]), quantity=float(level_info[1]),
+                          order_count=int(level_info[3]), price_string=level_info[0],
+                          quantity_string=level_info[1], order_count_string=level_info[3])
+
+
+def replay(order_book: OrderBook, messages: List[Dict]) -> float:
+    """
+    将消息流灌入订单簿，返回耗时（秒）。消息中的档位预先转换为 OrderBookLevel，只计入订单簿本身的开销。
+    """
+    snapshot = messages[0]["data"][0]
+    order_book.set_bids_on_snapshot([_to_level(level) for level in snapshot["bids"]])
+    order_book.set_asks_on_snapshot([_to_level(level) for level in snapshot["asks"]])
+    updates = [([_to_level(level) for level in m["data"][0]["bids"]],
+                [_to_level(level) for level in m["data"][0]["asks"]]) for m in messages[1:]]
+    start = time.perf_counter()
+    for bid_levels, ask_levels in updates:
+        for level in bid_levels:
+            order_book.set_bids_on_update(level)
+        for level in ask_levels:
+            order_book.set_asks_on_update(level)
+    return time.perf_counter() - start
+
+
+def ingest_with_levels(order_book: OrderBook, messages: List[Dict]) -> float:
+    """
+    原先的写入路径：每条消息的每个档位构造 OrderBookLevel 后逐档更新，返回耗时（秒）。
+    """
+    start = time.perf_counter()
+    for message in messages:
+        data = message["data"][0]
+        if message["action"] == "snapshot":
+            order_book.set_bids_on_snapshot([_to_level(level) for level in data["bids"]])
+            order_book.set_asks_on_snapshot([_to_level(level) for level in data["asks"]])
+            continue
+        for level in data["bids"]:
+            order_book.set_bids_on_update(_to_level(level))
+        for level in data["asks"]:
+            order_book.set_asks_on_update(_to_level(level))
+    return time.perf_counter() - start
+
+
+def ingest_raw(order_book: OrderBook, messages: List[Dict]) -> float:
+    """
+    直接写入路径：解码后的档位列表原样写入订单簿，返回耗时（秒）。
+    """
+    start = time.perf_counter()
+    for message in messages:
+        data = message["data"][0]
+        if message["action"] == "snapshot":
+            order_book.apply_bids_snapshot(data["bids"])
+            order_book.apply_asks_snapshot(data["asks"])
+            continue
+        order_book.apply_bids_update(data["bids"])
+        order_book.apply_asks_update(data["asks"])
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, default=400)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--deltas", type=int, default=40)
+    args = parser.parse_args()
+
+    messages = generate_messages(args.levels, args.messages, args.deltas)
+    total_deltas = sum(len(m["data"][0]["bids"]) + len(m["data"][0]["asks"]) for m in messages[1:])
+    results = {}
+    for name, book in [("list-scan", ListScanOrderBook("BTC-USDT-SWAP")),
+                       ("bisect-index", OrderBook("BTC-USDT-SWAP"))]:
+        elapsed = replay(book, messages)
+        results[name] = (elapsed, book)
+        print(f"{name:>12}: {elapsed * 1000:8.1f} ms total, {elapsed / total_deltas * 1e9:8.0f} ns/delta")
+    reference, candidate = results["list-scan"][1], results["bisect-index"][1]
+    consistent = [level.price_string for level in reference._bids] == [level[0] for level in candidate._bids] \
+        and [level.price_string for level in reference._asks] == [level[0] for level in candidate._asks]
+    print(f"books consistent: {consistent}, speedup: {results['list-scan'][0] / results['bisect-index'][0]:.1f}x")
+
+    print("full ingest from decoded level lists:")
+    legacy = ingest_with_levels(ListScanOrderBook("BTC-USDT-SWAP"), messages)
+    raw = ingest_raw(OrderBook("BTC-USDT-SWAP"), messages)
+    print(f"{'levels+scan':>12}: {legacy * 1000:8.1f} ms total, {legacy / total_deltas * 1e9:8.0f} ns/delta")
+    print(f"{'raw+bisect':>12}: {raw * 1000:8.1f} ms total, {raw / total_deltas * 1e9:8.0f} ns/delta")
+
+
+if __name__ == "__main__":
+    main()
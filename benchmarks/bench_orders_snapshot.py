@@ -0,0 +1,58 @@
+"""
+订单缓存读取微基准测试。
+
+策略每次决策读取订单缓存（BaseStrategy.get_orders）。对比原先 deepcopy 整个 Orders 与写时复制快照
+Orders.snapshot 在不同缓存大小下每次迭代的耗时；每次迭代先应用一条 orders 频道推送，使快照需要复制一次索引字典。
+
+Usage:
+    python -m benchmarks.bench_orders_snapshot [--sizes 100 1000 10000 50000] [--iterations 50]
+"""
+import argparse
+import time
+from copy import deepcopy
+
+from okx_market_maker.order_management_service.model.Order import Orders
+
+
+def order_json(order_id: int, state: str = "live") -> dict:
+    return {"accFillSz": "0", "amendResult": "", "avgPx": "0", "cTime": "1695190491421", "category": "normal",
+            "ccy": "", "clOrdId": f"c{order_id}", "execType": "", "fee": "0", "feeCcy": "USDT", "fillFee": "0",
+            "fillFeeCcy": "", "fillNotionalUsd": "", "fillPx": "", "fillSz": "0", "fillTime": "",
+            "instId": "BTC-USDT-SWAP", "instType": "SWAP", "lever": "3", "notionalUsd": "30", "ordId": str(order_id),
+            "ordType": "post_only", "pnl": "0", "posSide": "net", "px": "30000", "rebate": "0", "rebateCcy": "USDT",
+            "reduceOnly": "false", "reqId": "", "side": "buy", "state": state, "sz": "1", "tag": "",
+            "tradeId": "", "uTime": "1695190491421"}
+
+
+def build_orders(size: int) -> Orders:
+    orders = Orders(max_orders=size * 2)
+    orders.update_from_json({"data": [order_json(i) for i in range(size)]})
+    return orders
+
+
+def time_iterations(orders: Orders, read, iterations: int) -> float:
+    push = {"data": [order_json(0, "partially_filled")]}
+    start = time.perf_counter()
+    for _ in range(iterations):
+        orders.update_from_json(push)
+        view = read(orders)
+        view.get_order_by_client_order_id("c0")
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'orders':>8} {'deepcopy':>12} {'snapshot':>12} {'speedup':>8}")
+    for size in args.sizes:
+        orders = build_orders(size)
+        deep = time_iterations(orders, deepcopy, max(args.iterations // max(size // 1000, 1), 3))
+        snapshot = time_iterations(orders, Orders.snapshot, args.iterations)
+        print(f"{size:>8} {deep * 1e3:>10.3f}ms {snapshot * 1e3:>10.3f}ms {deep / snapshot:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
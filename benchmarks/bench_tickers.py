@@ -0,0 +1,89 @@
+"""
+Tickers 刷新与估值微基准测试。
+
+用与 OKX REST `market/tickers` 响应结构相同的合成数据（约 1000 个 SPOT 交易对，每次刷新只有一部分 ts 变化），
+对比逐 Ticker 对象解析的 Tickers 与 NumPy 列式存储的 ColumnarTickers 在批量刷新和多币种 USDT 估值上的耗时，
+并校验两者的估值结果一致。
+
+Usage:
+    python -m benchmarks.bench_tickers [--instruments 1000] [--refreshes 200] [--changed 0.3]
+"""
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from okx_market_maker.market_data_service.model.ColumnarTickers import ColumnarTickers
+from okx_market_maker.market_data_service.model.Tickers import Tickers, BRIDGE_QUOTE_CCY_LIST
+
+
+def generate_universe(instruments: int, rng: random.Random) -> List[Dict]:
+    quotes = ["USDT"] * 3 + BRIDGE_QUOTE_CCY_LIST[:3]
+    rows = [{"instType": "SPOT", "instId": f"{quote}-USDT", "px": 1.0} for quote in BRIDGE_QUOTE_CCY_LIST]
+    for i in range(instruments - len(rows)):
+        rows.append({"instType": "SPOT", "instId": f"C{i}-{quotes[i % len(quotes)]}", "px": rng.uniform(0.01, 500)})
+    return rows
+
+
+def generate_refreshes(universe: List[Dict], refreshes: int, changed: float, seed: int = 7) -> List[Dict]:
+    """
+    生成 refreshes 次完整的 tickers 响应，每次约 changed 比例的交易对 ts 与价格发生变化。
+    """
+    rng = random.Random(seed)
+    ts = {row["instId"]: 1597026383085 for row in universe}
+    responses = []
+    for _ in range(refreshes):
+        data = []
+        for row in universe:
+            if rng.random() < changed:
+                row["px"] *= 1 + rng.uniform(-0.001, 0.001)
+                ts[row["instId"]] += rng.randint(1, 2000)
+            px = row["px"]
+            data.append({"instType": row["instType"], "instId": row["instId"], "last": f"{px:.6g}",
+                         "lastSz": "1.5", "askPx": f"{px * 1.0005:.6g}", "askSz": "120", "bidPx": f"{px * 0.9995:.6g}",
+                         "bidSz": "80", "open24h": f"{px:.6g}", "high24h": f"{px * 1.02:.6g}",
+                         "low24h": f"{px * 0.98:.6g}", "volCcy24h": "1234567.8", "vol24h": "4567.1",
+                         "sodUtc0": f"{px:.6g}", "sodUtc8": f"{px:.6g}", "ts": str(ts[row["instId"]])})
+        responses.append({"code": "0", "msg": "", "data": data})
+    return responses
+
+
+def time_refresh(tickers, responses: List[Dict]) -> float:
+    start = time.perf_counter()
+    for json_response in responses:
+        tickers.update_from_json(json_response)
+    return (time.perf_counter() - start) / len(responses)
+
+
+def time_valuation(tickers, ccy_list: List[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        tickers.get_usdt_prices_by_ccy(ccy_list)
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instruments", type=int, default=1000)
+    parser.add_argument("--refreshes", type=int, default=200)
+    parser.add_argument("--changed", type=float, default=0.3, help="fraction of rows whose ts changes per refresh")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    universe = generate_universe(args.instruments, random.Random(1))
+    responses = generate_refreshes(universe, args.refreshes, args.changed)
+    ccy_list = sorted({row["instId"].split("-")[0] for row in universe}) + ["USDT", "MISSING"]
+
+    print(f"{'backend':>10} {'refresh':>12} {'valuation':>12}")
+    results = {}
+    for name, tickers in (("object", Tickers()), ("columnar", ColumnarTickers())):
+        refresh = time_refresh(tickers, responses)
+        valuation = time_valuation(tickers, ccy_list, args.repeat)
+        results[name] = tickers.get_usdt_prices_by_ccy(ccy_list)
+        print(f"{name:>10} {refresh * 1e3:>9.3f} ms {valuation * 1e6:>9.1f} us")
+    for ccy, price in results["object"].items():
+        assert abs(results["columnar"][ccy] - price) <= 1e-9 * max(abs(price), 1), ccy
+
+
+if __name__ == "__main__":
+    main()
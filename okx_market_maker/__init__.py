@@ -11,3 +11,8 @@ positions_container = []
 
 # oms
 orders_container = []
+# order change feeds, each a deque of OrderChange appended by on_orders_update and drained by its consumer
+order_change_feeds = []
+
+# state change listeners, called as listener(channel, key) after WebSocket data is applied
+state_change_listeners = []
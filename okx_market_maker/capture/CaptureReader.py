@@ -0,0 +1,121 @@
+import glob
+import mmap
+import os
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Iterator, List, NamedTuple, Optional, Collection
+
+from okx_market_maker.capture.MessageRecorder import CAPTURE_MAGIC, SEGMENT_HEADER, RECORD_HEADER, INDEX_ENTRY, \
+    SEGMENT_SUFFIX, INDEX_SUFFIX
+
+
+class CaptureRecord(NamedTuple):
+    ts_ns: int
+    source: int
+    payload: bytes
+
+
+@dataclass
+class CaptureSegment:
+    path: str
+    wall_ns: int = 0
+    monotonic_ns: int = 0
+    index_ts: List[int] = field(default_factory=list)
+    index_offsets: List[int] = field(default_factory=list)
+
+    @classmethod
+    def init_from_path(cls, path: str):
+        segment = CaptureSegment(path=path)
+        with open(path, "rb") as f:
+            magic, segment.wall_ns, segment.monotonic_ns = SEGMENT_HEADER.unpack(f.read(SEGMENT_HEADER.size))
+        if magic != CAPTURE_MAGIC:
+            raise ValueError(f"{path} is not a capture segment.")
+        index_path = path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as f:
+                for ts_ns, offset in INDEX_ENTRY.iter_unpack(f.read()):
+                    segment.index_ts.append(ts_ns)
+                    segment.index_offsets.append(offset)
+        return segment
+
+    def first_ts(self) -> Optional[int]:
+        return self.index_ts[0] if self.index_ts else None
+
+    def to_wall_ns(self, ts_ns: int) -> int:
+        """
+        将记录的 monotonic 接收时间换算为 wall clock 时间。
+        """
+        return self.wall_ns + ts_ns - self.monotonic_ns
+
+    def read(self, start_ns: int = None, end_ns: int = None) -> Iterator[CaptureRecord]:
+        """
+        顺序读取段内记录；指定 start_ns 时通过稀疏索引定位起点，不从头扫描。
+        """
+        offset = SEGMENT_HEADER.size
+        if start_ns is not None and self.index_ts:
+            i = bisect_right(self.index_ts, start_ns) - 1
+            if i >= 0:
+                offset = self.index_offsets[i]
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= offset:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                header_size = RECORD_HEADER.size
+                while offset + header_size <= size:
+                    ts_ns, source, length = RECORD_HEADER.unpack_from(mm, offset)
+                    if ts_ns == 0 and length == 0:
+                        break  # 未截断的预分配尾部
+                    if end_ns is not None and ts_ns > end_ns:
+                        break
+                    payload_end = offset + header_size + length
+                    if start_ns is None or ts_ns >= start_ns:
+                        yield CaptureRecord(ts_ns, source, mm[offset + header_size:payload_end])
+                    offset = payload_end
+
+
+class CaptureReader:
+    """
+    读取 MessageRecorder 写入的段文件，按接收时间顺序返回记录，可按时间范围和来源过滤。
+    """
+    def __init__(self, directory: str, prefix: str = "capture", run_id: str = None) -> None:
+        """
+        初始化 CaptureReader 类。
+
+        Args:
+            directory (str): 段文件所在目录。
+            prefix (str): 段文件名前缀。
+            run_id (str): 读取的录制标识，默认为目录中最近一次录制。
+        """
+        paths = sorted(glob.glob(os.path.join(directory, f"{prefix}-*{SEGMENT_SUFFIX}")))
+        if run_id is None and paths:
+            run_id = max(self._run_id_of(path, prefix) for path in paths)
+        self.run_id = run_id
+        self.segments = [CaptureSegment.init_from_path(path) for path in paths
+                         if self._run_id_of(path, prefix) == run_id]
+
+    @staticmethod
+    def _run_id_of(path: str, prefix: str) -> str:
+        return os.path.basename(path)[len(prefix) + 1:].rsplit("-", 1)[0]
+
+    def read(self, start_ns: int = None, end_ns: int = None,
+             sources: Collection[int] = None) -> Iterator[CaptureRecord]:
+        """
+        按时间顺序读取 [start_ns, end_ns] 范围内的记录。起始段由各段索引的首条时间确定。
+
+        Args:
+            start_ns (int): 起始接收时间（monotonic ns），默认为最早。
+            end_ns (int): 结束接收时间（monotonic ns），默认为最晚。
+            sources (Collection[int]): 只返回这些来源的记录，默认为全部。
+        """
+        for i, segment in enumerate(self.segments):
+            first_ts = segment.first_ts()
+            if end_ns is not None and first_ts is not None and first_ts > end_ns:
+                return
+            if start_ns is not None and i + 1 < len(self.segments):
+                next_first_ts = self.segments[i + 1].first_ts()
+                if next_first_ts is not None and next_first_ts <= start_ns:
+                    continue
+            for capture_record in segment.read(start_ns, end_ns):
+                if sources is None or capture_record.source in sources:
+                    yield capture_record
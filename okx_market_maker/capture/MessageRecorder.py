@@ -0,0 +1,159 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from enum import IntEnum
+from typing import Optional, Union, Dict
+
+from okx_market_maker.config.settings import CAPTURE_SEGMENT_BYTES, CAPTURE_INDEX_INTERVAL_BYTES
+
+logger = logging.getLogger(__name__)
+
+# 段文件格式：
+#   段头   SEGMENT_HEADER  magic, 创建时的 wall clock ns, 创建时的 monotonic ns
+#   记录   RECORD_HEADER   接收时间 (monotonic ns), 来源, 消息长度；其后紧跟原始消息字节
+# 段文件按 CAPTURE_SEGMENT_BYTES 预分配并 mmap 写入，关闭时截断到实际长度；
+# 异常退出时文件尾部为全零，读取时遇到全零记录头即结束。
+# 索引文件（与段同名，后缀 .idx）为稀疏的 (接收时间, 段内偏移) 列表，每 CAPTURE_INDEX_INTERVAL_BYTES 写一条。
+CAPTURE_MAGIC = b"OKXCAP01"
+SEGMENT_HEADER = struct.Struct("<8sqq8x")
+RECORD_HEADER = struct.Struct("<qB3xI")
+INDEX_ENTRY = struct.Struct("<qq")
+SEGMENT_SUFFIX = ".cap"
+INDEX_SUFFIX = ".idx"
+
+
+class CaptureSource(IntEnum):
+    MDS = 1
+    OMS = 2
+    PMS = 3
+
+
+def segment_name(prefix: str, run_id: str, seq: int) -> str:
+    return f"{prefix}-{run_id}-{seq:06d}"
+
+
+class MessageRecorder:
+    """
+    将 WebSocket 原始消息连同接收时间追加写入分段的内存映射二进制日志。
+    写入路径只做 str -> bytes 编码和一次内存拷贝，不重新序列化 JSON，也不逐条 fsync。
+    """
+    def __init__(self, directory: str, prefix: str = "capture", segment_bytes: int = CAPTURE_SEGMENT_BYTES,
+                 index_interval_bytes: int = CAPTURE_INDEX_INTERVAL_BYTES, run_id: str = None) -> None:
+        """
+        初始化 MessageRecorder 类。
+
+        Args:
+            directory (str): 段文件所在目录，不存在时自动创建。
+            prefix (str): 段文件名前缀。
+            segment_bytes (int): 单个段文件的大小，写满后切换到新段。
+            index_interval_bytes (int): 相邻两条稀疏索引之间的字节间隔。
+            run_id (str): 本次录制的标识，默认为启动时间；同一次录制的段文件共享该标识。
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.segment_bytes = segment_bytes
+        self.index_interval_bytes = index_interval_bytes
+        self.run_id = run_id or time.strftime("%Y%m%d-%H%M%S")
+        self.seq = -1
+        self.records = 0
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._index_file = None
+        self._capacity = 0
+        self._offset = 0
+        self._next_index_offset = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, source: int, payload: bytes, ts_ns: int = None) -> None:
+        """
+        追加一条记录。
+
+        Args:
+            source (int): 消息来源，见 CaptureSource。
+            payload (bytes): 原始消息字节。
+            ts_ns (int): 接收时间（monotonic ns），默认为当前时间。
+        """
+        if ts_ns is None:
+            ts_ns = time.monotonic_ns()
+        size = RECORD_HEADER.size + len(payload)
+        if self._offset + size > self._capacity:
+            self._open_segment(size)
+        offset = self._offset
+        if offset >= self._next_index_offset:
+            self._index_file.write(INDEX_ENTRY.pack(ts_ns, offset))
+            self._next_index_offset = offset + self.index_interval_bytes
+        RECORD_HEADER.pack_into(self._mmap, offset, ts_ns, source, len(payload))
+        self._mmap[offset + RECORD_HEADER.size:offset + size] = payload
+        self._offset = offset + size
+        self.records += 1
+
+    def record(self, source: int, message: Union[str, bytes, Dict]) -> None:
+        """
+        记录一条 WebSocket 消息，接收时间取调用时刻。
+        """
+        ts_ns = time.monotonic_ns()
+        if isinstance(message, str):
+            payload = message.encode()
+        elif isinstance(message, (bytes, bytearray)):
+            payload = message
+        else:
+            payload = json.dumps(message).encode()
+        self.write(source, payload, ts_ns)
+
+    def close(self) -> None:
+        """
+        关闭当前段，截断预分配的空白尾部。
+        """
+        if self._mmap is None:
+            return
+        self._mmap.close()
+        self._file.truncate(self._offset)
+        self._file.close()
+        self._index_file.close()
+        self._mmap = self._file = self._index_file = None
+        self._capacity = self._offset = 0
+
+    def _open_segment(self, min_size: int) -> None:
+        self.close()
+        self.seq += 1
+        path = os.path.join(self.directory, segment_name(self.prefix, self.run_id, self.seq))
+        self._capacity = max(self.segment_bytes, SEGMENT_HEADER.size + min_size)
+        self._file = open(path + SEGMENT_SUFFIX, "w+b")
+        self._file.truncate(self._capacity)
+        self._mmap = mmap.mmap(self._file.fileno(), self._capacity)
+        SEGMENT_HEADER.pack_into(self._mmap, 0, CAPTURE_MAGIC, time.time_ns(), time.monotonic_ns())
+        self._index_file = open(path + INDEX_SUFFIX, "wb")
+        self._offset = SEGMENT_HEADER.size
+        self._next_index_offset = self._offset
+        logger.info(f"capture segment opened: {path}{SEGMENT_SUFFIX}")
+
+
+_recorder: Optional[MessageRecorder] = None
+
+
+def start_capture(directory: str, **kwargs) -> MessageRecorder:
+    """
+    开始录制，MDS / OMS / PMS 的回调收到的每条消息都会写入该目录。
+    """
+    global _recorder
+    stop_capture()
+    _recorder = MessageRecorder(directory, **kwargs)
+    return _recorder
+
+
+def stop_capture() -> None:
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+
+def record(source: int, message) -> None:
+    """
+    供 WebSocket 回调调用，未开始录制时直接返回。
+    """
+    if _recorder is not None:
+        _recorder.record(source, message)
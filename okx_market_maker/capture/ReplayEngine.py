@@ -0,0 +1,205 @@
+import argparse
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from okx_market_maker import order_books, orders_container, account_container, positions_container, \
+    balance_and_position_container, mark_px_container
+from okx_market_maker.capture.CaptureReader import CaptureReader, CaptureRecord
+from okx_market_maker.config.settings import COMPACT_ORDER_BOOK, TRADING_INSTRUMENT_ID
+from okx_market_maker.market_data_service.WssMarketDataService import ORDER_BOOK_CHANNELS, create_order_book, \
+    on_orderbook_snapshot_or_update
+from okx_market_maker.market_data_service.WssMarkPriceService import on_mark_price
+from okx_market_maker.order_management_service.WssOrderManagementService import on_orders_update
+from okx_market_maker.position_management_service.WssPositionManagementService import on_account, on_position, \
+    on_balance_and_position
+from okx_market_maker.utils.WsMessageUtil import decode_message
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReplayReport:
+    messages: int = 0
+    dropped_messages: int = 0
+    out_of_sync_messages: int = 0
+    decisions: int = 0
+    skipped_decisions: int = 0
+    place_requests: int = 0
+    amend_requests: int = 0
+    cancel_requests: int = 0
+    elapsed_sec: float = 0
+    simulated_sec: float = 0
+    decision_latencies_ns: List[int] = field(default_factory=list)
+
+    def messages_per_sec(self) -> float:
+        return self.messages / self.elapsed_sec if self.elapsed_sec else 0
+
+    def decision_latency_percentile(self, pct: float) -> float:
+        """
+        返回决策耗时的分位数（微秒）。
+        """
+        if not self.decision_latencies_ns:
+            return 0
+        latencies = sorted(self.decision_latencies_ns)
+        return latencies[min(int(len(latencies) * pct / 100), len(latencies) - 1)] / 1000
+
+    def summary(self) -> str:
+        return (f"replayed {self.messages} messages ({self.dropped_messages} dropped, "
+                f"{self.out_of_sync_messages} out of sync) covering {self.simulated_sec:.1f}s "
+                f"in {self.elapsed_sec:.3f}s: {self.messages_per_sec():.0f} msgs/sec\n"
+                f"decisions: {self.decisions} ({self.skipped_decisions} skipped), "
+                f"place/amend/cancel requests: {self.place_requests}/{self.amend_requests}/{self.cancel_requests}, "
+                f"latency p50 {self.decision_latency_percentile(50):.1f}us "
+                f"p99 {self.decision_latency_percentile(99):.1f}us "
+                f"max {self.decision_latency_percentile(100):.1f}us")
+
+
+class ReplayEngine:
+    """
+    这个类用于回放 MessageRecorder 录制的 WebSocket 消息。
+    按接收时间顺序把消息送入与线上相同的处理函数（订单簿、标记价格、订单、账户、持仓），
+    并按录制时间推进的模拟时钟，每隔 decision_interval_sec 调用一次策略的 order_operation_decision。
+    决策结果只做统计（或交给 on_decision 回调），不会发送任何订单。
+    """
+    def __init__(self, strategy=None, speed: float = 0, decision_interval_sec: float = 1,
+                 compact: bool = COMPACT_ORDER_BOOK,
+                 on_decision: Callable[[int, tuple], None] = None) -> None:
+        """
+        初始化 ReplayEngine 类。
+
+        Args:
+            strategy (BaseStrategy): 需要驱动的策略，为空时只回放行情与账户数据。
+            speed (float): 回放倍速，0 表示尽可能快。
+            decision_interval_sec (float): 模拟时钟下两次决策之间的间隔秒数。
+            compact (bool): 回放时新建的订单簿是否使用 CompactOrderBook。
+            on_decision (Callable[[int, tuple], None]): 每次决策后以 (模拟时间 ns, 决策结果) 调用，用于对比回归。
+        """
+        self.strategy = strategy
+        self.speed = speed
+        self.decision_interval_ns = int(decision_interval_sec * 1e9)
+        self.compact = compact
+        self.on_decision = on_decision
+        self.now_ns = 0
+        self.report = ReplayReport()
+        self._handlers: Dict[str, Callable[[Dict], Optional[bool]]] = {
+            "orders": on_orders_update,
+            "account": on_account,
+            "positions": on_position,
+            "balance_and_position": on_balance_and_position,
+            "mark-price": on_mark_price,
+        }
+        for channel in ORDER_BOOK_CHANNELS:
+            self._handlers[channel] = self._on_order_book
+
+    @staticmethod
+    def reset_state() -> None:
+        """
+        清空全局行情、订单与账户缓存，使每次回放从相同的初始状态开始。
+        """
+        for container in (orders_container, account_container, positions_container, balance_and_position_container,
+                          mark_px_container):
+            container.clear()
+        order_books.clear()
+
+    def run(self, records: Iterable[CaptureRecord]) -> ReplayReport:
+        """
+        按顺序回放记录，返回统计报告。
+
+        Args:
+            records (Iterable[CaptureRecord]): 录制的记录，通常来自 CaptureReader.read()。
+        """
+        report = self.report
+        first_ts = None
+        next_decision_ns = 0
+        start = time.perf_counter()
+        for capture_record in records:
+            ts_ns = capture_record.ts_ns
+            if first_ts is None:
+                first_ts = ts_ns
+                next_decision_ns = ts_ns + self.decision_interval_ns
+            if self.speed:
+                delay = (ts_ns - first_ts) / 1e9 / self.speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            while self.strategy is not None and ts_ns >= next_decision_ns:
+                self.now_ns = next_decision_ns
+                self._decide()
+                next_decision_ns += self.decision_interval_ns
+            self.now_ns = ts_ns
+            self._dispatch(capture_record.payload)
+        report.elapsed_sec = time.perf_counter() - start
+        if first_ts is not None:
+            report.simulated_sec = (self.now_ns - first_ts) / 1e9
+        return report
+
+    def _dispatch(self, payload: bytes) -> None:
+        self.report.messages += 1
+        message = decode_message(payload, self._handlers)
+        if not message:
+            self.report.dropped_messages += 1
+            return
+        if self._handlers[message["arg"]["channel"]](message) is False:
+            self.report.out_of_sync_messages += 1
+
+    def _on_order_book(self, message: Dict) -> bool:
+        inst_id = message["arg"].get("instId")
+        order_book = order_books.get(inst_id)
+        if order_book is None:
+            order_book = order_books[inst_id] = create_order_book(inst_id, self.compact)
+        # 线上出现缺口时会重新订阅；回放中直到录制里的下一条快照前，订单簿保持缺口前的状态
+        return on_orderbook_snapshot_or_update(message, order_book)
+
+    def _decide(self) -> None:
+        report = self.report
+        start = time.perf_counter_ns()
+        try:
+            decision = self.strategy.order_operation_decision()
+        except (ValueError, IndexError) as e:
+            # 订单簿或账户数据尚未就绪
+            logger.debug(f"decision skipped at {self.now_ns}: {e}")
+            report.skipped_decisions += 1
+            return
+        report.decision_latencies_ns.append(time.perf_counter_ns() - start)
+        report.decisions += 1
+        place_order_list, amend_order_list, cancel_order_list = decision
+        report.place_requests += len(place_order_list)
+        report.amend_requests += len(amend_order_list)
+        report.cancel_requests += len(cancel_order_list)
+        if self.on_decision:
+            self.on_decision(self.now_ns, decision)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured WebSocket messages through the strategy.")
+    parser.add_argument("directory", help="capture directory (CAPTURE_DIR)")
+    parser.add_argument("--run-id", default=None, help="capture run id, default: latest")
+    parser.add_argument("--start-ns", type=int, default=None)
+    parser.add_argument("--end-ns", type=int, default=None)
+    parser.add_argument("--speed", type=float, default=0, help="replay speed multiplier, 0: as fast as possible")
+    parser.add_argument("--decision-interval", type=float, default=1)
+    parser.add_argument("--compact", action="store_true", help="replay into CompactOrderBook")
+    parser.add_argument("--no-strategy", action="store_true", help="only replay market / account data")
+    args = parser.parse_args()
+
+    strategy = None
+    if not args.no_strategy:
+        from okx_market_maker.strategy.SampleMM import SampleMM
+        from okx_market_maker.utils.InstrumentUtil import InstrumentUtil
+        strategy = SampleMM()
+        strategy.trading_instrument_type = InstrumentUtil.get_inst_type_from_inst_id(TRADING_INSTRUMENT_ID)
+        InstrumentUtil.get_instrument(TRADING_INSTRUMENT_ID, strategy.trading_instrument_type)
+        strategy.set_strategy_measurement(trading_instrument=TRADING_INSTRUMENT_ID,
+                                          trading_instrument_type=strategy.trading_instrument_type)
+        strategy.get_params()
+    reader = CaptureReader(args.directory, run_id=args.run_id)
+    engine = ReplayEngine(strategy, speed=args.speed, decision_interval_sec=args.decision_interval,
+                          compact=args.compact)
+    engine.reset_state()
+    report = engine.run(reader.read(args.start_ns, args.end_ns))
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
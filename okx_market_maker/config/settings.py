@@ -21,6 +21,79 @@ TRADING_MODE = "cross"  # "cash" / "isolated" / "cross"
 # default latency tolerance level 默认延迟容忍级别
 ORDER_BOOK_DELAYED_SEC = 60  # Warning if OrderBook not updated for these seconds, potential issues from wss connection
 ACCOUNT_DELAYED_SEC = 60  # Warning if Account not updated for these seconds, potential issues from wss connection
+ORDER_BOOK_RESYNC_TIMEOUT_SEC = 5  # re-issue a single-instrument resync whose snapshot has not arrived in time
+
+# strategy loop 策略主循环
+STRATEGY_LOOP_MODE = "event"  # "event": decide when book / order / position state changes, "poll": fixed 1s loop
+DECISION_MIN_INTERVAL_SEC = 0.05  # minimum spacing between two decisions, state changes in between are coalesced
+DECISION_MAX_INTERVAL_SEC = 1  # run a decision at least this often even without state changes
+HEALTH_CHECK_BACKOFF_SEC = 1  # event mode: pause decisions this long after a failed health check
+SLOW_CHECK_INTERVAL_SEC = 5  # exchange status check / params reload cadence in event mode
+RISK_SUMMARY_INTERVAL_SEC = 1  # risk summary cadence in event mode
+
+# order entry 下单通道
+ORDER_ENTRY_CHANNEL = "ws"  # "ws": batch ops over the logged-in private WebSocket (WssOrderGateway), "rest": TradeAPI
+ORDER_REQUEST_TIMEOUT_SEC = 5  # a WebSocket order op without a response after this many seconds is failed
+ORDER_RECONCILE_ATTEMPTS = 3  # REST lookups of a timed-out placement before it is dropped as never placed
+ORDER_MAX_CONCURRENT_BATCHES = 8  # batches of up to 20 orders in flight at once (batch endpoints: 300 orders / 2s)
+ORDER_RATE_LIMITS = {  # (orders, period in seconds) per instrument and batch endpoint, enforced by OrderScheduler
+    "batch-orders": (300, 2),
+    "batch-amend-orders": (300, 2),
+    "batch-cancel-orders": (300, 2),
+}
+ORDER_ACCOUNT_RATE_LIMIT = (1000, 2)  # sub-account limit shared by placed and amended orders
+
+# watchdog / kill switch 看门狗
+WATCHDOG_ENABLED = True  # monitor the strategy from a separate thread and cancel its orders when it trips
+WATCHDOG_CHECK_INTERVAL_SEC = 0.1  # check cadence, also the event loop heartbeat interval
+WATCHDOG_LOOP_STALL_SEC = 2  # trip if the event loop heartbeat is older than this
+WATCHDOG_DECISION_STALL_SEC = 30  # trip if no decision loop iteration for this long (error backoff is 20s)
+WATCHDOG_BOOK_STALE_SEC = 10  # trip if the trading instrument's order book is older than this
+WATCHDOG_MAX_ERRORS = 5  # trip if this many errors are recorded within WATCHDOG_ERROR_WINDOW_SEC
+WATCHDOG_ERROR_WINDOW_SEC = 60
+WATCHDOG_CANCEL_TIMEOUT_SEC = 0.5  # the kill switch waits at most this long for its concurrent cancel requests
+# exchange cancel-all-after countdown renewed by the watchdog (10-120), 0: off; opt-in, it cancels every order of
+# the account, not only this strategy's
+WATCHDOG_CANCEL_ALL_AFTER_SEC = 0
+WATCHDOG_CANCEL_UNTRACKED_ORDERS = False  # kill switch also cancels live trading instrument orders of other clients
+
+# rest market data REST 行情与标记价格
+ASYNC_REST_MARKET_DATA = True  # True: asyncio AsyncRESTMarketDataService, False: threaded RESTMarketDataService
+REST_MARKET_DATA_INTERVAL_SEC = {  # refresh interval per dataset, 0 / missing: disabled
+    "tickers-SPOT": 2,
+    "mark-px-MARGIN": 2,
+    "mark-px-SWAP": 2,
+    "mark-px-FUTURES": 5,
+    "mark-px-OPTION": 10,
+}
+REST_MARKET_DATA_BACKOFF_SEC = 1  # first retry delay after a failed refresh, doubled per consecutive failure
+REST_MARKET_DATA_MAX_BACKOFF_SEC = 30
+TICKERS_BACKEND = "object"  # "object": Ticker per instId, "columnar": ColumnarTickers NumPy columns
+
+# mark price 标记价格
+MARK_PX_SOURCE = "ws"  # "ws": mark-price channel for held instruments only, "rest": poll all instruments via REST
+MARK_PX_BASE_INST_IDS = ["BTC-USD-SWAP", "BTC-USDT-SWAP"]  # always subscribed, used for the USDT/USD rate
+MARK_PX_REST_FALLBACK_SEC = 5  # how often to look for missing / stale marks and fetch them via REST
+MARK_PX_STALE_SEC = 30  # marks older than this are refreshed via REST (the channel pushes at least every 10s)
+
+# order book storage 订单簿存储模式
+COMPACT_ORDER_BOOK = False  # True: integer tick / lot buffers (CompactOrderBook), False: OrderBook
+
+# websocket json decoder WebSocket 消息 JSON 解码后端
+JSON_DECODER = "auto"  # "auto" (orjson > msgspec > json) / "orjson" / "msgspec" / "json"
+
+# raw websocket message capture 原始 WebSocket 消息录制
+CAPTURE_DIR = None  # directory for capture segments, None: capture disabled
+CAPTURE_SEGMENT_BYTES = 256 * 1024 * 1024  # rotate to a new segment file after this size
+CAPTURE_INDEX_INTERVAL_BYTES = 1024 * 1024  # write one sparse index entry per this many bytes
+
+# orders cache 订单缓存
+ORDERS_TERMINAL_GRACE_SEC = 60  # filled / canceled orders stay in the orders cache this long before eviction
+ORDERS_MAX_SIZE = 10000  # cap on cached orders, terminal orders are evicted first, then least recently updated
+
+# order lifecycle latency 订单生命周期延迟统计
+LATENCY_TRACKING = True  # per-stage latency histograms (book -> decision -> send -> ack / orders push), LatencyUtil
+LATENCY_DUMP_PATH = None  # JSON file the latency summary is also written to on exit, None: print only
 
 # risk-free ccy 无风险计价货币
 RISK_FREE_CCY_LIST = ["USDT", "USDC", "DAI"]
@@ -0,0 +1,202 @@
+import asyncio
+import importlib.util
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+from okx import consts as c
+from okx.utils import get_header_no_sign
+
+from okx_market_maker import tickers_container, mark_px_container
+from okx_market_maker.config.settings import IS_DEMO_TRADING, REST_MARKET_DATA_INTERVAL_SEC, \
+    REST_MARKET_DATA_BACKOFF_SEC, REST_MARKET_DATA_MAX_BACKOFF_SEC
+from okx_market_maker.market_data_service.model.MarkPx import MarkPxCache
+from okx_market_maker.market_data_service.RESTMarketDataService import create_tickers
+from okx_market_maker.utils.OkxEnum import InstType
+from okx_market_maker.utils.SnapshotUtil import publish_snapshot
+from okx_market_maker.utils.WsMessageUtil import loads
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RestEndpoint:
+    name: str
+    path: str
+    params: Dict[str, str]
+    interval_sec: float
+    container: List
+    last_update_ts: float = 0
+    consecutive_failures: int = 0
+
+
+@dataclass
+class _EndpointStats:
+    requests: int = 0
+    failures: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+
+
+class AsyncRESTMarketDataService:
+    """
+    这个类是 RESTMarketDataService 的 asyncio 版本。
+    SPOT 行情与各产品类型的标记价格作为独立的数据集，各自按刷新间隔在事件循环中并发请求，
+    共用一个 keep-alive（安装 h2 时启用 HTTP/2）的连接池；单个接口变慢或失败只影响自身，
+    失败后按带随机抖动的指数退避重试。每个数据集最近一次成功刷新的时间可通过 get_last_update_ts 获取。
+    响应的解码和新快照的生成放在线程池中执行，完成后在事件循环中通过一次引用替换发布；
+    写入同一容器的数据集（各产品类型的标记价格）依次发布，互不覆盖。
+    """
+    def __init__(
+        self,
+        is_demo_trading: bool = IS_DEMO_TRADING,
+        interval_sec: Dict[str, float] = None,
+        base_url: str = c.API_URL,
+        transport: httpx.AsyncBaseTransport = None
+    ) -> None:
+        """
+        初始化 AsyncRESTMarketDataService 类。
+
+        Args:
+            is_demo_trading (bool): 是否为模拟交易。
+            interval_sec (Dict[str, float]): 数据集名称 -> 刷新间隔秒数，默认为 REST_MARKET_DATA_INTERVAL_SEC。
+            base_url (str): REST API 地址。
+            transport (httpx.AsyncBaseTransport): 自定义 httpx transport，用于测试。
+        """
+        self.flag = '0' if not is_demo_trading else '1'
+        self.base_url = base_url
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stats: Dict[str, _EndpointStats] = {}
+        self._publish_locks: Dict[int, asyncio.Lock] = {}
+        # 初始化交易对容器，
+        if not tickers_container:
+            tickers_container.append(create_tickers())
+        # 初始化标记价格缓存
+        if not mark_px_container:
+            mark_px_container.append(MarkPxCache())
+        interval_sec = {**REST_MARKET_DATA_INTERVAL_SEC, **(interval_sec or {})}
+        self.endpoints: Dict[str, RestEndpoint] = {}
+        self._add_endpoint(f"tickers-{InstType.SPOT.value}", c.TICKERS_INFO, {"instType": InstType.SPOT.value},
+                           interval_sec, tickers_container)
+        for inst_type in (InstType.MARGIN, InstType.SWAP, InstType.FUTURES, InstType.OPTION):
+            self._add_endpoint(f"mark-px-{inst_type.value}", c.MARK_PRICE, {"instType": inst_type.value},
+                               interval_sec, mark_px_container)
+
+    def _add_endpoint(self, name: str, path: str, params: Dict[str, str], interval_sec: Dict[str, float],
+                      container: List) -> None:
+        if not interval_sec.get(name):
+            return
+        self.endpoints[name] = RestEndpoint(name=name, path=path, params=params, interval_sec=interval_sec[name],
+                                            container=container)
+        self._stats[name] = _EndpointStats()
+        self._publish_locks.setdefault(id(container), asyncio.Lock())
+
+    def start(self) -> List[asyncio.Task]:
+        """
+        在当前事件循环中为每个数据集启动一个刷新任务。
+        """
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url, http2=importlib.util.find_spec("h2") is not None,
+            headers=get_header_no_sign(self.flag, False), transport=self.transport,
+            limits=httpx.Limits(max_connections=len(self.endpoints), max_keepalive_connections=len(self.endpoints)))
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._run_endpoint(endpoint)) for endpoint in self.endpoints.values()]
+        return self._tasks
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def get_last_update_ts(self, name: str) -> float:
+        """
+        返回数据集最近一次成功刷新的时间（time.time() 秒），从未成功时为 0。
+        """
+        return self.endpoints[name].last_update_ts
+
+    def get_data_age_sec(self, name: str) -> float:
+        """
+        返回数据集距最近一次成功刷新的秒数，从未成功时为 inf。
+        """
+        last_update_ts = self.endpoints[name].last_update_ts
+        return time.time() - last_update_ts if last_update_ts else float("inf")
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        返回每个数据集的请求数、失败数与最近请求耗时的平均值（毫秒）。
+        """
+        return {name: {"requests": stats.requests, "failures": stats.failures,
+                       "avg_latency_ms": sum(stats.latencies_ms) / len(stats.latencies_ms)
+                       if stats.latencies_ms else 0}
+                for name, stats in self._stats.items()}
+
+    async def refresh(self, name: str) -> None:
+        """
+        立即刷新一个数据集，失败时抛出异常。
+        """
+        endpoint = self.endpoints[name]
+        stats = self._stats[name]
+        stats.requests += 1
+        start = time.perf_counter()
+        response = await self._client.get(endpoint.path, params=endpoint.params)
+        response.raise_for_status()
+        stats.latencies_ms = stats.latencies_ms[-99:] + [(time.perf_counter() - start) * 1000]
+        async with self._publish_locks[id(endpoint.container)]:
+            snapshot = await asyncio.get_running_loop().run_in_executor(
+                None, self._build_snapshot, endpoint, response.content)
+            publish_snapshot(endpoint.container, snapshot)
+        endpoint.last_update_ts = time.time()
+
+    @staticmethod
+    def _build_snapshot(endpoint: RestEndpoint, content: bytes):
+        """
+        在线程池中解码响应，并基于当前已发布的快照生成新的快照。
+        """
+        json_response = loads(content)
+        if json_response.get("code") != "0":
+            raise ValueError(f"Unsuccessful {endpoint.name} response {json_response}")
+        return endpoint.container[0].copy_and_update(json_response)
+
+    def _backoff_sec(self, endpoint: RestEndpoint) -> float:
+        backoff = min(REST_MARKET_DATA_BACKOFF_SEC * 2 ** (endpoint.consecutive_failures - 1),
+                      REST_MARKET_DATA_MAX_BACKOFF_SEC)
+        return backoff * random.uniform(0.5, 1)
+
+    async def _run_endpoint(self, endpoint: RestEndpoint) -> None:
+        while 1:
+            try:
+                await self.refresh(endpoint.name)
+                endpoint.consecutive_failures = 0
+                delay = endpoint.interval_sec
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 除网络与响应错误外，异常数据在 copy_and_update 中抛出的错误同样退避重试，不能结束刷新任务
+                self._stats[endpoint.name].failures += 1
+                endpoint.consecutive_failures += 1
+                delay = self._backoff_sec(endpoint)
+                logger.warning(f"{endpoint.name} refresh failed ({endpoint.consecutive_failures} in a row), "
+                               f"retry in {delay:.1f}s: {e!r}",
+                               exc_info=not isinstance(e, (httpx.HTTPError, ValueError)))
+            await asyncio.sleep(delay)
+
+
+async def main():
+    rest_mds = AsyncRESTMarketDataService()
+    rest_mds.start()
+    await asyncio.sleep(10)
+    print(rest_mds.get_stats())
+    print({name: rest_mds.get_data_age_sec(name) for name in rest_mds.endpoints})
+    await rest_mds.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -7,31 +7,44 @@ from okx.exceptions import OkxAPIException, OkxParamsException, OkxRequestExcept
 from okx.MarketData import MarketAPI
 from okx.PublicData import PublicAPI
 from okx_market_maker.market_data_service.model.MarkPx import MarkPxCache
-from okx_market_maker.config.settings import IS_DEMO_TRADING
+from okx_market_maker.config.settings import IS_DEMO_TRADING, TICKERS_BACKEND
 from okx_market_maker import tickers_container, mark_px_container
+from okx_market_maker.market_data_service.model.ColumnarTickers import ColumnarTickers
 from okx_market_maker.market_data_service.model.Tickers import Tickers
 from okx_market_maker.utils.OkxEnum import InstType
+from okx_market_maker.utils.SnapshotUtil import publish_snapshot
 
 logger = logging.getLogger(__name__)
 
+
+def create_tickers(backend: str = TICKERS_BACKEND):
+    """
+    按 TICKERS_BACKEND 创建行情容器，"columnar" 为 ColumnarTickers，否则为 Tickers。
+    """
+    return ColumnarTickers() if backend == "columnar" else Tickers()
+
+
 class RESTMarketDataService(threading.Thread):
     def __init__(
         self, 
-        is_demo_trading: bool = IS_DEMO_TRADING
+        is_demo_trading: bool = IS_DEMO_TRADING,
+        poll_mark_px: bool = True
     ) -> None:
         """
         这个类用于封装REST市场数据服务的相关函数。
 
         Args:
             is_demo_trading (bool): 是否为模拟交易
+            poll_mark_px (bool): 是否轮询全部产品的标记价格，标记价格由 WssMarkPriceService 提供时为 False
         """
         super().__init__()
+        self.poll_mark_px = poll_mark_px
         # 创建API服务实例
         self.market_api = MarketAPI(flag='0' if not is_demo_trading else '1', debug=False)
         self.public_api = PublicAPI(flag='0' if not is_demo_trading else '1', debug=False)
         # 初始化交易对容器，
         if not tickers_container:
-            tickers_container.append(Tickers())
+            tickers_container.append(create_tickers())
         # 初始化标记价格缓存
         if not mark_px_container:
             mark_px_container.append(MarkPxCache())
@@ -43,17 +56,16 @@ class RESTMarketDataService(threading.Thread):
         while 1:
             try:
                 json_response = self.market_api.get_tickers(instType=InstType.SPOT.value)
+                # 在本线程生成新的快照后整体替换，事件循环读到的始终是完整的一版数据
                 tickers: Tickers = tickers_container[0]
-                tickers.update_from_json(json_response)
+                publish_snapshot(tickers_container, tickers.copy_and_update(json_response))
+                if not self.poll_mark_px:
+                    time.sleep(2)
+                    continue
+                json_responses = [self.public_api.get_mark_price(instType=inst_type.value)
+                                  for inst_type in (InstType.MARGIN, InstType.SWAP, InstType.FUTURES, InstType.OPTION)]
                 mark_px_cache: MarkPxCache = mark_px_container[0]
-                json_response = self.public_api.get_mark_price(instType=InstType.MARGIN.value)
-                mark_px_cache.update_from_json(json_response)
-                json_response = self.public_api.get_mark_price(instType=InstType.SWAP.value)
-                mark_px_cache.update_from_json(json_response)
-                json_response = self.public_api.get_mark_price(instType=InstType.FUTURES.value)
-                mark_px_cache.update_from_json(json_response)
-                json_response = self.public_api.get_mark_price(instType=InstType.OPTION.value)
-                mark_px_cache.update_from_json(json_response)
+                publish_snapshot(mark_px_container, mark_px_cache.copy_and_update(*json_responses))
                 time.sleep(2)
             except KeyboardInterrupt:
                 break
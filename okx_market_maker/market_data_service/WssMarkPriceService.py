@@ -0,0 +1,191 @@
+import asyncio
+import functools
+import logging
+import time
+from typing import Dict, List, Optional, Set
+
+from okx.PublicData import PublicAPI
+from okx.websocket.WsPublicAsync import WsPublicAsync
+
+from okx_market_maker import mark_px_container, positions_container, state_change_listeners
+from okx_market_maker.capture.MessageRecorder import CaptureSource, record
+from okx_market_maker.config.settings import IS_DEMO_TRADING, MARK_PX_BASE_INST_IDS, MARK_PX_REST_FALLBACK_SEC, \
+    MARK_PX_STALE_SEC
+from okx_market_maker.market_data_service.model.MarkPx import MarkPxCache
+from okx_market_maker.utils.InstrumentUtil import InstrumentUtil
+from okx_market_maker.utils.OkxEnum import InstType
+from okx_market_maker.utils.SnapshotUtil import publish_snapshot
+from okx_market_maker.utils.StateChangeUtil import notify_state_change
+from okx_market_maker.utils.WsMessageUtil import decode_message
+
+logger = logging.getLogger(__name__)
+
+MARK_PX_CHANNELS = frozenset(["mark-price"])
+
+
+class WssMarkPriceService(WsPublicAsync):
+    """
+    这个类用于通过 WebSocket mark-price 频道获取标记价格，只订阅实际需要的产品：
+    当前持仓的产品、交易产品，以及计算 USDT/USD 汇率用的 MARK_PX_BASE_INST_IDS。
+    持仓变化时自动增减订阅；推送缺失或过期的产品由后台任务通过 REST 补齐。
+    """
+    def __init__(
+        self,
+        url: str,
+        inst_ids: List[str] = None,
+        is_demo_trading: bool = IS_DEMO_TRADING,
+        rest_fallback_sec: float = MARK_PX_REST_FALLBACK_SEC,
+        stale_sec: float = MARK_PX_STALE_SEC
+    ) -> None:
+        """
+        初始化 WssMarkPriceService 类。
+
+        Args:
+            url (str): WebSocket 连接的 URL。
+            inst_ids (List[str]): 无论是否持仓都需要订阅的产品，如交易产品。
+            is_demo_trading (bool): 是否为模拟交易。
+            rest_fallback_sec (float): 检查并通过 REST 补齐缺失标记价格的间隔秒数。
+            stale_sec (float): 标记价格超过该秒数未更新视为缺失。
+        """
+        super().__init__(url)
+        self.base_inst_ids: Set[str] = set(MARK_PX_BASE_INST_IDS) | set(inst_ids or [])
+        self.public_api = PublicAPI(flag='0' if not is_demo_trading else '1', debug=False)
+        self.rest_fallback_sec = rest_fallback_sec
+        self.stale_sec = stale_sec
+        self._subscribed: Set[str] = set()
+        self._sync_lock = asyncio.Lock()
+        self._sync_pending = False
+        self._task: Optional[asyncio.Task] = None
+        if not mark_px_container:
+            mark_px_container.append(MarkPxCache())
+
+    async def run_service(self) -> None:
+        """
+        运行服务：订阅当前需要的产品，开始跟随持仓变化，并启动 REST 补齐任务。
+        """
+        state_change_listeners.append(self._on_state_change)
+        await self.sync_subscriptions()
+        self._task = asyncio.get_running_loop().create_task(self._run_rest_fallback())
+
+    async def stop_service(self) -> None:
+        """
+        停止服务。
+        """
+        if self._on_state_change in state_change_listeners:
+            state_change_listeners.remove(self._on_state_change)
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._subscribed:
+            await self.unsubscribe(self._prepare_args(sorted(self._subscribed)), lambda message: print(message))
+            self._subscribed.clear()
+        # WsPublicAsync 没有 close；stop() 还会停止事件循环，这里只关闭连接
+        await self.factory.close()
+
+    def get_subscribed_inst_ids(self) -> Set[str]:
+        return set(self._subscribed)
+
+    def desired_inst_ids(self) -> Set[str]:
+        """
+        返回当前需要标记价格的产品：持仓产品加上固定订阅的产品。
+        """
+        inst_ids = set(self.base_inst_ids)
+        if positions_container:
+            inst_ids.update(position.inst_id for position in positions_container[0].get_position_map().values()
+                            if position.inst_id)
+        return inst_ids
+
+    async def sync_subscriptions(self) -> None:
+        """
+        按当前持仓增量订阅新增的产品，取消订阅已平仓的产品并删除其缓存的标记价格。
+        """
+        async with self._sync_lock:
+            self._sync_pending = False
+            desired = self.desired_inst_ids()
+            added = sorted(desired - self._subscribed)
+            removed = sorted(self._subscribed - desired)
+            if added:
+                await self.subscribe(self._prepare_args(added), self._callback)
+                self._subscribed.update(added)
+            if removed:
+                await self.unsubscribe(self._prepare_args(removed), self._callback)
+                self._subscribed.difference_update(removed)
+                mark_px_cache = mark_px_container[0].copy()
+                for inst_id in removed:
+                    mark_px_cache.remove_mark_px(inst_id)
+                publish_snapshot(mark_px_container, mark_px_cache)
+            if added or removed:
+                logger.info(f"mark-price subscriptions: +{added} -{removed}")
+
+    def _on_state_change(self, channel: str, key: str) -> None:
+        if channel == "positions" and not self._sync_pending:
+            self._sync_pending = True
+            asyncio.ensure_future(self.sync_subscriptions())
+
+    def _callback(self, message) -> None:
+        record(CaptureSource.MDS, message)
+        message = decode_message(message, MARK_PX_CHANNELS)
+        if not message:
+            return
+        on_mark_price(message)
+        notify_state_change("mark-price", message["arg"].get("instId"))
+
+    def find_gaps(self) -> List[str]:
+        """
+        返回已订阅但标记价格缺失或超过 stale_sec 未更新的产品。
+        """
+        mark_px_cache: MarkPxCache = mark_px_container[0]
+        stale_before_ms = (time.time() - self.stale_sec) * 1000
+        gaps = []
+        for inst_id in sorted(self._subscribed):
+            mark_px = mark_px_cache.get_mark_px(inst_id)
+            if not mark_px or mark_px.ts < stale_before_ms:
+                gaps.append(inst_id)
+        return gaps
+
+    async def fill_gaps(self) -> List[str]:
+        """
+        通过 REST 逐个补齐缺失的标记价格，阻塞请求放在线程池执行。
+        """
+        gaps = self.find_gaps()
+        loop = asyncio.get_running_loop()
+        for inst_id in gaps:
+            inst_type = InstrumentUtil.get_inst_type_from_inst_id(inst_id)
+            if inst_type == InstType.SPOT:
+                inst_type = InstType.MARGIN
+            json_response = await loop.run_in_executor(None, functools.partial(
+                self.public_api.get_mark_price, instType=inst_type.value, instId=inst_id))
+            publish_snapshot(mark_px_container, mark_px_container[0].copy_and_update(json_response))
+        return gaps
+
+    async def _run_rest_fallback(self) -> None:
+        while 1:
+            try:
+                await asyncio.sleep(self.rest_fallback_sec)
+                gaps = await self.fill_gaps()
+                if gaps:
+                    logger.info(f"mark price filled via REST: {gaps}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"mark price REST fallback failed: {e!r}")
+
+    @staticmethod
+    def _prepare_args(inst_ids: List[str]) -> List[Dict]:
+        return [{"channel": "mark-price", "instId": inst_id} for inst_id in inst_ids]
+
+
+def on_mark_price(message) -> None:
+    """
+    处理 mark-price 频道推送。
+
+    Args:
+        message (dict): WebSocket 消息。
+        {
+            "arg": {"channel": "mark-price", "instId": "BTC-USDT-SWAP"},
+            "data": [{"instType": "SWAP", "instId": "BTC-USDT-SWAP", "markPx": "42310.6", "ts": "1630049139746"}]
+        }
+    """
+    mark_px_cache = mark_px_container[0] if mark_px_container else MarkPxCache()
+    publish_snapshot(mark_px_container, mark_px_cache.copy_and_update(message))
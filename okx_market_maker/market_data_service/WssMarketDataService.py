@@ -1,26 +1,38 @@
-import threading
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import time
 import asyncio
-import json
 import logging
 from okx_market_maker import order_books
-from okx_market_maker.market_data_service.model.OrderBook import OrderBook, OrderBookLevel
+from okx_market_maker.config.settings import COMPACT_ORDER_BOOK, ORDER_BOOK_RESYNC_TIMEOUT_SEC
+from okx_market_maker.market_data_service.model.OrderBook import OrderBook
+from okx_market_maker.market_data_service.model.CompactOrderBook import CompactOrderBook
+from okx_market_maker.utils.InstrumentUtil import InstrumentUtil
+from okx_market_maker.utils.WsMessageUtil import decode_message
+from okx_market_maker.capture.MessageRecorder import CaptureSource, record
+from okx_market_maker.utils.StateChangeUtil import notify_state_change
+from okx_market_maker.utils.LatencyUtil import mark_book_received
 from okx.websocket.WsPublicAsync import WsPublicAsync
 
 logger = logging.getLogger(__name__)
 
+ORDER_BOOK_CHANNELS = frozenset(["books5", "books", "bbo-tbt", "books50-l2-tbt", "books-l2-tbt"])
+
 class WssMarketDataService(WsPublicAsync):
     """
     这个类用于封装WebSocket市场数据服务的相关函数。
     主要用于处理WebSocket连接、订阅和取消订阅市场数据等功能。
     继承自WsPublic类，提供了WebSocket连接的基本功能。
+
+    一个实例在同一条连接上管理多个 (channel, instId) 订阅，收到推送时按 arg.instId 在
+    instId -> 订单簿 的分发表中 O(1) 找到对应订单簿；可在运行时增减产品。
     """
     def __init__(
         self, 
         url: str, 
-        inst_id: str, 
-        channel: str = "books5"
+        inst_id: str = None,
+        channel: str = "books5",
+        compact: bool = COMPACT_ORDER_BOOK,
+        inst_ids: List[str] = None
     ) -> None:
         """
         初始化 WssMarketDataService 类。
@@ -28,45 +40,212 @@ class WssMarketDataService(WsPublicAsync):
         Args:
             url (str): WebSocket 连接的 URL。
             inst_id (str): 交易对的 ID。
-            channel (str): 订阅的频道，默认为 "books5"。
+            channel (str): 默认订阅的频道，默认为 "books5"。
+            compact (bool): 是否使用定点整数存储的 CompactOrderBook。
+            inst_ids (List[str]): 其他需要在同一连接上订阅的交易对 ID。
         """
         super().__init__(url)
-        self.inst_id = inst_id
         self.channel = channel
-        order_books[self.inst_id] = OrderBook(inst_id=inst_id)
-        self.args = []
+        self.compact = compact
+        # instId -> 订阅频道
+        self._channels: Dict[str, str] = {}
+        # instId -> 订单簿，消息分发表
+        self._books: Dict[str, OrderBook] = {}
+        self._subscribed = False
+        # 正在重新同步的产品 -> (开始时间, 等待快照期间缓存的增量消息)
+        self._resync_buffers: Dict[str, Tuple[float, List[Dict]]] = {}
+        self._register([inst_id] if inst_id else [], channel)
+        self._register(inst_ids or [], channel)
 
     async def run_service(self) -> None:
         """
-        运行服务。
+        运行服务，在同一连接上一次性订阅所有已登记的产品。
         """
         args = self._prepare_args()
         print(args)
         print("subscribing")
-        await self.subscribe(args, _callback)
-        self.args += args
+        await self.subscribe(args, self._callback)
+        self._subscribed = True
+
+    async def add_instruments(self, inst_ids: List[str], channel: str = None) -> None:
+        """
+        运行时增加产品。服务已订阅时，只在现有连接上订阅新增的产品。
+
+        Args:
+            inst_ids (List[str]): 需要增加的交易对 ID。
+            channel (str): 订阅的频道，默认为服务的默认频道。
+        """
+        added = self._register(inst_ids, channel or self.channel)
+        if added and self._subscribed:
+            await self.subscribe(self._prepare_args(added), self._callback)
+
+    async def remove_instruments(self, inst_ids: List[str]) -> None:
+        """
+        运行时移除产品：取消订阅并从分发表和全局 order_books 中删除对应订单簿。
+
+        Args:
+            inst_ids (List[str]): 需要移除的交易对 ID。
+        """
+        removed = [inst_id for inst_id in inst_ids if inst_id in self._books]
+        if not removed:
+            return
+        args = self._prepare_args(removed)
+        for inst_id in removed:
+            del self._channels[inst_id]
+            order_book = self._books.pop(inst_id)
+            if order_books.get(inst_id) is order_book:
+                del order_books[inst_id]
+            self._resync_buffers.pop(inst_id, None)
+        if self._subscribed:
+            await self.unsubscribe(args, self._callback)
+
+    def get_order_books(self) -> Dict[str, OrderBook]:
+        """
+        返回本服务订阅的订单簿。
+        """
+        return dict(self._books)
+
+    def is_resyncing(self, inst_id: str, timeout_sec: float = None) -> bool:
+        """
+        是否正在等待该产品的重新同步快照；指定 timeout_sec 时，超时未完成的同步视为不在进行中。
+        """
+        if inst_id not in self._resync_buffers:
+            return False
+        if timeout_sec is None:
+            return True
+        return time.monotonic() - self._resync_buffers[inst_id][0] < timeout_sec
+
+    async def resync(self, inst_id: str) -> None:
+        """
+        在现有连接上只对该产品的频道取消订阅并重新订阅，以获取新的快照。
+        等待快照期间收到的增量会被缓存，快照到达后按 seqId 接续回放。
+
+        Args:
+            inst_id (str): 需要重新同步的交易对 ID。
+        """
+        if inst_id not in self._channels:
+            return
+        args = self._prepare_args([inst_id])
+        buffered = self._resync_buffers[inst_id][1] if inst_id in self._resync_buffers else []
+        self._resync_buffers[inst_id] = (time.monotonic(), buffered)
+        logger.warning(f"{inst_id} orderbook out of sync, re-subscribing {args}")
+        await self.unsubscribe(args, self._callback)
+        await self.subscribe(args, self._callback)
+
+    def _callback(self, message) -> None:
+        """
+        处理本连接上的 WebSocket 消息，按 instId 分发到对应订单簿，
+        检测订单簿序列号缺口并触发单产品的重新同步。
+
+        Args:
+            message (str | dict): WebSocket 消息。
+        """
+        recv_ns = time.perf_counter_ns()
+        record(CaptureSource.MDS, message)
+        message = _parse_order_book_message(message)
+        if not message:
+            return
+        inst_id = message["arg"].get("instId")
+        order_book = self._books.get(inst_id)
+        if order_book is None:
+            # 已移除的产品在取消订阅生效前仍可能有推送
+            return
+        if inst_id in self._resync_buffers:
+            if message.get("action") == "update":
+                self._resync_buffers[inst_id][1].append(message)
+                return
+            self._on_resync_snapshot(inst_id, order_book, message)
+            return
+        if not on_orderbook_snapshot_or_update(message, order_book):
+            self._resync_buffers[inst_id] = (time.monotonic(), [message])
+            asyncio.ensure_future(self.resync(inst_id))
+            return
+        mark_book_received(inst_id, recv_ns)
+        notify_state_change(message["arg"]["channel"], inst_id)
+
+    def _on_resync_snapshot(self, inst_id: str, order_book: OrderBook, message: Dict) -> None:
+        """
+        应用重新同步得到的快照，并回放 seqId 晚于快照的缓存增量。
+        """
+        _, buffered = self._resync_buffers.pop(inst_id)
+        if not on_orderbook_snapshot_or_update(message, order_book):
+            self._resync_buffers[inst_id] = (time.monotonic(), [])
+            asyncio.ensure_future(self.resync(inst_id))
+            return
+        for buffered_message in buffered:
+            seq_id = buffered_message["data"][0].get("seqId")
+            if seq_id is not None and seq_id <= order_book.seq_id:
+                continue
+            if not on_orderbook_snapshot_or_update(buffered_message, order_book):
+                self._resync_buffers[inst_id] = (time.monotonic(), [])
+                asyncio.ensure_future(self.resync(inst_id))
+                return
+        logger.info(f"{inst_id} orderbook re-synced at seqId {order_book.seq_id}, "
+                    f"replayed {len(buffered)} buffered messages")
+        notify_state_change(message["arg"]["channel"], inst_id)
 
     async def stop_service(self) -> None:
         """
         停止服务。
         """
-        await self.unsubscribe(self.args, lambda message: print(message))
+        if self._subscribed and self._channels:
+            await self.unsubscribe(self._prepare_args(), lambda message: print(message))
+        self._subscribed = False
         await self.close()
 
-    def _prepare_args(self) -> List[Dict]:
+    def _register(self, inst_ids: List[str], channel: str) -> List[str]:
+        """
+        登记产品的订阅频道并创建订单簿，订单簿同时写入全局 order_books 供策略读取。
+
+        Returns:
+            List[str]: 新登记的交易对 ID。
+        """
+        added = []
+        for inst_id in inst_ids:
+            if inst_id in self._books:
+                continue
+            self._channels[inst_id] = channel
+            self._books[inst_id] = order_books[inst_id] = create_order_book(inst_id, self.compact)
+            added.append(inst_id)
+        return added
+
+    def _prepare_args(self, inst_ids: List[str] = None) -> List[Dict]:
         """
         准备订阅参数。
 
+        Args:
+            inst_ids (List[str]): 只为这些交易对准备参数，默认为全部已登记的产品。
+
         Returns:
             List[Dict]: 订阅参数列表。
         """
-        args = []
-        books5_sub = {
-            "channel": self.channel,
-            "instId": self.inst_id
-        }
-        args.append(books5_sub)
-        return args
+        if inst_ids is None:
+            inst_ids = list(self._channels)
+        return [{"channel": self._channels[inst_id], "instId": inst_id} for inst_id in inst_ids]
+
+
+def create_order_book(inst_id: str, compact: bool = COMPACT_ORDER_BOOK):
+    """
+    创建订单簿。紧凑模式下按产品的 tick_sz / lot_sz 创建 CompactOrderBook。
+
+    Args:
+        inst_id (str): 交易对的 ID。
+        compact (bool): 是否使用 CompactOrderBook。
+    """
+    if compact:
+        return CompactOrderBook.init_from_instrument(InstrumentUtil.get_instrument(inst_id))
+    return OrderBook(inst_id=inst_id)
+
+
+def _parse_order_book_message(message) -> Optional[Dict]:
+    """
+    解析 WebSocket 消息，只返回订单簿频道的推送，其他消息返回 None。
+    订阅确认与其他频道的消息在完整 JSON 解码前即被丢弃。
+
+    Args:
+        message (str | dict): WebSocket 消息。
+    """
+    return decode_message(message, ORDER_BOOK_CHANNELS)
 
 
 def _callback(message) -> None:
@@ -76,33 +255,25 @@ def _callback(message) -> None:
     Args:
         message (dict): WebSocket 消息。
     """
-    # 统一把 str → dict
-    if isinstance(message, str):
-        try:
-            message = json.loads(message)
-        except json.JSONDecodeError:
-            logger.warning("非 JSON 消息：%s", message)
-            return
-
-    arg = message.get("arg")
-    # print(message)
-    if not arg or not arg.get("channel"):
-        return
-    if message.get("event") == "subscribe":
-        return
-    
-    # 如果频道是 books5、books、bbo-tbt、books50-l2-tbt 或 books-l2-tbt，则处理订单簿快照或更新
-    if arg.get("channel") in ["books5", "books", "bbo-tbt", "books50-l2-tbt", "books-l2-tbt"]:
-        on_orderbook_snapshot_or_update(message)
+    record(CaptureSource.MDS, message)
+    message = _parse_order_book_message(message)
+    if message and on_orderbook_snapshot_or_update(message):
+        notify_state_change(message["arg"]["channel"], message["arg"].get("instId"))
         # print(order_books)
 
 
-def on_orderbook_snapshot_or_update(message) -> None:
+def on_orderbook_snapshot_or_update(message, order_book: OrderBook = None) -> bool:
     """
     处理订单簿快照或更新。
+    update 消息的 prevSeqId 必须等于订单簿当前的 seqId，否则说明中间有消息丢失，该消息不会被应用。
+    校验和不一致的消息已经应用到订单簿，只通过返回 False 报告。
+
+    Returns:
+        bool: 订单簿是否与交易所保持同步；出现序列号缺口或校验和不一致时返回 False，需要重新获取快照。
 
     Args:
         message (dict): WebSocket 消息。
+        order_book (OrderBook): 消息对应的订单簿，已由调用方分发时传入；为空时按 instId 在全局 order_books 中查找或创建。
         {
             "arg": {
                 "channel": "books",
@@ -131,93 +302,95 @@ def on_orderbook_snapshot_or_update(message) -> None:
                     ["8446", "95", "0", "3"]
                 ],
                 "ts": "1597026383085",
-                "checksum": -855196043
+                "checksum": -855196043,
+                "prevSeqId": -1,
+                "seqId": 123456
             }]
         }
     """
     arg = message.get("arg")
     inst_id = arg.get("instId")
     action = message.get("action")
-    if inst_id not in order_books:
-        order_books[inst_id] = OrderBook(inst_id=inst_id)
+    if order_book is None:
+        if inst_id not in order_books:
+            order_books[inst_id] = create_order_book(inst_id)
+        order_book = order_books[inst_id]
     data = message.get("data")[0]
-    if data.get("asks"):
-        if action == "snapshot" or not action:
-            ask_list = [OrderBookLevel(price=float(level_info[0]),
-                                       quantity=float(level_info[1]),
-                                       order_count=int(level_info[3]),
-                                       price_string=level_info[0],
-                                       quantity_string=level_info[1],
-                                       order_count_string=level_info[3],
-                                       ) for level_info in data["asks"]]
-            order_books[inst_id].set_asks_on_snapshot(ask_list)
-        if action == "update":
-            for level_info in data["asks"]:
-                order_books[inst_id].set_asks_on_update(
-                    OrderBookLevel(price=float(level_info[0]),
-                                   quantity=float(level_info[1]),
-                                   order_count=int(level_info[3]),
-                                   price_string=level_info[0],
-                                   quantity_string=level_info[1],
-                                   order_count_string=level_info[3],
-                                   )
-                )
-    if data.get("bids"):
-        if action == "snapshot" or not action:
-            bid_list = [OrderBookLevel(price=float(level_info[0]),
-                                       quantity=float(level_info[1]),
-                                       order_count=int(level_info[3]),
-                                       price_string=level_info[0],
-                                       quantity_string=level_info[1],
-                                       order_count_string=level_info[3],
-                                       ) for level_info in data["bids"]]
-            order_books[inst_id].set_bids_on_snapshot(bid_list)
-        if action == "update":
-            for level_info in data["bids"]:
-                order_books[inst_id].set_bids_on_update(
-                    OrderBookLevel(price=float(level_info[0]),
-                                   quantity=float(level_info[1]),
-                                   order_count=int(level_info[3]),
-                                   price_string=level_info[0],
-                                   quantity_string=level_info[1],
-                                   order_count_string=level_info[3],
-                                   )
-                )
+    seq_id = data.get("seqId")
+    if action == "update" and seq_id is not None and order_book.seq_id >= 0 \
+            and data.get("prevSeqId") != order_book.seq_id:
+        logger.warning(f"{inst_id} orderbook sequence gap: prevSeqId {data.get('prevSeqId')}, "
+                       f"local seqId {order_book.seq_id}")
+        return False
+    # 档位直接以推送中的 [px, sz, _, cnt] 列表写入订单簿，不创建逐档对象
+    if action == "update":
+        if data.get("asks"):
+            order_book.apply_asks_update(data["asks"])
+        if data.get("bids"):
+            order_book.apply_bids_update(data["bids"])
+    else:
+        order_book.apply_asks_snapshot(data.get("asks", []))
+        order_book.apply_bids_snapshot(data.get("bids", []))
+    if seq_id is not None:
+        order_book.set_seq_id(seq_id)
     if data.get("ts"):
-        order_books[inst_id].set_timestamp(int(data["ts"]))
+        order_book.set_timestamp(int(data["ts"]))
     if data.get("checksum"):
-        order_books[inst_id].set_exch_check_sum(data["checksum"])
+        order_book.set_exch_check_sum(data["checksum"])
+        # 每条交易所消息只校验一次，未触及前 25 档的增量直接复用缓存的校验和
+        if not order_book.do_check_sum():
+            logger.warning(f"{inst_id} orderbook checksum mismatch with exchange checksum {data['checksum']}")
+            return False
+    return True
 
 
-class ChecksumThread(threading.Thread):
+class ChecksumTask:
     """
-    这个类用于轮询校验订单簿的校验和。
+    这个类用于在事件循环中以 asyncio 任务的形式校验订单簿的校验和。
+    订单簿的校验和在每条交易所消息到达时已计算并缓存，这里只比较缓存结果，不重新计算 CRC。
     """
-    def __init__(self, wss_mds: WssMarketDataService) -> None:
+    def __init__(self, wss_mds: WssMarketDataService, interval_sec: float = 1,
+                 resync_timeout_sec: float = ORDER_BOOK_RESYNC_TIMEOUT_SEC) -> None:
         """
-        初始化 ChecksumThread 类。
+        初始化 ChecksumTask 类。
         Args:
             wss_mds (WssMarketDataService): WssMarketDataService 实例。
+            interval_sec (float): 两次检查之间的间隔秒数。
+            resync_timeout_sec (float): 重新同步超过该秒数仍未收到快照时，再次发起重新同步。
         """
         self.wss_mds = wss_mds
-        super().__init__()
+        self.interval_sec = interval_sec
+        self.resync_timeout_sec = resync_timeout_sec
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> asyncio.Task:
+        """
+        在当前事件循环中启动校验任务。
+        """
+        self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
 
     async def run(self) -> None:
         """
-        在后台线程中不断轮询校验所有订单簿（OrderBook）的校验和是否正确。
+        不断检查本服务的订单簿（OrderBook）与其最近一次交易所校验和是否一致。
         """
         while 1:
             try:
-                for inst_id, order_book in order_books.items():
-                    order_book: OrderBook
-                    if order_book.do_check_sum():
+                for inst_id, order_book in self.wss_mds.get_order_books().items():
+                    if self.wss_mds.is_resyncing(inst_id):
+                        if self.wss_mds.is_resyncing(inst_id, self.resync_timeout_sec):
+                            continue
+                    elif order_book.do_check_sum():
                         continue
-                    # 如果某个订单簿的校验和失败，则重启 WebSocket 服务（WssMarketDataService）来重新获取数据。
-                    await self.wss_mds.stop_service()
-                    await asyncio.sleep(3)
-                    await self.wss_mds.run_service()
-                    break
-                await asyncio.sleep(5)
+                    # 如果某个订单簿的校验和失败或重新同步超时，则只对该产品重新订阅以获取新的快照。
+                    await self.wss_mds.resync(inst_id)
+                await asyncio.sleep(self.interval_sec)
             except asyncio.CancelledError:
                 print("Checksum task cancelled.")
                 break
@@ -231,9 +404,10 @@ async def main():
     market_data_service = WssMarketDataService(url=url, inst_id="BTC-USDT-SWAP", channel="books")
     await market_data_service.start()
     await market_data_service.run_service()
-    check_sum = ChecksumThread(market_data_service)
-    await check_sum.start()
+    check_sum = ChecksumTask(market_data_service)
+    check_sum.start()
     await asyncio.sleep(30)
+    await check_sum.stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,236 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from okx_market_maker.market_data_service.model.Tickers import Ticker, BRIDGE_QUOTE_CCY_LIST
+from okx_market_maker.utils.OkxEnum import InstType
+
+# 推送字段 -> 列名，顺序即列下标
+TICKER_FIELDS = (
+    ("last", "last"), ("lastSz", "last_sz"), ("askPx", "ask_px"), ("askSz", "ask_sz"), ("bidPx", "bid_px"),
+    ("bidSz", "bid_sz"), ("open24h", "open24h"), ("high24h", "high24h"), ("low24h", "low24h"),
+    ("volCcy24h", "vol_ccy24h"), ("vol24h", "vol24h"), ("sodUtc0", "sod_utc0"), ("sodUtc8", "sod_utc8"),
+)
+COLUMN_INDEX = {column: i for i, (_, column) in enumerate(TICKER_FIELDS)}
+_FIELD_KEYS = tuple(key for key, _ in TICKER_FIELDS)
+_LAST, _ASK_PX, _BID_PX = COLUMN_INDEX["last"], COLUMN_INDEX["ask_px"], COLUMN_INDEX["bid_px"]
+
+
+@dataclass
+class ColumnarTickers:
+    """
+    列式存储的 Tickers，对外接口与 Tickers 一致。
+
+    每个 instId 分配一个固定的行号，价格、数量、成交量存放在 float64 列中（列连续存储），ts 存放在 int64 列中。
+    刷新时跳过 ts 未变化的行，其余行的字符串字段一次性交给 NumPy 批量解析并按行号写入。
+    columns() 返回只读、零拷贝的列视图；新增产品导致扩容后旧视图不再更新，可通过 universe_version 判断。
+    通过 copy_and_update 发布的快照不再修改，其列视图在快照生命周期内保持一致；
+    快照在生成时即解析全部币种的换算路径，读取方查询路径不会写入快照共享的缓存。
+    """
+    _index: Dict[str, int] = field(default_factory=dict)
+    _inst_ids: List[str] = field(default_factory=list)
+    _inst_types: List[InstType] = field(default_factory=list)
+    _ts_strings: List[Optional[str]] = field(default_factory=list)
+    _values: np.ndarray = field(default_factory=lambda: np.zeros((0, len(TICKER_FIELDS)), order="F"))
+    _ts: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    # 币种 -> 换算路径上的行号，None 表示无法换算
+    _conversion_paths: Dict[str, Optional[Tuple[int, ...]]] = field(default_factory=dict)
+    # 币种列表 -> 换算路径的两段行号数组与可换算标记，供批量估值复用；只属于本对象，生成快照时不复制
+    _gather_indices: Dict[Tuple[str, ...], Tuple[np.ndarray, np.ndarray, np.ndarray]] = field(default_factory=dict)
+    universe_version: int = 0
+    version: int = 0
+    # 已解析全部币种的换算路径（copy_and_update 生成的快照），此时查询不再写入路径缓存
+    _paths_complete: bool = False
+
+    def __len__(self) -> int:
+        return len(self._inst_ids)
+
+    def update_from_json(self, json_response):
+        if json_response.get("code") != '0':
+            raise ValueError(f"Unsuccessful ticker response {json_response}")
+        index = self._index
+        ts_strings = self._ts_strings
+        rows = []
+        changed = []
+        ts_list = []
+        universe_changed = False
+        for info in json_response["data"]:
+            inst_id = info["instId"]
+            i = index.get(inst_id)
+            if i is None:
+                i = self._append(inst_id, InstType(info["instType"]))
+                universe_changed = True
+            ts = info.get("ts") or "0"
+            if ts_strings[i] == ts:
+                continue
+            ts_strings[i] = ts
+            changed.append(i)
+            ts_list.append(ts)
+            rows.append([info.get(key) or "0" for key in _FIELD_KEYS])
+        if universe_changed:
+            self._grow()
+            self._conversion_paths.clear()
+            self._gather_indices.clear()
+            self._paths_complete = False
+            self.universe_version += 1
+        if changed:
+            self._values[changed] = np.array(rows, dtype=np.float64)
+            self._ts[changed] = np.array(ts_list, dtype=np.int64)
+        self.version += 1
+
+    def copy_and_update(self, json_response) -> "ColumnarTickers":
+        """
+        复制各列后应用本次行情，返回新的快照，自身保持不变。换算路径使用行号，产品集合不变时直接沿用，
+        否则重新解析全部币种的换算路径。
+
+        Args:
+            json_response (dict): REST tickers 响应。
+        Returns:
+            ColumnarTickers: 新的快照。
+        """
+        if json_response.get("code") != '0':
+            raise ValueError(f"Unsuccessful ticker response {json_response}")
+        # 只有完整解析过的快照才沿用其路径，这类快照的路径缓存不会被读取方修改
+        conversion_paths = dict(self._conversion_paths) if self._paths_complete else {}
+        snapshot = ColumnarTickers(dict(self._index), list(self._inst_ids), list(self._inst_types),
+                                   list(self._ts_strings), self._values.copy(order="F"), self._ts.copy(),
+                                   conversion_paths, {}, self.universe_version, self.version, self._paths_complete)
+        snapshot.update_from_json(json_response)
+        if not snapshot._paths_complete:
+            snapshot._resolve_all_conversion_paths()
+        return snapshot
+
+    def _resolve_all_conversion_paths(self) -> None:
+        """
+        解析所有可能换算的币种（各交易对的基础币种与 USDT）的路径，之后的查询只读。
+        """
+        ccy_set = {inst_id.split("-")[0] for inst_id in self._inst_ids}
+        ccy_set.add("USDT")
+        self._conversion_paths = {ccy: self._resolve_conversion_path(ccy) for ccy in ccy_set}
+        self._paths_complete = True
+
+    def _append(self, inst_id: str, inst_type: InstType) -> int:
+        i = len(self._inst_ids)
+        self._index[inst_id] = i
+        self._inst_ids.append(inst_id)
+        self._inst_types.append(inst_type)
+        self._ts_strings.append(None)
+        return i
+
+    def _grow(self) -> None:
+        size = len(self._inst_ids)
+        if size <= len(self._ts):
+            return
+        capacity = max(size, 2 * len(self._ts), 64)
+        values = np.zeros((capacity, len(TICKER_FIELDS)), order="F")
+        values[:len(self._values)] = self._values
+        ts = np.zeros(capacity, dtype=np.int64)
+        ts[:len(self._ts)] = self._ts
+        self._values, self._ts = values, ts
+
+    def index_of(self, inst_id: str) -> Optional[int]:
+        return self._index.get(inst_id)
+
+    def inst_ids(self) -> List[str]:
+        return list(self._inst_ids)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        返回各列的只读零拷贝视图，第 i 行对应 inst_ids()[i]。
+        """
+        size = len(self._inst_ids)
+        views = {column: self._values[:size, j] for column, j in COLUMN_INDEX.items()}
+        views["ts"] = self._ts[:size]
+        for view in views.values():
+            view.flags.writeable = False
+        return views
+
+    def get_ticker_by_inst_id(self, inst_id: str) -> Optional[Ticker]:
+        i = self._index.get(inst_id)
+        if i is None:
+            return None
+        row = self._values[i]
+        return Ticker(self._inst_types[i], inst_id, ts=int(self._ts[i]),
+                      **{column: float(row[j]) for column, j in COLUMN_INDEX.items()})
+
+    def get_conversion_path(self, ccy: str) -> Optional[Tuple[int, ...]]:
+        """
+        返回币种换算为 USDT 所经过的行号，USDT 本身为空元组，无法换算时为 None。
+        """
+        if ccy in self._conversion_paths:
+            return self._conversion_paths[ccy]
+        if self._paths_complete:
+            # 能换算的币种必然是某个交易对的基础币种，已全部解析
+            return None
+        path = self._resolve_conversion_path(ccy)
+        self._conversion_paths[ccy] = path
+        return path
+
+    def _resolve_conversion_path(self, ccy: str) -> Optional[Tuple[int, ...]]:
+        if ccy == "USDT":
+            return ()
+        index = self._index
+        i = index.get(f"{ccy}-USDT")
+        if i is not None:
+            return i,
+        for quote in BRIDGE_QUOTE_CCY_LIST:
+            i = index.get(f"{ccy}-{quote}")
+            j = index.get(f"{quote}-USDT")
+            if i is not None and j is not None:
+                return i, j
+        return None
+
+    def _price(self, i: int, use_mid: bool) -> float:
+        row = self._values[i]
+        return float((row[_ASK_PX] + row[_BID_PX]) / 2) if use_mid else float(row[_LAST])
+
+    def get_usdt_price_by_ccy(self, ccy: str, use_mid: bool = True) -> float:
+        path = self.get_conversion_path(ccy)
+        if path is None:
+            return 0
+        price = 1
+        for i in path:
+            price *= self._price(i, use_mid)
+        return price
+
+    def get_usdt_prices_by_ccy(self, ccy_list: Iterable[str], use_mid: bool = True) -> Dict[str, float]:
+        """
+        向量化计算多个币种的 USDT 价格：按换算路径的行号从价格列中取值并相乘。
+
+        Args:
+            ccy_list (Iterable[str]): 币种列表。
+            use_mid (bool): 使用买卖中间价，否则使用最新成交价。
+        Returns:
+            Dict[str, float]: 币种 -> USDT 价格，无法换算的币种为 0。
+        """
+        ccy_list = tuple(ccy_list)
+        size = len(self._inst_ids)
+        # 行号 size 为常数 1，用于补齐不足两段的路径；无法换算的币种结果置 0
+        if use_mid:
+            prices = np.append((self._values[:size, _ASK_PX] + self._values[:size, _BID_PX]) / 2, 1.0)
+        else:
+            prices = np.append(self._values[:size, _LAST], 1.0)
+        indices = self._gather_indices.get(ccy_list)
+        if indices is None:
+            if len(self._gather_indices) >= 64:
+                self._gather_indices.clear()
+            indices = self._gather_indices[ccy_list] = self._build_gather_indices(ccy_list, size)
+        first, second, found = indices
+        result = np.where(found, prices[first] * prices[second], 0.0)
+        return dict(zip(ccy_list, result.tolist()))
+
+    def _build_gather_indices(self, ccy_list: Tuple[str, ...], size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        first = np.full(len(ccy_list), size)
+        second = np.full(len(ccy_list), size)
+        found = np.ones(len(ccy_list), dtype=bool)
+        for k, ccy in enumerate(ccy_list):
+            path = self.get_conversion_path(ccy)
+            if path is None:
+                found[k] = False
+                continue
+            if path:
+                first[k] = path[0]
+            if len(path) > 1:
+                second[k] = path[1]
+        return first, second, found
@@ -0,0 +1,266 @@
+import sys
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import List
+
+from okx_market_maker.market_data_service.model.Instrument import Instrument
+from okx_market_maker.market_data_service.model.OrderBook import OrderBookLevel, signed_crc32, CHECK_SUM_DEPTH
+
+
+def _int_array() -> array:
+    return array("q")
+
+
+@dataclass
+class CompactOrderBook:
+    """
+    定点整数表示的紧凑订单簿，对外接口与 OrderBook 一致。
+
+    价格以 tick 数（price / tick_sz）、数量以 lot 数（size / lot_sz）存储在并行的 int64 array 中，
+    不为每个档位创建对象；比较为精确整数比较。买单存负 tick 数，两侧均升序，下标 0 即最优价。
+    读取档位时才按需构造 OrderBookLevel，价格/数量字符串由 tick_sz / lot_sz 还原，
+    与交易所推送的去尾零格式一致，用于校验和计算；校验和与 OrderBook 一样按前 25 档是否变动缓存。
+    """
+    inst_id: str
+    tick_sz: Decimal
+    lot_sz: Decimal
+    _bid_ticks: array = field(default_factory=_int_array)
+    _bid_lots: array = field(default_factory=_int_array)
+    _bid_counts: array = field(default_factory=_int_array)
+    _ask_ticks: array = field(default_factory=_int_array)
+    _ask_lots: array = field(default_factory=_int_array)
+    _ask_counts: array = field(default_factory=_int_array)
+    timestamp: int = 0
+    exch_check_sum: int = 0
+    seq_id: int = -1
+    _check_sum_dirty: bool = True
+    _check_sum_cache: int = 0
+
+    def __post_init__(self):
+        self._tick_float = float(self.tick_sz)
+        self._lot_float = float(self.lot_sz)
+
+    @classmethod
+    def init_from_instrument(cls, instrument: Instrument):
+        if not instrument.tick_sz or not instrument.lot_sz:
+            raise ValueError(f"{instrument.inst_id} has no tick_sz / lot_sz, compact order book not applicable.")
+        return CompactOrderBook(inst_id=instrument.inst_id, tick_sz=instrument.tick_sz, lot_sz=instrument.lot_sz)
+
+    def ticks_from_price(self, price: float) -> int:
+        return round(float(price) / self._tick_float)
+
+    def lots_from_size(self, size: float) -> int:
+        return round(float(size) / self._lot_float)
+
+    def price_from_ticks(self, ticks: int) -> str:
+        return self._format(ticks * self.tick_sz)
+
+    def size_from_lots(self, lots: int) -> str:
+        return self._format(lots * self.lot_sz)
+
+    @staticmethod
+    def _format(value: Decimal) -> str:
+        string = format(value, "f")
+        if "." in string:
+            string = string.rstrip("0").rstrip(".")
+        return string
+
+    def set_bids_on_snapshot(self, order_book_level_list: List[OrderBookLevel]) -> None:
+        levels = sorted(order_book_level_list, reverse=True)
+        self._bid_ticks = array("q", [-self.ticks_from_price(level.price) for level in levels])
+        self._bid_lots = array("q", [self.lots_from_size(level.quantity) for level in levels])
+        self._bid_counts = array("q", [level.order_count for level in levels])
+        self._check_sum_dirty = True
+
+    def set_asks_on_snapshot(self, order_book_level_list: List[OrderBookLevel]) -> None:
+        levels = sorted(order_book_level_list, reverse=False)
+        self._ask_ticks = array("q", [self.ticks_from_price(level.price) for level in levels])
+        self._ask_lots = array("q", [self.lots_from_size(level.quantity) for level in levels])
+        self._ask_counts = array("q", [level.order_count for level in levels])
+        self._check_sum_dirty = True
+
+    def set_bids_on_update(self, order_book_level: OrderBookLevel) -> None:
+        self._mark_check_sum(self._apply_level(self._bid_ticks, self._bid_lots, self._bid_counts,
+                                               -self.ticks_from_price(order_book_level.price),
+                                               self.lots_from_size(order_book_level.quantity),
+                                               order_book_level.order_count))
+
+    def set_asks_on_update(self, order_book_level: OrderBookLevel) -> None:
+        self._mark_check_sum(self._apply_level(self._ask_ticks, self._ask_lots, self._ask_counts,
+                                               self.ticks_from_price(order_book_level.price),
+                                               self.lots_from_size(order_book_level.quantity),
+                                               order_book_level.order_count))
+
+    def apply_bids_snapshot(self, level_info_list: List[List[str]]) -> None:
+        """
+        直接用推送中的 [px, sz, _, cnt] 列表重建买单。
+        """
+        self._bid_ticks, self._bid_lots, self._bid_counts = self._build_side(level_info_list, -1)
+        self._check_sum_dirty = True
+
+    def apply_asks_snapshot(self, level_info_list: List[List[str]]) -> None:
+        """
+        直接用推送中的 [px, sz, _, cnt] 列表重建卖单。
+        """
+        self._ask_ticks, self._ask_lots, self._ask_counts = self._build_side(level_info_list, 1)
+        self._check_sum_dirty = True
+
+    def apply_bids_update(self, level_info_list: List[List[str]]) -> int:
+        """
+        将推送中的买单增量逐档应用到订单簿，数量为 "0" 表示删档。
+
+        Returns:
+            int: 本次增量触及的最靠前档位下标，无增量时为 sys.maxsize。
+        """
+        return self._mark_check_sum(self._apply_level_infos(self._bid_ticks, self._bid_lots, self._bid_counts,
+                                                            level_info_list, -1))
+
+    def apply_asks_update(self, level_info_list: List[List[str]]) -> int:
+        """
+        将推送中的卖单增量逐档应用到订单簿，数量为 "0" 表示删档。
+
+        Returns:
+            int: 本次增量触及的最靠前档位下标，无增量时为 sys.maxsize。
+        """
+        return self._mark_check_sum(self._apply_level_infos(self._ask_ticks, self._ask_lots, self._ask_counts,
+                                                            level_info_list, 1))
+
+    def _build_side(self, level_info_list: List[List[str]], sign: int):
+        level_info_list = [level_info for level_info in level_info_list if level_info[1] != "0"]
+        keys = [sign * self.ticks_from_price(level_info[0]) for level_info in level_info_list]
+        order = range(len(keys))
+        if any(keys[i] > keys[i + 1] for i in range(len(keys) - 1)):
+            order = sorted(order, key=keys.__getitem__)
+        return (array("q", [keys[i] for i in order]),
+                array("q", [self.lots_from_size(level_info_list[i][1]) for i in order]),
+                array("q", [int(level_info_list[i][3]) for i in order]))
+
+    def _apply_level_infos(self, ticks: array, lots: array, counts: array, level_info_list: List[List[str]],
+                           sign: int) -> int:
+        top = sys.maxsize
+        for level_info in level_info_list:
+            lot = 0 if level_info[1] == "0" else self.lots_from_size(level_info[1])
+            i = self._apply_level(ticks, lots, counts, sign * self.ticks_from_price(level_info[0]), lot,
+                                  int(level_info[3]))
+            if i < top:
+                top = i
+        return top
+
+    @staticmethod
+    def _apply_level(ticks: array, lots: array, counts: array, key: int, lot: int, count: int) -> int:
+        i = bisect_left(ticks, key)
+        if i < len(ticks) and ticks[i] == key:
+            if lot == 0:
+                del ticks[i]
+                del lots[i]
+                del counts[i]
+            else:
+                lots[i] = lot
+                counts[i] = count
+        elif lot != 0:
+            ticks.insert(i, key)
+            lots.insert(i, lot)
+            counts.insert(i, count)
+        return i
+
+    def set_timestamp(self, timestamp: int) -> None:
+        self.timestamp = timestamp
+
+    def set_exch_check_sum(self, checksum: int) -> None:
+        self.exch_check_sum = checksum
+
+    def set_seq_id(self, seq_id: int) -> None:
+        self.seq_id = seq_id
+
+    def _mark_check_sum(self, top_index: int) -> int:
+        if top_index < CHECK_SUM_DEPTH:
+            self._check_sum_dirty = True
+        return top_index
+
+    def _current_check_sum(self):
+        if not self._check_sum_dirty:
+            return self._check_sum_cache
+        fields = []
+        for i in range(min(max(len(self._bid_ticks), len(self._ask_ticks)), CHECK_SUM_DEPTH)):
+            if len(self._bid_ticks) > i:
+                fields.append(self.price_from_ticks(-self._bid_ticks[i]))
+                fields.append(self.size_from_lots(self._bid_lots[i]))
+            if len(self._ask_ticks) > i:
+                fields.append(self.price_from_ticks(self._ask_ticks[i]))
+                fields.append(self.size_from_lots(self._ask_lots[i]))
+        self._check_sum_cache = signed_crc32(":".join(fields))
+        self._check_sum_dirty = False
+        return self._check_sum_cache
+
+    def do_check_sum(self) -> bool:
+        if not self.exch_check_sum:
+            return True  # ignore check sum
+        return self._current_check_sum() == self.exch_check_sum
+
+    def memory_bytes(self) -> int:
+        """
+        返回档位缓冲区占用的字节数。
+        """
+        return sum(buffer.buffer_info()[1] * buffer.itemsize for buffer in (
+            self._bid_ticks, self._bid_lots, self._bid_counts, self._ask_ticks, self._ask_lots, self._ask_counts))
+
+    def _check_empty_array(self, order_book_array):
+        if not order_book_array:
+            raise IndexError(f"Orderbook for {self.inst_id}: either bids or asks array not initiated.")
+
+    def _bid_level(self, i: int) -> OrderBookLevel:
+        price_string = self.price_from_ticks(-self._bid_ticks[i])
+        quantity_string = self.size_from_lots(self._bid_lots[i])
+        return OrderBookLevel(price=float(price_string), quantity=float(quantity_string),
+                              order_count=self._bid_counts[i], price_string=price_string,
+                              quantity_string=quantity_string, order_count_string=str(self._bid_counts[i]))
+
+    def _ask_level(self, i: int) -> OrderBookLevel:
+        price_string = self.price_from_ticks(self._ask_ticks[i])
+        quantity_string = self.size_from_lots(self._ask_lots[i])
+        return OrderBookLevel(price=float(price_string), quantity=float(quantity_string),
+                              order_count=self._ask_counts[i], price_string=price_string,
+                              quantity_string=quantity_string, order_count_string=str(self._ask_counts[i]))
+
+    def best_bid(self) -> OrderBookLevel:
+        self._check_empty_array(self._bid_ticks)
+        return self._bid_level(0)
+
+    def best_ask(self) -> OrderBookLevel:
+        self._check_empty_array(self._ask_ticks)
+        return self._ask_level(0)
+
+    def best_bid_tick(self) -> int:
+        self._check_empty_array(self._bid_ticks)
+        return -self._bid_ticks[0]
+
+    def best_ask_tick(self) -> int:
+        self._check_empty_array(self._ask_ticks)
+        return self._ask_ticks[0]
+
+    def best_bid_price(self) -> float:
+        return float(self.price_from_ticks(self.best_bid_tick()))
+
+    def best_ask_price(self) -> float:
+        return float(self.price_from_ticks(self.best_ask_tick()))
+
+    def bid_by_level(self, level: int) -> OrderBookLevel:
+        self._check_empty_array(self._bid_ticks)
+        if level <= 0:
+            level = 1
+        if level > len(self._bid_ticks):
+            level = 0
+        return self._bid_level(level - 1)
+
+    def ask_by_level(self, level: int) -> OrderBookLevel:
+        self._check_empty_array(self._ask_ticks)
+        if level <= 0:
+            level = 1
+        if level > len(self._ask_ticks):
+            level = 0
+        return self._ask_level(level - 1)
+
+    def middle_price(self) -> float:
+        return (self.best_bid_price() + self.best_ask_price()) / 2
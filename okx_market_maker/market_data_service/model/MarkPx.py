@@ -23,21 +23,44 @@ class MarkPx:
 
 @dataclass
 class MarkPxCache:
+    """
+    标记价格缓存。跨线程发布时使用 copy / copy_and_update 生成新的快照并整体替换 mark_px_container[0]，
+    已发布的快照不再修改；version 每次更新加一。
+    """
     _mark_px_map: Dict[str, MarkPx] = field(default_factory=lambda: dict())
+    version: int = 0
 
     def update_from_json(self, json_response):
-        if json_response.get("code") != "0":
+        # REST 响应带 code，WebSocket mark-price 推送没有 code
+        if json_response.get("code", "0") != "0":
             return
         data_list = json_response["data"]
         for data in data_list:
             mark_px = MarkPx.init_from_json(data)
             self._mark_px_map[mark_px.inst_id] = mark_px
+        self.version += 1
+
+    def copy(self) -> "MarkPxCache":
+        return MarkPxCache(dict(self._mark_px_map), self.version)
+
+    def copy_and_update(self, *json_responses) -> "MarkPxCache":
+        """
+        返回应用了一个或多个响应 / 推送后的新 MarkPxCache，自身保持不变。
+        """
+        snapshot = self.copy()
+        for json_response in json_responses:
+            snapshot.update_from_json(json_response)
+        return snapshot
 
     def get_mark_px(self, inst_id) -> MarkPx:
         return self._mark_px_map.get(inst_id)
 
+    def remove_mark_px(self, inst_id) -> None:
+        if self._mark_px_map.pop(inst_id, None) is not None:
+            self.version += 1
+
     def get_usdt_to_usd_rate(self) -> float:
-        if self._mark_px_map.get("BTC-USD-SWAP") or self._mark_px_map.get("BTC-USDT-SWAP"):
+        if not self._mark_px_map.get("BTC-USD-SWAP") or not self._mark_px_map.get("BTC-USDT-SWAP"):
             return 1
         usdt_to_usd = self._mark_px_map["BTC-USD-SWAP"].mark_px / self._mark_px_map["BTC-USDT-SWAP"].mark_px
         return usdt_to_usd
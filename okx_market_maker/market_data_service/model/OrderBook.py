@@ -1,6 +1,18 @@
 from dataclasses import field, dataclass
+from bisect import bisect_left
 from typing import List
 import binascii
+import sys
+
+CHECK_SUM_DEPTH = 25  # OKX 订单簿校验和覆盖买卖各前 25 档
+
+
+def signed_crc32(bid_ask_string: str) -> int:
+    """
+    按 OKX 订单簿校验规则计算 CRC32，并转换为有符号 32 位整数。
+    """
+    crc = binascii.crc32(bid_ask_string.encode()) & 0xffffffff  # Calculate CRC32 as unsigned integer
+    return crc if crc < 0x80000000 else crc - 0x100000000  # Convert to signed integer
 
 
 @dataclass
@@ -41,48 +53,129 @@ class OrderBook:
     """
     这个类用于封装订单簿的所有相关信息。
     包括买单、卖单、时间戳等信息。
+
+    买卖两侧各自维护一个与价格档位一一对应的有序价格索引（买单为负价格，卖单为正价格，均升序），
+    通过 bisect 定位档位，新增、替换、删除的查找均为 O(log n)，最优价读取为 O(1)。
+    档位直接保存 WebSocket 推送中解码出的 [px, sz, _, cnt] 列表，不为每个档位创建对象，
+    只有读取档位时才转换为 OrderBookLevel。
+    校验和结果会被缓存，只有快照或触及前 25 档的增量才会将其标记为失效。
     """
     inst_id: str
-    _bids: List[OrderBookLevel] = field(default_factory=lambda: list())
-    _asks: List[OrderBookLevel] = field(default_factory=lambda: list())
+    _bids: List[List[str]] = field(default_factory=lambda: list())
+    _asks: List[List[str]] = field(default_factory=lambda: list())
+    _bid_keys: List[float] = field(default_factory=lambda: list())
+    _ask_keys: List[float] = field(default_factory=lambda: list())
     timestamp: int = 0
     exch_check_sum: int = 0
+    seq_id: int = -1
+    _check_sum_dirty: bool = True
+    _check_sum_cache: int = 0
+
+    @staticmethod
+    def _to_level_info(order_book_level: OrderBookLevel) -> List[str]:
+        return [order_book_level.price_string, order_book_level.quantity_string, "0",
+                order_book_level.order_count_string]
+
+    @staticmethod
+    def _to_level(level_info: List[str]) -> OrderBookLevel:
+        return OrderBookLevel(price=float(level_info[0]), quantity=float(level_info[1]),
+                              order_count=int(level_info[3]), price_string=level_info[0],
+                              quantity_string=level_info[1], order_count_string=level_info[3])
 
     def set_bids_on_snapshot(self, order_book_level_list: List[OrderBookLevel]) -> None:
-        self._bids = sorted(order_book_level_list, reverse=True)
+        levels = sorted(order_book_level_list, reverse=True)
+        self._bids = [self._to_level_info(level) for level in levels]
+        self._bid_keys = [-level.price for level in levels]
+        self._check_sum_dirty = True
 
     def set_asks_on_snapshot(self, order_book_level_list: List[OrderBookLevel]) -> None:
-        self._asks = sorted(order_book_level_list, reverse=False)
+        levels = sorted(order_book_level_list, reverse=False)
+        self._asks = [self._to_level_info(level) for level in levels]
+        self._ask_keys = [level.price for level in levels]
+        self._check_sum_dirty = True
 
     def set_bids_on_update(self, order_book_level: OrderBookLevel) -> None:
-        if not self._bids or self._bids[-1] > order_book_level:
-            self._bids.append(order_book_level)
-        else:
-            for i in range(len(self._bids)):
-                if order_book_level > self._bids[i]:
-                    self._bids.insert(i, order_book_level)
-                    break
-                elif order_book_level == self._bids[i]:
-                    if order_book_level.quantity == 0:
-                        self._bids.pop(i)
-                    else:
-                        self._bids[i] = order_book_level
-                    break
+        self._mark_check_sum(self._apply_level(self._bids, self._bid_keys, -order_book_level.price,
+                                               self._to_level_info(order_book_level),
+                                               order_book_level.quantity == 0))
 
     def set_asks_on_update(self, order_book_level: OrderBookLevel) -> None:
-        if not self._asks or self._asks[-1] < order_book_level:
-            self._asks.append(order_book_level)
-        else:
-            for i in range(len(self._asks)):
-                if order_book_level < self._asks[i]:
-                    self._asks.insert(i, order_book_level)
-                    break
-                elif order_book_level == self._asks[i]:
-                    if order_book_level.quantity == 0:
-                        self._asks.pop(i)
-                    else:
-                        self._asks[i] = order_book_level
-                    break
+        self._mark_check_sum(self._apply_level(self._asks, self._ask_keys, order_book_level.price,
+                                               self._to_level_info(order_book_level),
+                                               order_book_level.quantity == 0))
+
+    def apply_bids_snapshot(self, level_info_list: List[List[str]]) -> None:
+        """
+        直接用推送中的 [px, sz, _, cnt] 列表重建买单，交易所已按价格降序排列时不再排序。
+        """
+        self._bids, self._bid_keys = self._sorted_levels(level_info_list, -1)
+        self._check_sum_dirty = True
+
+    def apply_asks_snapshot(self, level_info_list: List[List[str]]) -> None:
+        """
+        直接用推送中的 [px, sz, _, cnt] 列表重建卖单，交易所已按价格升序排列时不再排序。
+        """
+        self._asks, self._ask_keys = self._sorted_levels(level_info_list, 1)
+        self._check_sum_dirty = True
+
+    def apply_bids_update(self, level_info_list: List[List[str]]) -> int:
+        """
+        将推送中的买单增量逐档应用到订单簿，数量为 "0" 表示删档。
+
+        Returns:
+            int: 本次增量触及的最靠前档位下标，无增量时为 sys.maxsize。
+        """
+        return self._mark_check_sum(self._apply_level_infos(self._bids, self._bid_keys, level_info_list, -1))
+
+    def apply_asks_update(self, level_info_list: List[List[str]]) -> int:
+        """
+        将推送中的卖单增量逐档应用到订单簿，数量为 "0" 表示删档。
+
+        Returns:
+            int: 本次增量触及的最靠前档位下标，无增量时为 sys.maxsize。
+        """
+        return self._mark_check_sum(self._apply_level_infos(self._asks, self._ask_keys, level_info_list, 1))
+
+    @staticmethod
+    def _sorted_levels(level_info_list: List[List[str]], sign: int):
+        level_info_list = [level_info for level_info in level_info_list if level_info[1] != "0"]
+        keys = [sign * float(level_info[0]) for level_info in level_info_list]
+        if any(keys[i] > keys[i + 1] for i in range(len(keys) - 1)):
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            level_info_list = [level_info_list[i] for i in order]
+            keys = [keys[i] for i in order]
+        return level_info_list, keys
+
+    @classmethod
+    def _apply_level_infos(cls, levels: List[List[str]], keys: List[float], level_info_list: List[List[str]],
+                           sign: int) -> int:
+        top = sys.maxsize
+        for level_info in level_info_list:
+            i = cls._apply_level(levels, keys, sign * float(level_info[0]), level_info, level_info[1] == "0")
+            if i < top:
+                top = i
+        return top
+
+    @staticmethod
+    def _apply_level(levels: List[List[str]], keys: List[float], key: float, level_info: List[str],
+                     is_delete: bool) -> int:
+        """
+        在有序价格索引中定位档位并应用增量：删档时移除已存在的档位，已存在则替换，否则插入。
+
+        Returns:
+            int: 受影响档位的下标（从 0 开始），用于判断增量是否触及盘口前若干档。
+        """
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            if is_delete:
+                del keys[i]
+                del levels[i]
+            else:
+                levels[i] = level_info
+        elif not is_delete:
+            keys.insert(i, key)
+            levels.insert(i, level_info)
+        return i
 
     def set_timestamp(self, timestamp: int) -> None:
         self.timestamp = timestamp
@@ -90,20 +183,26 @@ class OrderBook:
     def set_exch_check_sum(self, checksum: int) -> None:
         self.exch_check_sum = checksum
 
+    def set_seq_id(self, seq_id: int) -> None:
+        self.seq_id = seq_id
+
+    def _mark_check_sum(self, top_index: int) -> int:
+        if top_index < CHECK_SUM_DEPTH:
+            self._check_sum_dirty = True
+        return top_index
+
     def _current_check_sum(self):
-        bid_ask_string = ""
-        for i in range(max(len(self._bids), len(self._asks))):
+        if not self._check_sum_dirty:
+            return self._check_sum_cache
+        fields = []
+        for i in range(min(max(len(self._bids), len(self._asks)), CHECK_SUM_DEPTH)):
             if len(self._bids) > i:
-                bid_ask_string += f"{self._bids[i].price_string}:{self._bids[i].quantity_string}:"
+                fields += self._bids[i][:2]
             if len(self._asks) > i:
-                bid_ask_string += f"{self._asks[i].price_string}:{self._asks[i].quantity_string}:"
-            if i + 1 >= 25:
-                break
-        if bid_ask_string:
-            bid_ask_string = bid_ask_string[:-1]
-        crc = binascii.crc32(bid_ask_string.encode()) & 0xffffffff  # Calculate CRC32 as unsigned integer
-        crc_signed = crc if crc < 0x80000000 else crc - 0x100000000  # Convert to signed integer
-        return crc_signed
+                fields += self._asks[i][:2]
+        self._check_sum_cache = signed_crc32(":".join(fields))
+        self._check_sum_dirty = False
+        return self._check_sum_cache
 
     def do_check_sum(self) -> bool:
         if not self.exch_check_sum:
@@ -117,19 +216,19 @@ class OrderBook:
 
     def best_bid(self) -> OrderBookLevel:
         self._check_empty_array(self._bids)
-        return self._bids[0]
+        return self._to_level(self._bids[0])
 
     def best_ask(self) -> OrderBookLevel:
         self._check_empty_array(self._asks)
-        return self._asks[0]
+        return self._to_level(self._asks[0])
 
     def best_bid_price(self) -> float:
         self._check_empty_array(self._bids)
-        return self._bids[0].price
+        return -self._bid_keys[0]
 
     def best_ask_price(self) -> float:
         self._check_empty_array(self._asks)
-        return self._asks[0].price
+        return self._ask_keys[0]
 
     def bid_by_level(self, level: int) -> OrderBookLevel:
         self._check_empty_array(self._bids)
@@ -137,7 +236,7 @@ class OrderBook:
             level = 1
         if level > len(self._bids):
             level = 0
-        return self._bids[level - 1]
+        return self._to_level(self._bids[level - 1])
 
     def ask_by_level(self, level: int) -> OrderBookLevel:
         """
@@ -148,9 +247,9 @@ class OrderBook:
             level = 1
         if level > len(self._asks):
             level = 0
-        return self._asks[level - 1]
+        return self._to_level(self._asks[level - 1])
 
     def middle_price(self) -> float:
         self._check_empty_array(self._bids)
         self._check_empty_array(self._asks)
-        return (self._bids[0].price + self._asks[0].price) / 2
+        return (-self._bid_keys[0] + self._ask_keys[0]) / 2
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Dict, Iterable, Optional, Tuple
 
 from okx_market_maker.utils.OkxEnum import InstType
 
@@ -92,40 +92,146 @@ class Ticker:
         self.ts = int(json_response["ts"]) if json_response.get("ts") else 0
 
 
+# 无法直接换算为 USDT 的币种，依次尝试经由这些计价币种换算
+BRIDGE_QUOTE_CCY_LIST = ["USDC", "BTC", "ETH", "DAI", "OKB", "DOT", "EURT"]
+
+
 @dataclass
 class Tickers:
     """
     这个类用于封装所有交易对的行情数据，包含了所有交易对的行情数据和一些方法。
+
+    币种到 USDT 的换算路径（直接 ccy-USDT，或经由一个 BRIDGE_QUOTE_CCY_LIST 中的计价币种）中保存的是 Ticker 对象本身，
+    查询只需按路径上 Ticker 的价格计算乘积。
+
+    跨线程发布时使用 copy_and_update 生成新的快照并整体替换 tickers_container[0]，已发布的快照不再修改。
+    快照中价格变化的交易对是新的 Ticker 对象，生成快照时把换算路径映射到新的 Ticker（产品集合变化时重新解析全部币种），
+    因此快照的路径只引用本快照的 Ticker，读取方查询路径不会写入快照。
+    直接调用 update_from_json 的对象原地修改 Ticker，换算路径按币种解析一次后缓存，产品集合变化时清空。
+    version 每次更新加一，读取方可据此判断数据是否变化。
     """
     _ticker_map: Dict[str, Ticker] = field(default_factory=lambda: dict())
+    # 币种 -> 换算路径上的 Ticker，None 表示无法换算
+    _conversion_paths: Dict[str, Optional[Tuple[Ticker, ...]]] = field(default_factory=lambda: dict())
+    universe_version: int = 0
+    version: int = 0
+    # 已解析全部币种的换算路径（copy_and_update 生成的快照），此时查询不再写入路径缓存
+    _paths_complete: bool = False
 
     def update_from_json(self, json_response):
         if json_response.get("code") != '0':
             raise ValueError(f"Unsuccessful ticker response {json_response}")
         data = json_response["data"]
+        universe_changed = False
         for info in data:
             inst_id = info["instId"]
             if inst_id not in self._ticker_map:
                 self._ticker_map[inst_id] = Ticker.init_from_json(info)
+                universe_changed = True
             else:
                 self._ticker_map[inst_id].update_from_json(info)
+        if universe_changed:
+            self._conversion_paths.clear()
+            self._paths_complete = False
+            self.universe_version += 1
+        self.version += 1
+
+    def copy_and_update(self, json_response) -> "Tickers":
+        """
+        返回应用了本次行情后的新 Tickers，自身保持不变。
+        ts 未变化的交易对沿用原 Ticker 对象，其余交易对新建 Ticker；产品集合不变时换算路径映射到新的 Ticker 后沿用，
+        否则重新解析全部币种的换算路径。
+
+        Args:
+            json_response (dict): REST tickers 响应。
+        Returns:
+            Tickers: 新的快照。
+        """
+        if json_response.get("code") != '0':
+            raise ValueError(f"Unsuccessful ticker response {json_response}")
+        ticker_map = dict(self._ticker_map)
+        universe_changed = False
+        for info in json_response["data"]:
+            inst_id = info["instId"]
+            ticker = ticker_map.get(inst_id)
+            if ticker is None:
+                universe_changed = True
+            elif info.get("ts") and ticker.ts == int(info["ts"]):
+                continue
+            ticker_map[inst_id] = Ticker.init_from_json(info)
+        if universe_changed or not self._paths_complete:
+            universe_version = self.universe_version + 1 if universe_changed else self.universe_version
+            snapshot = Tickers(ticker_map, {}, universe_version, self.version + 1)
+            snapshot._resolve_all_conversion_paths()
+            return snapshot
+        # 只有完整解析过的快照才沿用其路径，这类快照的路径缓存不会被读取方修改
+        conversion_paths = {ccy: None if path is None else tuple(ticker_map[ticker.inst_id] for ticker in path)
+                            for ccy, path in self._conversion_paths.items()}
+        return Tickers(ticker_map, conversion_paths, self.universe_version, self.version + 1, True)
+
+    def _resolve_all_conversion_paths(self) -> None:
+        """
+        解析所有可能换算的币种（各交易对的基础币种与 USDT）的路径，之后的查询只读。
+        """
+        ccy_set = {inst_id.split("-")[0] for inst_id in self._ticker_map}
+        ccy_set.add("USDT")
+        self._conversion_paths = {ccy: self._resolve_conversion_path(ccy) for ccy in ccy_set}
+        self._paths_complete = True
 
     def get_ticker_by_inst_id(self, inst_id: str) -> Ticker:
         return self._ticker_map.get(inst_id)
 
-    def get_usdt_price_by_ccy(self, ccy: str, use_mid: bool = True) -> float:
+    def get_conversion_path(self, ccy: str) -> Optional[Tuple[Ticker, ...]]:
+        """
+        返回币种换算为 USDT 所经过的 Ticker，USDT 本身为空元组，无法换算时为 None。
+        """
+        if ccy in self._conversion_paths:
+            return self._conversion_paths[ccy]
+        if self._paths_complete:
+            # 能换算的币种必然是某个交易对的基础币种，已全部解析
+            return None
+        path = self._resolve_conversion_path(ccy)
+        self._conversion_paths[ccy] = path
+        return path
+
+    def _resolve_conversion_path(self, ccy: str) -> Optional[Tuple[Ticker, ...]]:
         if ccy == "USDT":
-            return 1
+            return ()
         # 1. if ccy-USDT inst_id exists
-        if f"{ccy}-USDT" in self._ticker_map:
-            ticker = self.get_ticker_by_inst_id(f"{ccy}-USDT")
-            return ((ticker.ask_px + ticker.bid_px) / 2) if use_mid else ticker.last
+        ticker = self._ticker_map.get(f"{ccy}-USDT")
+        if ticker:
+            return ticker,
         # 2. if ccy-quote and quote-USDT inst_id exists
-        for quote in ["USDC", "BTC", "ETH", "DAI", "OKB", "DOT", "EURT"]:
-            if f"{ccy}-{quote}" in self._ticker_map and f"{quote}-USDT" in self._ticker_map:
-                ticker = self.get_ticker_by_inst_id(f"{ccy}-{quote}")
-                quote_ticker = self.get_ticker_by_inst_id(f"{quote}-USDT")
-                return (((ticker.ask_px + ticker.bid_px) / 2) * ((quote_ticker.ask_px + quote_ticker.bid_px) / 2)) \
-                    if use_mid else (ticker.last * quote_ticker.last)
-        # 3. if neither case then return 0
-        return 0
+        for quote in BRIDGE_QUOTE_CCY_LIST:
+            ticker = self._ticker_map.get(f"{ccy}-{quote}")
+            quote_ticker = self._ticker_map.get(f"{quote}-USDT")
+            if ticker and quote_ticker:
+                return ticker, quote_ticker
+        # 3. if neither case then no path
+        return None
+
+    @staticmethod
+    def _evaluate_path(path: Optional[Tuple[Ticker, ...]], use_mid: bool) -> float:
+        if path is None:
+            return 0
+        price = 1
+        for ticker in path:
+            price *= ((ticker.ask_px + ticker.bid_px) / 2) if use_mid else ticker.last
+        return price
+
+    def get_usdt_price_by_ccy(self, ccy: str, use_mid: bool = True) -> float:
+        return self._evaluate_path(self.get_conversion_path(ccy), use_mid)
+
+    def get_usdt_prices_by_ccy(self, ccy_list: Iterable[str], use_mid: bool = True) -> Dict[str, float]:
+        """
+        一次性返回多个币种（如整个账户）的 USDT 价格。
+
+        Args:
+            ccy_list (Iterable[str]): 币种列表。
+            use_mid (bool): 使用买卖中间价，否则使用最新成交价。
+        Returns:
+            Dict[str, float]: 币种 -> USDT 价格，无法换算的币种为 0。
+        """
+        get_conversion_path = self.get_conversion_path
+        evaluate_path = self._evaluate_path
+        return {ccy: evaluate_path(get_conversion_path(ccy), use_mid) for ccy in ccy_list}
@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from okx_market_maker.config.settings import ORDER_RATE_LIMITS, ORDER_ACCOUNT_RATE_LIMIT
+from okx_market_maker.order_management_service.WssOrderGateway import ORDER_BATCH_SIZE, match_order_results
+from okx_market_maker.utils.OkxEnum import OrderOp
+
+logger = logging.getLogger(__name__)
+
+# 发送优先级：撤单 > 改单 > 下单
+ORDER_OP_PRIORITY = (OrderOp.BATCH_CANCEL, OrderOp.BATCH_AMEND, OrderOp.BATCH_ORDER)
+# 被同一 clOrdId 后续请求取代、未发送即结束的请求的 sCode
+SUPERSEDED_CODE = "superseded"
+# 下单尚未发出即被撤单时，撤单结果的 sMsg；该订单从未到达交易所
+CANCELED_BEFORE_SENT_MSG = "canceled before sent"
+
+
+class TokenBucket:
+    """
+    令牌桶：容量 capacity，每 period_sec 秒补满，即每秒补充 capacity / period_sec 个令牌。
+    """
+    def __init__(self, capacity: float, period_sec: float) -> None:
+        self.capacity = capacity
+        self.rate = capacity / period_sec
+        self.tokens = capacity
+        self.last_ts = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.last_ts:
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_ts) * self.rate)
+            self.last_ts = now
+
+    def try_consume(self, now: float, tokens: float = 1) -> bool:
+        self._refill(now)
+        if self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        return True
+
+    def wait_time(self, now: float, tokens: float = 1) -> float:
+        """
+        返回获得 tokens 个令牌还需等待的秒数。
+        """
+        self._refill(now)
+        return max(tokens - self.tokens, 0) / self.rate
+
+
+@dataclass
+class _QueuedOrder:
+    op: OrderOp
+    args: Dict
+    enqueue_ts: float
+    futures: List[asyncio.Future] = field(default_factory=list)
+    dropped: bool = False
+
+    @property
+    def inst_id(self) -> str:
+        return self.args.get("instId", "")
+
+    @property
+    def client_order_id(self) -> str:
+        return self.args.get("clOrdId", "")
+
+
+@dataclass
+class _OpStats:
+    submitted: int = 0
+    sent: int = 0
+    merged: int = 0
+    superseded: int = 0
+    waits_ms: List[float] = field(default_factory=list)
+
+
+class OrderScheduler:
+    """
+    这个类用于按 OKX 限速规则调度下单 / 改单 / 撤单请求。
+
+    每个批量接口按产品各有一个令牌桶（ORDER_RATE_LIMITS），下单与改单另外共用一个账户级令牌桶（ORDER_ACCOUNT_RATE_LIMIT）。
+    排队的请求总是先发撤单、再发改单、最后下单，每次最多取 20 个令牌足够的订单组成一个批量请求；
+    令牌不足的产品留在队列中，等待令牌补充时其他产品的请求不受影响。
+
+    排队期间同一 clOrdId 的请求会合并或丢弃：
+    撤单丢弃该订单排队中的改单，若下单也尚未发出则两者都不再发送；改单合并进排队中的改单或下单；
+    重复的下单取代之前的下单。被取代的请求以 sCode 为 SUPERSEDED_CODE 的结果结束。
+    """
+    def __init__(self, send_batch: Callable[[OrderOp, List[Dict]], Awaitable[Optional[Dict]]],
+                 rate_limits: Dict[str, Tuple[float, float]] = None,
+                 account_rate_limit: Tuple[float, float] = ORDER_ACCOUNT_RATE_LIMIT) -> None:
+        """
+        初始化 OrderScheduler 类。
+
+        Args:
+            send_batch (Callable): 发送一个批量请求并返回交易所响应的协程函数，结果未知时返回 None。
+            rate_limits (Dict[str, Tuple[float, float]]): op -> (每个产品的请求订单数上限, 周期秒数)，默认为 ORDER_RATE_LIMITS。
+            account_rate_limit (Tuple[float, float]): 下单与改单合计的账户级上限 (订单数, 周期秒数)。
+        """
+        self.send_batch = send_batch
+        self.rate_limits = {**ORDER_RATE_LIMITS, **(rate_limits or {})}
+        self._account_bucket = TokenBucket(*account_rate_limit)
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._queues: Dict[OrderOp, Deque[_QueuedOrder]] = {op: deque() for op in ORDER_OP_PRIORITY}
+        # (op, clOrdId) -> 排队中的请求
+        self._queued: Dict[Tuple[OrderOp, str], _QueuedOrder] = {}
+        self._stats: Dict[OrderOp, _OpStats] = {op: _OpStats() for op in ORDER_OP_PRIORITY}
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._batch_tasks = set()
+
+    def submit(self, op: OrderOp, args_list: List[Dict]) -> List[asyncio.Future]:
+        """
+        将订单请求加入队列，返回与 args_list 一一对应的 Future，结果为该订单的响应
+        {"clOrdId", "ordId", "sCode", "sMsg", ...}，请求结果未知（超时）时为 None。
+
+        Args:
+            op (OrderOp): BATCH_ORDER、BATCH_AMEND 或 BATCH_CANCEL。
+            args_list (List[Dict]): 订单参数，与 REST 批量接口相同。
+        """
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        futures = []
+        for args in args_list:
+            future = loop.create_future()
+            futures.append(future)
+            self._stats[op].submitted += 1
+            self._enqueue(_QueuedOrder(op=op, args=dict(args), enqueue_ts=now, futures=[future]))
+        if futures and (self._dispatcher is None or self._dispatcher.done()):
+            self._dispatcher = loop.create_task(self._run())
+        self._wakeup.set()
+        return futures
+
+    def _enqueue(self, order: _QueuedOrder) -> None:
+        client_order_id = order.client_order_id
+        if not client_order_id:
+            self._queues[order.op].append(order)
+            return
+        queued_place = self._queued.get((OrderOp.BATCH_ORDER, client_order_id))
+        queued_amend = self._queued.get((OrderOp.BATCH_AMEND, client_order_id))
+        if order.op == OrderOp.BATCH_CANCEL:
+            if queued_amend:
+                self._supersede(queued_amend)
+            if queued_place:
+                # 下单尚未发出，撤单无需发送
+                self._supersede(queued_place)
+                self._resolve(order, {"clOrdId": client_order_id, "ordId": "", "sCode": "0",
+                                      "sMsg": CANCELED_BEFORE_SENT_MSG})
+                return
+        elif order.op == OrderOp.BATCH_AMEND:
+            target = queued_amend or queued_place
+            if target is not None:
+                self._merge_amend(target, order.args)
+                target.futures += order.futures
+                self._stats[order.op].merged += 1
+                return
+        elif queued_place:
+            self._supersede(queued_place)
+        self._queues[order.op].append(order)
+        self._queued[(order.op, client_order_id)] = order
+
+    @staticmethod
+    def _merge_amend(target: _QueuedOrder, amend_args: Dict) -> None:
+        if target.op == OrderOp.BATCH_ORDER:
+            if amend_args.get("newPx"):
+                target.args["px"] = amend_args["newPx"]
+            if amend_args.get("newSz"):
+                target.args["sz"] = amend_args["newSz"]
+            return
+        for key in ("newPx", "newSz", "reqId"):
+            if amend_args.get(key):
+                target.args[key] = amend_args[key]
+        target.args["cxlOnFail"] = target.args.get("cxlOnFail") or amend_args.get("cxlOnFail", False)
+
+    def _supersede(self, order: _QueuedOrder) -> None:
+        order.dropped = True
+        self._queued.pop((order.op, order.client_order_id), None)
+        self._stats[order.op].superseded += 1
+        self._resolve(order, {"clOrdId": order.client_order_id, "ordId": order.args.get("ordId", ""),
+                              "sCode": SUPERSEDED_CODE, "sMsg": "superseded by a later request"})
+
+    @staticmethod
+    def _resolve(order: _QueuedOrder, result: Optional[Dict]) -> None:
+        for future in order.futures:
+            if not future.done():
+                future.set_result(result)
+
+    def _bucket(self, op: OrderOp, inst_id: str) -> TokenBucket:
+        bucket = self._buckets.get((op.value, inst_id))
+        if bucket is None:
+            bucket = self._buckets[(op.value, inst_id)] = TokenBucket(*self.rate_limits[op.value])
+        return bucket
+
+    def _take_batch(self, op: OrderOp, now: float) -> List[_QueuedOrder]:
+        """
+        按先进先出从 op 的队列中取出至多 ORDER_BATCH_SIZE 个令牌足够的订单，令牌不足的订单留在队列中。
+        """
+        queue = self._queues[op]
+        batch = []
+        remaining = deque()
+        uses_account_bucket = op != OrderOp.BATCH_CANCEL
+        while queue:
+            order = queue.popleft()
+            if order.dropped:
+                continue
+            if len(batch) < ORDER_BATCH_SIZE \
+                    and (not uses_account_bucket or self._account_bucket.wait_time(now) == 0) \
+                    and self._bucket(op, order.inst_id).try_consume(now):
+                if uses_account_bucket:
+                    self._account_bucket.try_consume(now)
+                self._queued.pop((op, order.client_order_id), None)
+                batch.append(order)
+            else:
+                remaining.append(order)
+        self._queues[op] = remaining
+        return batch
+
+    def _next_ready_delay(self, now: float) -> float:
+        delay = 1.0
+        for op, queue in self._queues.items():
+            for order in queue:
+                if order.dropped:
+                    continue
+                wait = self._bucket(op, order.inst_id).wait_time(now)
+                if op != OrderOp.BATCH_CANCEL:
+                    wait = max(wait, self._account_bucket.wait_time(now))
+                delay = min(delay, wait)
+        return max(delay, 0.001)
+
+    async def _run(self) -> None:
+        while self.get_queue_depth(total=True):
+            now = time.monotonic()
+            for op in ORDER_OP_PRIORITY:
+                batch = self._take_batch(op, now)
+                if batch:
+                    stats = self._stats[op]
+                    stats.sent += len(batch)
+                    stats.waits_ms = stats.waits_ms[-(100 - len(batch)):] + [
+                        (now - order.enqueue_ts) * 1000 for order in batch]
+                    task = asyncio.get_running_loop().create_task(self._send(op, batch))
+                    self._batch_tasks.add(task)
+                    task.add_done_callback(self._batch_tasks.discard)
+                    break
+            else:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_ready_delay(now))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # 每发出一个批次后让出事件循环，并从最高优先级重新选择
+            await asyncio.sleep(0)
+
+    async def _send(self, op: OrderOp, batch: List[_QueuedOrder]) -> None:
+        args = [order.args for order in batch]
+        try:
+            response = await self.send_batch(op, args)
+        except Exception as e:
+            for order in batch:
+                for future in order.futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        results = match_order_results(args, response) if response is not None else [None] * len(batch)
+        for order, result in zip(batch, results):
+            self._resolve(order, result)
+
+    def get_queue_depth(self, total: bool = False):
+        """
+        返回各 op 排队中的订单数，total 为 True 时返回合计。
+        """
+        depth = {op.value: sum(1 for order in queue if not order.dropped) for op, queue in self._queues.items()}
+        return sum(depth.values()) if total else depth
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        返回各 op 的提交、发送、合并、被取代的订单数，当前排队数，以及最近 100 个订单的排队等待时间（毫秒）。
+        """
+        depth = self.get_queue_depth()
+        return {op.value: {"submitted": stats.submitted, "sent": stats.sent, "merged": stats.merged,
+                           "superseded": stats.superseded, "queue_depth": depth[op.value],
+                           "avg_wait_ms": sum(stats.waits_ms) / len(stats.waits_ms) if stats.waits_ms else 0,
+                           "max_wait_ms": max(stats.waits_ms, default=0)}
+                for op, stats in self._stats.items()}
@@ -0,0 +1,198 @@
+import asyncio
+import itertools
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from websockets.protocol import State
+
+from okx_market_maker.config.settings import ORDER_REQUEST_TIMEOUT_SEC
+from okx_market_maker.order_management_service.WssOrderManagementService import WssOrderManagementService
+from okx_market_maker.order_management_service.model.OrderRequest import PlaceOrderRequest, AmendOrderRequest, \
+    CancelOrderRequest
+from okx_market_maker.utils.OkxEnum import OrderOp
+from okx_market_maker.utils.WsMessageUtil import loads
+
+logger = logging.getLogger(__name__)
+
+# 批量下单 / 改单 / 撤单每个请求最多包含的订单数
+ORDER_BATCH_SIZE = 20
+
+
+def match_order_results(args: List[Dict], message: Dict) -> List[Dict]:
+    """
+    将批量请求响应中的逐个订单结果按 clOrdId、ordId、位置依次对应到请求参数；
+    没有对应结果（整个请求失败）的订单，sCode / sMsg 取请求的 code / msg。
+
+    Args:
+        args (List[Dict]): 请求中的订单参数。
+        message (Dict): 交易所响应。
+    Returns:
+        List[Dict]: 与 args 一一对应的订单结果。
+    """
+    data = message.get("data") or []
+    by_client_order_id = {d.get("clOrdId"): d for d in data if d.get("clOrdId")}
+    by_order_id = {d.get("ordId"): d for d in data if d.get("ordId")}
+    results = []
+    for i, arg in enumerate(args):
+        result = by_client_order_id.get(arg.get("clOrdId")) or by_order_id.get(arg.get("ordId"))
+        if result is None and i < len(data) and not data[i].get("clOrdId"):
+            result = data[i]
+        if result is None:
+            result = {"clOrdId": arg.get("clOrdId", ""), "ordId": arg.get("ordId", ""),
+                      "sCode": message.get("code", ""), "sMsg": message.get("msg", "")}
+        results.append(result)
+    return results
+
+
+@dataclass
+class _PendingRequest:
+    op: OrderOp
+    args: List[Dict]
+    sent_ts: float
+    response: Optional[asyncio.Future] = None
+    orders: Optional[List[asyncio.Future]] = None
+    timeout_handle: Optional[asyncio.TimerHandle] = None
+
+
+class WssOrderGateway:
+    """
+    这个类用于通过已登录的私有 WebSocket 连接（WssOrderManagementService）发送 batch-orders、
+    batch-amend-orders、batch-cancel-orders 请求，代替阻塞的 REST 调用。
+    每个请求带自增的 id，响应按 id 对应到请求，再按 clOrdId / ordId 对应到请求中的每个订单。
+    request 返回与 REST 相同结构的整体响应，submit 返回每个订单的 Future。
+    """
+    def __init__(self, oms: WssOrderManagementService, request_timeout_sec: float = ORDER_REQUEST_TIMEOUT_SEC) -> None:
+        """
+        初始化 WssOrderGateway 类。
+
+        Args:
+            oms (WssOrderManagementService): 已登录的私有 WebSocket 连接，响应由其转交给本类。
+            request_timeout_sec (float): 请求发出后超过该秒数仍无响应时以 asyncio.TimeoutError 结束。
+        """
+        self.oms = oms
+        self.request_timeout_sec = request_timeout_sec
+        self._request_ids = itertools.count(1)
+        self._pending: Dict[str, _PendingRequest] = {}
+        oms.op_response_handler = self.on_op_response
+        oms.connection_closed_handler = self.fail_all
+
+    def is_ready(self) -> bool:
+        # SDK 在连接断开后不会清空 websocket，需要检查连接状态
+        websocket = getattr(self.oms, "websocket", None)
+        return websocket is not None and websocket.state is State.OPEN
+
+    def get_pending_count(self) -> int:
+        return len(self._pending)
+
+    async def request(self, op: OrderOp, args: List[Dict]) -> Dict:
+        """
+        发送一个批量请求并等待响应。
+
+        Args:
+            op (OrderOp): BATCH_ORDER、BATCH_AMEND 或 BATCH_CANCEL。
+            args (List[Dict]): 订单参数，最多 ORDER_BATCH_SIZE 个，与 REST 批量接口相同。
+        Returns:
+            Dict: 交易所响应 {"id", "op", "code", "msg", "data": [{"clOrdId", "ordId", "sCode", "sMsg", ...}]}。
+        """
+        pending = await self._send(op, args, per_order=False)
+        return await pending.response
+
+    async def submit(self, op: OrderOp, args: List[Dict]) -> List[asyncio.Future]:
+        """
+        发送一个批量请求，返回与 args 一一对应的 Future，每个 Future 的结果为该订单的响应
+        {"clOrdId", "ordId", "sCode", "sMsg", ...}；整个请求失败且没有逐个订单的结果时，sCode / sMsg 为请求的 code / msg。
+        """
+        pending = await self._send(op, args, per_order=True)
+        return pending.orders
+
+    async def place_orders(self, order_request_list: List[PlaceOrderRequest]) -> List[asyncio.Future]:
+        return await self._submit_in_batches(OrderOp.BATCH_ORDER, [r.to_dict() for r in order_request_list])
+
+    async def amend_orders(self, order_request_list: List[AmendOrderRequest]) -> List[asyncio.Future]:
+        return await self._submit_in_batches(OrderOp.BATCH_AMEND, [r.to_dict() for r in order_request_list])
+
+    async def cancel_orders(self, order_request_list: List[CancelOrderRequest]) -> List[asyncio.Future]:
+        return await self._submit_in_batches(OrderOp.BATCH_CANCEL, [r.to_dict() for r in order_request_list])
+
+    async def _submit_in_batches(self, op: OrderOp, args: List[Dict]) -> List[asyncio.Future]:
+        futures = []
+        for i in range(0, len(args), ORDER_BATCH_SIZE):
+            futures += await self.submit(op, args[i:i + ORDER_BATCH_SIZE])
+        return futures
+
+    async def _send(self, op: OrderOp, args: List[Dict], per_order: bool) -> _PendingRequest:
+        if len(args) > ORDER_BATCH_SIZE:
+            raise ValueError(f"{op.value} accepts at most {ORDER_BATCH_SIZE} orders, got {len(args)}")
+        if not self.is_ready():
+            raise ConnectionError("private WebSocket is not connected")
+        loop = asyncio.get_running_loop()
+        request_id = str(next(self._request_ids))
+        pending = _PendingRequest(op=op, args=args, sent_ts=time.perf_counter())
+        if per_order:
+            pending.orders = [loop.create_future() for _ in args]
+        else:
+            pending.response = loop.create_future()
+        self._pending[request_id] = pending
+        try:
+            await self.oms.websocket.send(json.dumps({"id": request_id, "op": op.value, "args": args}))
+        except Exception:
+            self._pending.pop(request_id, None)
+            raise
+        if request_id in self._pending:
+            pending.timeout_handle = loop.call_later(self.request_timeout_sec, self._expire, request_id)
+        return pending
+
+    def on_op_response(self, message) -> None:
+        """
+        处理 op 响应，由 WssOrderManagementService 在收到带 op 字段的消息时调用。
+
+        Args:
+            message (str | dict): WebSocket 消息。
+            {
+                "id": "1512", "op": "batch-orders", "code": "0", "msg": "",
+                "data": [{"clOrdId": "", "ordId": "12345689", "tag": "", "sCode": "0", "sMsg": ""}],
+                "inTime": "1695190491421339", "outTime": "1695190491423240"
+            }
+        """
+        if not isinstance(message, dict):
+            message = loads(message)
+        pending = self._pending.pop(str(message.get("id")), None)
+        if pending is None:
+            logger.warning(f"order op response without a pending request: {message}")
+            return
+        if pending.timeout_handle is not None:
+            pending.timeout_handle.cancel()
+        latency_ms = (time.perf_counter() - pending.sent_ts) * 1000
+        logger.debug(f"{pending.op.value} id {message.get('id')} answered in {latency_ms:.1f}ms")
+        if pending.response is not None:
+            if not pending.response.done():
+                pending.response.set_result(message)
+            return
+        for future, result in zip(pending.orders, match_order_results(pending.args, message)):
+            if not future.done():
+                future.set_result(result)
+
+    def _expire(self, request_id: str) -> None:
+        pending = self._pending.pop(request_id, None)
+        if pending is None:
+            return
+        error = asyncio.TimeoutError(f"{pending.op.value} id {request_id} not answered in {self.request_timeout_sec}s")
+        logger.warning(str(error))
+        for future in [pending.response] if pending.response is not None else pending.orders:
+            if not future.done():
+                future.set_exception(error)
+
+    def fail_all(self, error: Exception) -> None:
+        """
+        连接断开时以 error 结束所有未收到响应的请求，由 WssOrderManagementService 在消息循环结束时调用。
+        """
+        for request_id in list(self._pending):
+            pending = self._pending.pop(request_id)
+            if pending.timeout_handle is not None:
+                pending.timeout_handle.cancel()
+            for future in [pending.response] if pending.response is not None else pending.orders:
+                if not future.done():
+                    future.set_exception(error)
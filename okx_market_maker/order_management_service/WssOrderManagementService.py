@@ -1,35 +1,64 @@
-import json
 import time
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 import asyncio
 import logging
 
-from okx_market_maker.order_management_service.model.Order import Order, Orders
+from okx_market_maker.order_management_service.model.Order import Order, Orders, OrderChange
 from okx.websocket.WsPrivateAsync import WsPrivateAsync
-from okx_market_maker import orders_container
+from okx_market_maker import orders_container, order_change_feeds
 from okx_market_maker.config.settings import API_KEY, API_KEY_SECRET, API_PASSPHRASE
+from okx_market_maker.utils.WsMessageUtil import decode_message, peek_op
+from okx_market_maker.capture.MessageRecorder import CaptureSource, record
+from okx_market_maker.utils.StateChangeUtil import notify_state_change
+from okx_market_maker.utils.LatencyUtil import mark_orders_updated
 
 logger = logging.getLogger(__name__)
 
+ORDER_CHANNELS = frozenset(["orders"])
+
 class WssOrderManagementService(WsPrivateAsync):
+    """
+    这个类用于订阅私有 WebSocket 的 orders 频道并维护订单缓存。
+    同一已登录连接上的下单 / 改单 / 撤单响应（带 op 字段）交给 op_response_handler，即 WssOrderGateway；
+    连接断开、消息循环结束时调用 connection_closed_handler。
+    """
     def __init__(self, url: str, api_key: str = API_KEY, passphrase: str = API_PASSPHRASE,
                  secret_key: str = API_KEY_SECRET, useServerTime: bool = False):
         super().__init__(api_key, passphrase, secret_key, url, useServerTime)
         self.args = []
         self.data_ready_event = asyncio.Event()
+        self.op_response_handler: Optional[Callable[[str], None]] = None
+        self.connection_closed_handler: Optional[Callable[[Exception], None]] = None
+
+    async def consume(self):
+        try:
+            await super().consume()
+        except Exception as e:
+            logger.warning(f"private WebSocket closed: {e!r}")
+            raise
+        finally:
+            if self.connection_closed_handler is not None:
+                self.connection_closed_handler(ConnectionError("private WebSocket connection closed"))
 
     async def run_service(self):
         args = self._prepare_args()
         print(args)
         print("subscribing")
         orders_container.append(Orders())
-        await self.subscribe(args, _callback)
+        await self.subscribe(args, self._callback)
         self.args += args
 
     async def stop_service(self):
         await self.unsubscribe(self.args, lambda message: print(message))
         await self.close()
 
+    def _callback(self, message) -> None:
+        if self.op_response_handler is not None and isinstance(message, (str, bytes)) and peek_op(message):
+            record(CaptureSource.OMS, message)
+            self.op_response_handler(message)
+            return
+        _callback(message)
+
     @staticmethod
     def _prepare_args() -> List[Dict]:
         args = []
@@ -42,23 +71,14 @@ class WssOrderManagementService(WsPrivateAsync):
 
 
 def _callback(message) -> None:
-    # 统一把 str → dict
-    if isinstance(message, str):
-        try:
-            message = json.loads(message)
-        except json.JSONDecodeError:
-            logger.warning("非 JSON 消息：%s", message)
-            return
-        
-    arg = message.get("arg")
-    # print(message)
-    if not arg or not arg.get("channel"):
-        return
-    if message.get("event") == "subscribe":
+    record(CaptureSource.OMS, message)
+    # 订阅确认和其他频道的消息在完整解码前丢弃
+    message = decode_message(message, ORDER_CHANNELS)
+    if not message:
         return
-    if arg.get("channel") == "orders":
-        on_orders_update(message)
-        # print(orders_container)
+    on_orders_update(message)
+    notify_state_change("orders")
+    # print(orders_container)
 
 
 def on_orders_update(message):
@@ -66,6 +86,22 @@ def on_orders_update(message):
         orders_container.append(Orders.init_from_json(message))
     else:
         orders_container[0].update_from_json(message)
+    publish_order_changes(message["data"])
+    mark_orders_updated(message["data"])
+
+
+def publish_order_changes(data: List[Dict]) -> None:
+    """
+    将推送中带 clOrdId 的订单变化追加到每个已注册的变化队列（order_change_feeds）。
+
+    Args:
+        data (List[Dict]): orders 频道推送中的订单列表。
+    """
+    if not order_change_feeds:
+        return
+    changes = [OrderChange.init_from_json(single_order) for single_order in data if single_order.get("clOrdId")]
+    for feed in order_change_feeds:
+        feed.extend(changes)
 
 async def main():
     # url = "wss://ws.okx.com:8443/ws/v5/private"
@@ -1,10 +1,15 @@
+import sys
+import time
 from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Dict, List
+from typing import Dict, List, Optional
+from okx_market_maker.config.settings import ORDERS_TERMINAL_GRACE_SEC, ORDERS_MAX_SIZE
 from okx_market_maker.utils.OkxEnum import *
 
+TERMINAL_ORDER_STATES = frozenset([OrderState.CANCELED, OrderState.FILLED, OrderState.MMP_CANCELED])
 
-@dataclass
+
+@dataclass(slots=True)
 class Order:
     acc_fill_sz: str = "0"
     amend_result: str = 0
@@ -33,7 +38,7 @@ class Order:
     px: float = 0
     rebate: float = 0
     rebate_ccy: str = ""
-    reduce_only: bool = False,
+    reduce_only: bool = False
     req_id: str = ""
     side: OrderSide = None
     state: OrderState = None
@@ -84,39 +89,130 @@ class Order:
         return order
 
 
+@dataclass(slots=True)
+class OrderChange:
+    """
+    orders 频道推送中单个订单的状态变化，由 WssOrderManagementService 发布给策略。
+    """
+    cl_ord_id: str
+    ord_id: str
+    state: OrderState
+    acc_fill_sz: str = "0"
+    fill_px: float = 0
+
+    @classmethod
+    def init_from_json(cls, json_response):
+        return OrderChange(cl_ord_id=json_response.get("clOrdId", ""), ord_id=json_response.get("ordId", ""),
+                           state=OrderState(json_response["state"]),
+                           acc_fill_sz=json_response.get("accFillSz") or "0",
+                           fill_px=float(json_response.get("fillPx")) if json_response.get("fillPx") else 0)
+
+
 @dataclass
 class Orders:
+    """
+    订单缓存，按 ordId、clOrdId 索引。_order_map 按最近更新时间排序（最久未更新的在前）。
+    终态（已成交、已撤销）的订单在 terminal_grace_sec 秒后移除，订单总数超过 max_orders 时
+    先移除最早进入终态的订单，仍超过时移除最久未更新的订单。
+
+    snapshot 返回写时复制的只读快照：快照与缓存共享索引字典，缓存在快照之后第一次写入前才复制字典，
+    Order 对象每次推送都重新生成、不会被修改，因此无需复制。version 每次写入加一。
+    """
     _order_map: Dict[str, Order] = field(default_factory=lambda: dict())
     _client_order_map: Dict[str, Order] = field(default_factory=lambda: dict())
     _non_client_order_map: Dict[str, Order] = field(default_factory=lambda: dict())
+    # ordId -> 进入终态的时间（time.monotonic），按进入终态的先后排序
+    _terminal_since: Dict[str, float] = field(default_factory=lambda: dict())
+    terminal_grace_sec: float = ORDERS_TERMINAL_GRACE_SEC
+    max_orders: int = ORDERS_MAX_SIZE
+    evicted_count: int = 0
+    version: int = 0
+    _read_only: bool = field(default=False, repr=False, compare=False)
+    # 索引字典是否与快照共享，写入前需先复制
+    _shared: bool = field(default=False, repr=False, compare=False)
+    _snapshot: Optional["Orders"] = field(default=None, repr=False, compare=False)
 
     @classmethod
     def init_from_json(cls, json_response):
         orders = Orders()
-        data = json_response.get("data", [])
-        orders._order_map = {single_order["ordId"]: Order.init_from_json(single_order) for single_order in data}
-        orders._client_order_map = {order.cl_ord_id: order for ord_id, order in orders._order_map.items()
-                                    if order.cl_ord_id}
-        orders._non_client_order_map = {order.ord_id: order for ord_id, order in orders._order_map.items()
-                                        if not order.cl_ord_id}
+        orders.update_from_json(json_response)
         return orders
 
-    def update_from_json(self, json_response):
+    def snapshot(self) -> "Orders":
+        """
+        返回当前内容的只读快照，O(1)；版本未变化时返回同一个快照。
+        """
+        if self._read_only:
+            return self
+        if self._snapshot is None or self._snapshot.version != self.version:
+            self._snapshot = Orders(self._order_map, self._client_order_map, self._non_client_order_map,
+                                    self._terminal_since, self.terminal_grace_sec, self.max_orders,
+                                    self.evicted_count, self.version, _read_only=True)
+            self._shared = True
+        return self._snapshot
+
+    def _before_write(self) -> None:
+        if self._read_only:
+            raise ValueError("Orders snapshot is read-only, modify the live cache in orders_container")
+        if self._shared:
+            self._order_map = dict(self._order_map)
+            self._client_order_map = dict(self._client_order_map)
+            self._non_client_order_map = dict(self._non_client_order_map)
+            self._terminal_since = dict(self._terminal_since)
+            self._shared = False
+        self.version += 1
+
+    def update_from_json(self, json_response, now: float = None):
+        now = time.monotonic() if now is None else now
+        self._before_write()
         data = json_response.get("data", [])
         for single_order in data:
             new_order = Order.init_from_json(single_order)
-            # if new_order.state in [OrderState.CANCELED, OrderState.FILLED] and new_order.ord_id in self._order_map:
-            #     del self._order_map[new_order.ord_id]
-            #     del self._non_client_order_map[new_order.ord_id]
-            # if new_order.state == OrderState.CANCELED and new_order.fill_sz == 0:
-            #     if new_order.ord_id in self._order_map:
-            #         del self._order_map[new_order.ord_id]
-            #     continue
-            self._order_map[new_order.ord_id] = new_order
+            order_id = new_order.ord_id
+            # 重新插入，保持 _order_map 按更新时间排序
+            self._order_map.pop(order_id, None)
+            self._order_map[order_id] = new_order
             if new_order.cl_ord_id:
                 self._client_order_map[new_order.cl_ord_id] = new_order
             else:
-                self._non_client_order_map[new_order.ord_id] = new_order
+                self._non_client_order_map[order_id] = new_order
+            if new_order.state in TERMINAL_ORDER_STATES:
+                self._terminal_since.setdefault(order_id, now)
+        self.evict(now)
+
+    def evict(self, now: float = None) -> int:
+        """
+        移除超过宽限期的终态订单，并将订单总数限制在 max_orders 以内。
+
+        Returns:
+            int: 本次移除的订单数。
+        """
+        now = time.monotonic() if now is None else now
+        oldest_terminal_ts = next(iter(self._terminal_since.values()), None)
+        if (oldest_terminal_ts is None or now - oldest_terminal_ts < self.terminal_grace_sec) \
+                and len(self._order_map) <= self.max_orders:
+            return 0
+        self._before_write()
+        evicted = 0
+        for order_id, terminal_ts in list(self._terminal_since.items()):
+            if now - terminal_ts < self.terminal_grace_sec and len(self._order_map) <= self.max_orders:
+                break
+            self._remove(order_id)
+            evicted += 1
+        while len(self._order_map) > self.max_orders:
+            # 没有终态订单可移除，按最久未更新移除
+            self._remove(next(iter(self._order_map)))
+            evicted += 1
+        self.evicted_count += evicted
+        return evicted
+
+    def _remove(self, order_id: str) -> None:
+        order = self._order_map.pop(order_id, None)
+        self._terminal_since.pop(order_id, None)
+        self._non_client_order_map.pop(order_id, None)
+        if order is not None and order.cl_ord_id and \
+                self._client_order_map.get(order.cl_ord_id) is order:
+            del self._client_order_map[order.cl_ord_id]
 
     def get_order_by_order_id(self, order_id: str) -> Order:
         return self._order_map.get(order_id)
@@ -128,7 +224,8 @@ class Orders:
         return self._non_client_order_map
 
     def get_active_orders(self):
-        return {order_id: order for order_id, order in self._order_map.items()
+        # list() 在持有 GIL 时一次性取出，其他线程（watchdog）读取时缓存可能正在更新
+        return {order_id: order for order_id, order in list(self._order_map.items())
                 if order.state in [OrderState.LIVE, OrderState.PARTIALLY_FILLED]}
 
     def get_filled_orders(self):
@@ -137,15 +234,24 @@ class Orders:
 
     def get_inactive_orders(self):
         return {order_id: order for order_id, order in self._order_map.items()
-                if order.state in [OrderState.FILLED, OrderState.CANCELED]}
+                if order.state in TERMINAL_ORDER_STATES}
 
     def remove_orders(self, order_list: List[Order]):
+        """
+        从缓存中移除订单，只能在 orders_container 中的缓存上调用，快照为只读。
+        """
+        if not order_list:
+            return
+        self._before_write()
         for order in order_list:
-            client_order_id = order.cl_ord_id
-            order_id = order.ord_id
-            del self._order_map[order_id]
-            if order_id in self._non_client_order_map:
-                del self._non_client_order_map[order_id]
-            if client_order_id in self._client_order_map:
-                del self._client_order_map[client_order_id]
+            self._remove(order.ord_id)
 
+    def get_memory_stats(self) -> Dict[str, int]:
+        """
+        返回订单数、终态订单数、累计移除数，以及订单对象与索引占用的近似字节数（不含共享的字符串）。
+        """
+        order_bytes = sum(sys.getsizeof(order) for order in self._order_map.values())
+        index_bytes = sum(sys.getsizeof(d) for d in (self._order_map, self._client_order_map,
+                                                     self._non_client_order_map, self._terminal_since))
+        return {"orders": len(self._order_map), "terminal_orders": len(self._terminal_since),
+                "evicted": self.evicted_count, "approx_bytes": order_bytes + index_bytes}
@@ -2,7 +2,6 @@ import time
 from typing import List, Dict
 import copy
 import asyncio
-import json
 import logging
 from okx_market_maker.position_management_service.model.BalanceAndPosition import BalanceAndPosition, \
     BalanceData, PosData
@@ -11,9 +10,14 @@ from okx_market_maker.position_management_service.model.Positions import Positio
 from okx.websocket.WsPrivateAsync import WsPrivateAsync
 from okx_market_maker import balance_and_position_container, account_container, positions_container
 from okx_market_maker.config.settings import API_KEY, API_KEY_SECRET, API_PASSPHRASE
+from okx_market_maker.utils.WsMessageUtil import decode_message
+from okx_market_maker.capture.MessageRecorder import CaptureSource, record
+from okx_market_maker.utils.StateChangeUtil import notify_state_change
 
 logger = logging.getLogger(__name__)
 
+POSITION_CHANNELS = frozenset(["account", "positions", "balance_and_position"])
+
 class WssPositionManagementService(WsPrivateAsync):
     def __init__(self, url: str, api_key: str = API_KEY, passphrase: str = API_PASSPHRASE,
                  secret_key: str = API_KEY_SECRET, useServerTime: bool = False):
@@ -52,31 +56,25 @@ class WssPositionManagementService(WsPrivateAsync):
 
 
 def _callback(message) -> None:
-    # 统一把 str → dict
-    if isinstance(message, str):
-        try:
-            message = json.loads(message)
-        except json.JSONDecodeError:
-            logger.warning("非 JSON 消息：%s", message)
-            return
-        
-    # print(message)
-    arg = message.get("arg")
-    if not arg or not arg.get("channel"):
+    record(CaptureSource.PMS, message)
+    # 订阅确认和其他频道的消息在完整解码前丢弃
+    message = decode_message(message, POSITION_CHANNELS)
+    if not message:
         return
-    if message.get("event") == "subscribe":
-        return
-    if arg.get("channel") == "balance_and_position":
+    # print(message)
+    channel = message["arg"]["channel"]
+    if channel == "balance_and_position":
         on_balance_and_position(message)
         # print(balance_and_position_container)
-    if arg.get("channel") == "account":
+    elif channel == "account":
         # print(message)
         on_account(message)
         # print(f'account_container: {account_container}')
-    if arg.get("channel") == "positions":
+    elif channel == "positions":
         # print(message)
         on_position(message)
         # print(positions_container)
+    notify_state_change(channel)
 
 
 def on_balance_and_position(message):
@@ -1,11 +1,13 @@
 import time
 import traceback
 import asyncio
+import functools
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import List, Dict, Tuple, Optional
+from collections import deque
+from typing import List, Dict, Tuple, Optional, Deque
 import logging
-from copy import deepcopy
 
 from okx.Status import StatusAPI
 from okx_market_maker.market_data_service.model.Instrument import Instrument, InstState
@@ -17,24 +19,54 @@ from okx_market_maker.order_management_service.model.OrderRequest import PlaceOr
     AmendOrderRequest, CancelOrderRequest
 from okx.Trade import TradeAPI
 from okx.Account import AccountAPI
+from websockets.exceptions import ConnectionClosed
 from okx_market_maker.config.settings import *
 from okx_market_maker import orders_container, order_books, account_container, positions_container, tickers_container, \
-    mark_px_container
+    state_change_listeners, \
+    mark_px_container, order_change_feeds
 from okx_market_maker.strategy.model.StrategyOrder import StrategyOrder, StrategyOrderStatus
+from okx_market_maker.strategy.model.StrategyOrderBook import StrategyOrderBook
 from okx_market_maker.strategy.model.StrategyMeasurement import StrategyMeasurement
 from okx_market_maker.market_data_service.model.OrderBook import OrderBook
 from okx_market_maker.position_management_service.model.Account import Account
-from okx_market_maker.order_management_service.model.Order import Orders, Order, OrderState, OrderSide
+from okx_market_maker.order_management_service.model.Order import Orders, Order, OrderState, OrderSide, \
+    OrderChange, TERMINAL_ORDER_STATES
 from okx_market_maker.strategy.risk.RiskCalculator import RiskCalculator
-from okx_market_maker.market_data_service.WssMarketDataService import WssMarketDataService
+from okx_market_maker.strategy.Watchdog import Watchdog
+from okx_market_maker.market_data_service.WssMarketDataService import WssMarketDataService, ORDER_BOOK_CHANNELS
 from okx_market_maker.order_management_service.WssOrderManagementService import WssOrderManagementService
+from okx_market_maker.order_management_service.WssOrderGateway import WssOrderGateway
+from okx_market_maker.order_management_service.OrderScheduler import OrderScheduler, SUPERSEDED_CODE, \
+    CANCELED_BEFORE_SENT_MSG
 from okx_market_maker.position_management_service.WssPositionManagementService import WssPositionManagementService
 from okx_market_maker.market_data_service.RESTMarketDataService import RESTMarketDataService
-from okx_market_maker.utils.OkxEnum import AccountConfigMode, TdMode, InstType
+from okx_market_maker.market_data_service.AsyncRESTMarketDataService import AsyncRESTMarketDataService
+from okx_market_maker.market_data_service.WssMarkPriceService import WssMarkPriceService
+from okx_market_maker.utils.OkxEnum import AccountConfigMode, TdMode, InstType, OrderOp
 from okx_market_maker.utils.TdModeUtil import TdModeUtil
+from okx_market_maker.capture.MessageRecorder import start_capture, stop_capture
+from okx_market_maker.utils.LatencyUtil import BOOK_TO_DECISION, DECISION, record_latency, get_book_received_ns, \
+    mark_orders_decided, mark_orders_sent, mark_order_acked, get_latency_summary, dump_latency_summary
 
 logger = logging.getLogger(__name__)
 
+# 事件驱动模式下，除交易产品的订单簿外会唤醒决策循环的频道
+WAKEUP_CHANNELS = frozenset(["orders", "account", "positions"])
+# 风险汇总依赖的 WebSocket 频道，行情与标记价格的变化由快照的 version 体现
+RISK_INPUT_CHANNELS = frozenset(["account", "positions"])
+# 下单的 clOrdId 重复（sCode）
+DUPLICATE_CLIENT_ORDER_ID_CODE = "51016"
+# 查询的订单不存在（code）
+ORDER_NOT_EXIST_CODE = "51603"
+
+
+@dataclass
+class _OrderBatchStats:
+    batches: int = 0
+    failures: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+
+
 class BaseStrategy(ABC):
     """
     基础策略抽象基类，封装了交易API、状态API、账户API等基本功能。
@@ -45,9 +77,14 @@ class BaseStrategy(ABC):
     account_api: AccountAPI
     instrument: Instrument
     trading_instrument_type: InstType
-    _strategy_order_dict: Dict[str, StrategyOrder]
+    _strategy_order_book: StrategyOrderBook
     _strategy_measurement: StrategyMeasurement
     _account_mode: Optional[AccountConfigMode] = None
+    _account_state_version: int = 0
+    # 最近一次决策的结束时间与其看到的订单簿消息到达时间（perf_counter_ns），用于延迟统计
+    _decision_end_ns: int = 0
+    _decision_book_ns: int = 0
+    order_gateway: Optional[WssOrderGateway] = None
 
     def __init__(
         self, 
@@ -67,15 +104,32 @@ class BaseStrategy(ABC):
         #     inst_id=TRADING_INSTRUMENT_ID,
         #     channel="books"
         # )
-        self.rest_mds = RESTMarketDataService(is_demo_trading)
+        # 标记价格来自 WebSocket 时，REST 只刷新行情
+        poll_mark_px = MARK_PX_SOURCE != "ws"
+        self.rest_mds = AsyncRESTMarketDataService(
+            is_demo_trading, interval_sec=None if poll_mark_px else {
+                name: 0 for name in REST_MARKET_DATA_INTERVAL_SEC if name.startswith("mark-px")}) \
+            if ASYNC_REST_MARKET_DATA else RESTMarketDataService(is_demo_trading, poll_mark_px=poll_mark_px)
         # self.oms = WssOrderManagementService(
         #     url="wss://ws.okx.com:8443/ws/v5/private?brokerId=9999" if is_demo_trading
         #     else "wss://ws.okx.com:8443/ws/v5/private")
         # self.pms = WssPositionManagementService(
         #     url="wss://ws.okx.com:8443/ws/v5/private?brokerId=9999" if is_demo_trading
         #     else "wss://ws.okx.com:8443/ws/v5/private")
-        self._strategy_order_dict = dict()
+        # 按 clOrdId 存取的策略订单，同时按方向维护价格有序索引
+        self._strategy_order_book = StrategyOrderBook()
+        # OMS 发布的订单变化，运行期间注册到 order_change_feeds，由 _update_strategy_order_status 消费
+        self._order_changes: Deque[OrderChange] = deque()
         self.params_loader = ParamsLoader()
+        # 同时在途的批量请求数上限，各批次的确认到达后各自处理
+        self._order_batch_semaphore = asyncio.Semaphore(ORDER_MAX_CONCURRENT_BATCHES)
+        self._order_batch_stats: Dict[str, _OrderBatchStats] = {op.value: _OrderBatchStats() for op in (
+            OrderOp.BATCH_ORDER, OrderOp.BATCH_AMEND, OrderOp.BATCH_CANCEL)}
+        # 按限速与优先级（撤单 > 改单 > 下单）排队发送订单请求
+        self.order_scheduler = OrderScheduler(self._send_order_batch)
+        # 核对超时下单的后台任务
+        self._reconcile_tasks = set()
+        self.watchdog = Watchdog(self.trade_api, self._get_kill_switch_targets) if WATCHDOG_ENABLED else None
 
     async def _create_ws_services(self, is_demo_trading: bool) -> None:
         """在事件循环内实例化，保证 loop 正确"""
@@ -85,12 +139,20 @@ class BaseStrategy(ABC):
             inst_id=TRADING_INSTRUMENT_ID,
             channel="books"
         )
+        self.mark_px_service = WssMarkPriceService(
+            url="wss://ws.okx.com:8443/ws/v5/public?brokerId=9999" if is_demo_trading
+            else "wss://ws.okx.com:8443/ws/v5/public",
+            inst_ids=[TRADING_INSTRUMENT_ID],
+            is_demo_trading=is_demo_trading
+        ) if MARK_PX_SOURCE == "ws" else None
         self.oms = WssOrderManagementService(
             url="wss://ws.okx.com:8443/ws/v5/private?brokerId=9999" if is_demo_trading
             else "wss://ws.okx.com:8443/ws/v5/private")
         self.pms = WssPositionManagementService(
             url="wss://ws.okx.com:8443/ws/v5/private?brokerId=9999" if is_demo_trading
             else "wss://ws.okx.com:8443/ws/v5/private")
+        # 下单 / 改单 / 撤单复用 oms 已登录的私有连接
+        self.order_gateway = WssOrderGateway(self.oms) if ORDER_ENTRY_CHANNEL == "ws" else None
 
     @abstractmethod
     def order_operation_decision(self) -> \
@@ -98,37 +160,32 @@ class BaseStrategy(ABC):
         pass
 
     def get_strategy_orders(self) -> Dict[str, StrategyOrder]:
-        return self._strategy_order_dict.copy()
+        return self._strategy_order_book.copy()
+
+    def get_strategy_order_by_order_id(self, order_id: str) -> Optional[StrategyOrder]:
+        return self._strategy_order_book.get_by_order_id(order_id)
 
     def get_bid_strategy_orders(self) -> List[StrategyOrder]:
         """
-        Fetch all buy strategy orders inside the BaseStrategy
+        Fetch all buy strategy orders inside the BaseStrategy, best (highest) price first
         :return: List[StrategyOrder]
         """
-        buy_orders = list()
-        for cid, strategy_order in self._strategy_order_dict.items():
-            if strategy_order.side == OrderSide.BUY:
-                buy_orders.append(strategy_order)
-        return sorted(buy_orders, key=lambda x: float(x.price), reverse=True)
+        return self._strategy_order_book.get_side_orders(OrderSide.BUY)
 
     def get_ask_strategy_orders(self) -> List[StrategyOrder]:
         """
-        Fetch all sell strategy orders inside the BaseStrategy
+        Fetch all sell strategy orders inside the BaseStrategy, best (lowest) price first
         
         Args:
             self
         Returns:
             List[StrategyOrder]: List of strategy orders with sell side
         """
-        sell_orders = list()
-        for cid, strategy_order in self._strategy_order_dict.items():
-            if strategy_order.side == OrderSide.SELL:
-                sell_orders.append(strategy_order)
-        return sorted(sell_orders, key=lambda x: float(x.price), reverse=False)
+        return self._strategy_order_book.get_side_orders(OrderSide.SELL)
 
-    def place_orders(self, order_request_list: List[PlaceOrderRequest]):
+    async def place_orders(self, order_request_list: List[PlaceOrderRequest]):
         """
-        place order and cache strategy order, Maximum 20 orders can be placed per request
+        place order and cache strategy order, orders are queued in the order scheduler and sent in batches of 20
         :param order_request_list: https://www.okx.com/docs-v5/en/#rest-api-trade-place-multiple-orders
         :return:
         """
@@ -141,140 +198,322 @@ class BaseStrategy(ABC):
                 client_order_id=order_request.client_order_id,
                 strategy_order_status=StrategyOrderStatus.SENT, tgt_ccy=order_request.tgt_ccy
             )
-            self._strategy_order_dict[order_request.client_order_id] = strategy_order
+            self._strategy_order_book[order_request.client_order_id] = strategy_order
             order_data_list.append(order_request.to_dict())
             print(f"PLACE ORDER {order_request.ord_type.value} {order_request.side.value} {order_request.inst_id} "
                   f"{order_request.size} @ {order_request.price}")
-            if len(order_data_list) >= 20:
-                self._place_orders(order_data_list)
-                order_data_list = []
-        if order_data_list:
-            self._place_orders(order_data_list)
+        await self._schedule_orders(OrderOp.BATCH_ORDER, order_data_list, self._on_place_result)
 
-    def _place_orders(self, order_data_list: List[Dict]):
+    async def _schedule_orders(self, op: OrderOp, order_data_list: List[Dict], on_result) -> None:
         """
-        Place order through REST API, check the individual order placing response,
-        if successful, mark strategy orders as ACK
-        if unsuccessful, delete the strategy orders from strategy order cache
+        Queue the order requests in the order scheduler, which sends cancels before amends before places within the
+        rate limits and merges superseded requests of the same clOrdId. Each order's response is handled by on_result
+        as soon as its batch is answered. Exceptions are raised after every order has finished.
+        :param op: OrderOp.BATCH_ORDER / BATCH_AMEND / BATCH_CANCEL
         :param order_data_list: list of order requests' json
+        :param on_result: callback handling one order's response, e.g. self._on_place_result
         :return: None
         """
-        result = self.trade_api.place_multiple_orders(order_data_list)
-        print(result)
-        time.sleep(2)
-        if result["code"] == '1':
-            for order_data in order_data_list:
-                client_order_id = order_data['clOrdId']
-                if client_order_id in self._strategy_order_dict:
-                    del self._strategy_order_dict[client_order_id]
+        if not order_data_list:
+            return
+        if self._decision_end_ns:
+            mark_orders_decided(op.value, [d.get("clOrdId") for d in order_data_list], self._decision_end_ns,
+                                self._decision_book_ns)
+        futures = self.order_scheduler.submit(op, order_data_list)
+        for future in futures:
+            future.add_done_callback(functools.partial(self._handle_order_result, on_result))
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    @staticmethod
+    def _handle_order_result(on_result, future: asyncio.Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        # 结果未知（请求超时）时保持策略订单当前状态，由 orders 频道的推送或 _reconcile_placements 确认
+        if result is not None:
+            if result.get("sCode") == "0":
+                mark_order_acked(result.get("clOrdId"))
+            on_result(result)
+
+    async def _send_order_batch(self, op: OrderOp, order_data_list: List[Dict]) -> Optional[Dict]:
+        """
+        Send one batch of at most 20 orders through the private WebSocket order gateway when ORDER_ENTRY_CHANNEL
+        is "ws" and the connection is up, otherwise through REST API. Both return the same response structure.
+        At most ORDER_MAX_CONCURRENT_BATCHES batches are in flight, REST calls run in the default executor so the
+        event loop keeps processing market data. The latency of every batch is recorded, see get_order_batch_stats.
+        :param op: OrderOp.BATCH_ORDER / BATCH_AMEND / BATCH_CANCEL
+        :param order_data_list: list of order requests' json
+        :return: exchange response, None if the WebSocket request timed out and the result is unknown
+        """
+        stats = self._order_batch_stats[op.value]
+        async with self._order_batch_semaphore:
+            start = time.perf_counter()
+            mark_orders_sent(op.value, [d.get("clOrdId") for d in order_data_list], time.perf_counter_ns())
+            stats.batches += 1
+            try:
+                result = await self._request_order_batch(op, order_data_list)
+            except Exception:
+                stats.failures += 1
+                self._record_error()
+                raise
+            latency_ms = (time.perf_counter() - start) * 1000
+        stats.latencies_ms = stats.latencies_ms[-99:] + [latency_ms]
+        if result is None or result.get("code") != "0":
+            stats.failures += 1
+        logger.debug(f"{op.value} batch of {len(order_data_list)} answered in {latency_ms:.1f}ms")
+        return result
+
+    async def _request_order_batch(self, op: OrderOp, order_data_list: List[Dict]) -> Optional[Dict]:
+        retried = False
+        if self.order_gateway is not None and self.order_gateway.is_ready():
+            try:
+                return await self.order_gateway.request(op, order_data_list)
+            except asyncio.TimeoutError as e:
+                # 结果未知，保持策略订单当前状态，由 orders 频道的推送确认；交易所未收到的下单没有推送，需要查询核对
+                logger.warning(f"{e}, waiting for orders channel updates")
+                if op == OrderOp.BATCH_ORDER:
+                    task = asyncio.ensure_future(self._reconcile_placements(order_data_list))
+                    self._reconcile_tasks.add(task)
+                    task.add_done_callback(self._reconcile_tasks.discard)
+                return None
+            except (ConnectionError, ConnectionClosed) as e:
+                # 连接断开，改用 REST 重发；改单与撤单重复发送无副作用
+                logger.warning(f"{op.value} over WebSocket failed: {e!r}, retrying over REST")
+                retried = True
+        if op == OrderOp.BATCH_ORDER:
+            request = self.trade_api.place_multiple_orders
+        elif op == OrderOp.BATCH_AMEND:
+            request = self.trade_api.amend_multiple_orders
         else:
-            data = result['data']
-            for single_order_data in data:
-                client_order_id = single_order_data["clOrdId"]
-                if client_order_id not in self._strategy_order_dict:
-                    continue
-                if single_order_data['sCode'] != '0':
-                    del self._strategy_order_dict[client_order_id]
-                    continue
-                strategy_order: StrategyOrder = self._strategy_order_dict[client_order_id]
-                strategy_order.order_id = single_order_data["ordId"]
-                strategy_order.strategy_order_status = StrategyOrderStatus.ACK
+            request = self.trade_api.cancel_multiple_orders
+        result = await asyncio.get_running_loop().run_in_executor(None, functools.partial(request, order_data_list))
+        if retried and op == OrderOp.BATCH_ORDER:
+            self._accept_duplicate_placements(result)
+        return result
+
+    async def _reconcile_placements(self, order_data_list: List[Dict]) -> None:
+        """
+        Look up placements whose WebSocket request timed out by clOrdId over REST, until the orders channel or the
+        lookup confirms them. Orders found on the exchange are acknowledged, orders the exchange does not know are
+        deleted, so they do not hold a ladder slot forever. An order still unconfirmed after ORDER_RECONCILE_ATTEMPTS
+        lookups is deleted as well.
+        :param order_data_list: list of the timed-out placements' json
+        :return: None
+        """
+        loop = asyncio.get_running_loop()
+        for order_data in order_data_list:
+            client_order_id = order_data["clOrdId"]
+            for _ in range(ORDER_RECONCILE_ATTEMPTS):
+                strategy_order = self._strategy_order_book.get(client_order_id)
+                # orders 频道的推送会设置 ordId
+                if strategy_order is None or strategy_order.order_id:
+                    break
+                try:
+                    result = await loop.run_in_executor(None, functools.partial(
+                        self.trade_api.get_order, instId=order_data["instId"], clOrdId=client_order_id))
+                except Exception as e:
+                    logger.warning(f"order {client_order_id} lookup failed: {e}")
+                    result = {}
+                if result.get("code") == "0" and result.get("data"):
+                    self._on_place_result({"clOrdId": client_order_id, "ordId": result["data"][0].get("ordId", ""),
+                                           "sCode": "0", "sMsg": ""})
+                    break
+                if result.get("code") == ORDER_NOT_EXIST_CODE:
+                    logger.warning(f"order {client_order_id} was never placed, dropping it")
+                    self._strategy_order_book.pop(client_order_id, None)
+                    break
+                await asyncio.sleep(ORDER_REQUEST_TIMEOUT_SEC)
+            else:
+                strategy_order = self._strategy_order_book.get(client_order_id)
+                if strategy_order is not None and not strategy_order.order_id:
+                    logger.error(f"order {client_order_id} unconfirmed after {ORDER_RECONCILE_ATTEMPTS} lookups, "
+                                 f"dropping it")
+                    del self._strategy_order_book[client_order_id]
+
+    @staticmethod
+    def _accept_duplicate_placements(result: Dict) -> None:
+        """
+        The WebSocket request of a placement retried over REST may have reached the exchange before the connection
+        closed, the retry is then rejected for a duplicate clOrdId. Treat those orders as placed so the strategy
+        orders are kept, their order ids and states come from the orders channel.
+        :param result: REST batch response, modified in place
+        :return: None
+        """
+        for single_order_data in (result or {}).get("data") or []:
+            if single_order_data.get("sCode") == DUPLICATE_CLIENT_ORDER_ID_CODE:
+                logger.warning(f"order {single_order_data.get('clOrdId')} was already placed over WebSocket")
+                single_order_data["sCode"] = "0"
 
-    def amend_orders(self, order_request_list: List[AmendOrderRequest]):
+    def get_order_batch_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        返回每种批量操作的请求数、失败数（含部分失败）与最近 100 个批次耗时的平均值和最大值（毫秒）。
+        """
+        return {op: {"batches": stats.batches, "failures": stats.failures,
+                     "avg_latency_ms": sum(stats.latencies_ms) / len(stats.latencies_ms) if stats.latencies_ms else 0,
+                     "max_latency_ms": max(stats.latencies_ms, default=0)}
+                for op, stats in self._order_batch_stats.items()}
+
+    def get_order_queue_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        返回订单调度器中每种操作的排队数、排队等待时间（毫秒）与合并、被取代的订单数，见 OrderScheduler.get_stats。
+        """
+        return self.order_scheduler.get_stats()
+
+    def _on_place_result(self, single_order_data: Dict) -> None:
+        """
+        Check the individual order placing response,
+        if successful, mark strategy orders as ACK
+        if unsuccessful, delete the strategy orders from strategy order cache
+        :param single_order_data: {"clOrdId", "ordId", "sCode", "sMsg", ...}
+        :return: None
         """
-        amend order and cache strategy order,  Maximum 20 orders can be amended per request
+        client_order_id = single_order_data["clOrdId"]
+        if client_order_id not in self._strategy_order_book:
+            return
+        if single_order_data['sCode'] == SUPERSEDED_CODE:
+            # 被同一 clOrdId 的后续请求取代，策略订单由后续请求的结果处理
+            return
+        if single_order_data['sCode'] != '0':
+            del self._strategy_order_book[client_order_id]
+            return
+        # 重发被判为 clOrdId 重复的下单没有 ordId，由 orders 频道的推送给出
+        if single_order_data.get("ordId"):
+            self._strategy_order_book.set_order_id(client_order_id, single_order_data["ordId"])
+        strategy_order: StrategyOrder = self._strategy_order_book[client_order_id]
+        # orders 频道的推送可能先于确认到达，此时保留推送给出的状态
+        if strategy_order.strategy_order_status == StrategyOrderStatus.SENT:
+            strategy_order.strategy_order_status = StrategyOrderStatus.ACK
+
+    async def amend_orders(self, order_request_list: List[AmendOrderRequest]):
+        """
+        amend order and cache strategy order, orders are queued in the order scheduler and sent in batches of 20
         :param order_request_list: https://www.okx.com/docs-v5/en/#rest-api-trade-amend-multiple-orders
         :return:
         """
         order_data_list = []
         for order_request in order_request_list:
             client_order_id = order_request.client_order_id
-            if client_order_id not in self._strategy_order_dict:
+            if client_order_id not in self._strategy_order_book:
                 continue
-            strategy_order = self._strategy_order_dict[client_order_id]
+            strategy_order = self._strategy_order_book[client_order_id]
             if order_request.new_size:
                 strategy_order.size = order_request.new_size
             if order_request.new_price:
-                strategy_order.price = order_request.new_price
+                self._strategy_order_book.reprice(client_order_id, order_request.new_price)
             strategy_order.amend_req_id = order_request.req_id
             strategy_order.strategy_order_status = StrategyOrderStatus.AMD_SENT
             print(f"AMEND ORDER {order_request.client_order_id} with new size {order_request.new_size} or new price "
                   f"{order_request.new_price}, req_id is {order_request.req_id}")
             order_data_list.append(order_request.to_dict())
-            if len(order_data_list) >= 20:
-                self._amend_orders(order_data_list)
-                order_data_list = []
-        if order_data_list:
-            self._amend_orders(order_data_list)
+        await self._schedule_orders(OrderOp.BATCH_AMEND, order_data_list, self._on_amend_result)
 
-    def _amend_orders(self, order_data_list: List[Dict]):
+    def _on_amend_result(self, single_order_data: Dict) -> None:
         """
-        Amend order through REST API, check the individual order amending response,
+        Check the individual order amending response,
         Mark strategy orders as AMD_ACK, the strategy order status will be further confirmed by OMS update.
-        :param order_data_list: list of order requests' json
+        :param single_order_data: {"clOrdId", "ordId", "sCode", "sMsg", ...}
         :return: None
         """
-        result = self.trade_api.amend_multiple_orders(order_data_list)
-        data = result['data']
-        for single_order_data in data:
-            client_order_id = single_order_data["clOrdId"]
-            if client_order_id not in self._strategy_order_dict:
-                continue
-            if single_order_data['sCode'] != '0':
-                continue
-            strategy_order: StrategyOrder = self._strategy_order_dict[client_order_id]
+        client_order_id = single_order_data["clOrdId"]
+        if client_order_id not in self._strategy_order_book:
+            return
+        if single_order_data['sCode'] != '0':
+            return
+        strategy_order: StrategyOrder = self._strategy_order_book[client_order_id]
+        if strategy_order.strategy_order_status == StrategyOrderStatus.AMD_SENT:
             strategy_order.strategy_order_status = StrategyOrderStatus.AMD_ACK
 
-    def cancel_orders(self, order_request_list: List[CancelOrderRequest]):
+    async def cancel_orders(self, order_request_list: List[CancelOrderRequest]):
         """
-        cancel order and cache strategy order, Maximum 20 orders can be canceled per request
+        cancel order and cache strategy order, orders are queued in the order scheduler and sent in batches of 20
         :param order_request_list: https://www.okx.com/docs-v5/en/#rest-api-trade-cancel-multiple-orders
         :return:
         """
         order_data_list = []
         for order_request in order_request_list:
             client_order_id = order_request.client_order_id
-            if client_order_id not in self._strategy_order_dict:
+            if client_order_id not in self._strategy_order_book:
                 continue
-            strategy_order = self._strategy_order_dict[client_order_id]
+            strategy_order = self._strategy_order_book[client_order_id]
             strategy_order.strategy_order_status = StrategyOrderStatus.CXL_SENT
             print(f"CANCELING ORDER {order_request.client_order_id}")
             order_data_list.append(order_request.to_dict())
-            if len(order_data_list) >= 20:
-                self._cancel_orders(order_data_list)
-                order_data_list = []
-        if order_data_list:
-            self._cancel_orders(order_data_list)
+        await self._schedule_orders(OrderOp.BATCH_CANCEL, order_data_list, self._on_cancel_result)
 
-    def _cancel_orders(self, order_data_list: List[Dict]):
+    def _on_cancel_result(self, single_order_data: Dict) -> None:
         """
-        Cancel order through REST API, check the individual order canceling response,
+        Check the individual order canceling response,
         Mark strategy orders as CXL_ACK, the strategy order status will be further confirmed by OMS update.
-        :param order_data_list: list of order requests' json
+        Orders canceled before their placement was sent never reach the exchange and are deleted directly.
+        :param single_order_data: {"clOrdId", "ordId", "sCode", "sMsg", ...}
         :return: None
         """
-        result = self.trade_api.cancel_multiple_orders(order_data_list)
-        data = result['data']
-        for single_order_data in data:
-            client_order_id = single_order_data["clOrdId"]
-            if client_order_id not in self._strategy_order_dict:
-                continue
-            if single_order_data['sCode'] != '0':
-                continue
-            strategy_order: StrategyOrder = self._strategy_order_dict[client_order_id]
+        client_order_id = single_order_data["clOrdId"]
+        if client_order_id not in self._strategy_order_book:
+            return
+        if single_order_data['sCode'] != '0':
+            return
+        if single_order_data.get("sMsg") == CANCELED_BEFORE_SENT_MSG:
+            del self._strategy_order_book[client_order_id]
+            return
+        strategy_order: StrategyOrder = self._strategy_order_book[client_order_id]
+        if strategy_order.strategy_order_status == StrategyOrderStatus.CXL_SENT:
             strategy_order.strategy_order_status = StrategyOrderStatus.CXL_ACK
 
-    def cancel_all(self):
+    async def execute_orders(self, place_order_list: List[PlaceOrderRequest],
+                             amend_order_list: List[AmendOrderRequest],
+                             cancel_order_list: List[CancelOrderRequest]) -> None:
+        """
+        Dispatch place, amend and cancel requests of one decision concurrently.
+        :return: None
+        """
+        try:
+            results = await asyncio.gather(self.place_orders(place_order_list), self.amend_orders(amend_order_list),
+                                           self.cancel_orders(cancel_order_list), return_exceptions=True)
+        finally:
+            # 决策之外的请求（如 cancel_all）不计入决策相关的延迟
+            self._decision_end_ns = 0
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def _get_kill_switch_targets(self) -> List[Dict]:
+        """
+        Cancel requests for every strategy order, plus every live order of the trading instrument in the orders cache
+        if WATCHDOG_CANCEL_UNTRACKED_ORDERS is set, called by the watchdog from its own thread.
+        :return: list of cancel requests' json
+        """
+        targets = [CancelOrderRequest(inst_id=strategy_order.inst_id, client_order_id=cid).to_dict()
+                   for cid, strategy_order in self._strategy_order_book.copy().items()]
+        client_order_ids = {target["clOrdId"] for target in targets}
+        if WATCHDOG_CANCEL_UNTRACKED_ORDERS and orders_container:
+            for order in list(orders_container[0].get_active_orders().values()):
+                if order.inst_id == TRADING_INSTRUMENT_ID and order.cl_ord_id not in client_order_ids:
+                    targets.append(CancelOrderRequest(inst_id=order.inst_id, order_id=order.ord_id).to_dict())
+        return targets
+
+    def _record_error(self) -> None:
+        if self.watchdog is not None:
+            self.watchdog.record_error()
+
+    def _beat(self) -> None:
+        if self.watchdog is not None:
+            self.watchdog.beat()
+
+    async def cancel_all(self):
         """
         Canceling all existing strategy orders
         :return:
         """
         to_cancel = []
-        for cid, strategy_order in self._strategy_order_dict.items():
+        for cid, strategy_order in self._strategy_order_book.items():
             inst_id = strategy_order.inst_id
             cancel_req = CancelOrderRequest(inst_id=inst_id, client_order_id=cid)
             to_cancel.append(cancel_req)
-        self.cancel_orders(to_cancel)
+        await self.cancel_orders(to_cancel)
 
     def decide_td_mode(self, instrument: Instrument) -> TdMode:
         """
@@ -324,12 +563,23 @@ class BaseStrategy(ABC):
 
     @staticmethod
     def get_orders() -> Orders:
+        """
+        返回订单缓存的只读快照（写时复制，O(1)），移除订单使用 remove_orders_from_cache。
+        """
         if not orders_container:
             raise ValueError(f"order information not ready in orders cache!")
         orders: Orders = orders_container[0]
-        return deepcopy(orders)
+        return orders.snapshot()
+
+    @staticmethod
+    def remove_orders_from_cache(order_list: List[Order]) -> None:
+        if orders_container and order_list:
+            orders_container[0].remove_orders(order_list)
 
     async def _health_check(self) -> bool:
+        if self.watchdog is not None and self.watchdog.is_tripped():
+            logger.warning(f"watchdog tripped: {'; '.join(self.watchdog.tripped_reasons)}")
+            return False
         try:
             order_book: OrderBook = self.get_order_book()
         except ValueError:
@@ -338,11 +588,16 @@ class BaseStrategy(ABC):
         if order_book_delay > ORDER_BOOK_DELAYED_SEC:
             logger.warning(f"{TRADING_INSTRUMENT_ID} delayed in order books cache for {order_book_delay:.2f} seconds!")
             return False
+        if self.mds.is_resyncing(TRADING_INSTRUMENT_ID):
+            # 快照超时未到达时重新发起同步，否则健康检查会一直失败
+            if not self.mds.is_resyncing(TRADING_INSTRUMENT_ID, ORDER_BOOK_RESYNC_TIMEOUT_SEC):
+                logger.warning(f"{TRADING_INSTRUMENT_ID} orderbook resync timed out, re-sync orderbook!")
+                await self.mds.resync(TRADING_INSTRUMENT_ID)
+            return False
         check_sum_result: bool = order_book.do_check_sum()
         if not check_sum_result:
-            logger.warning(f"{TRADING_INSTRUMENT_ID} orderbook checksum failed, re-subscribe MDS!")
-            await self.mds.stop_service()
-            await self.mds.run_service()
+            logger.warning(f"{TRADING_INSTRUMENT_ID} orderbook checksum failed, re-sync orderbook!")
+            await self.mds.resync(TRADING_INSTRUMENT_ID)
             return False
         try:
             account = self.get_account()
@@ -355,38 +610,68 @@ class BaseStrategy(ABC):
         return True
 
     def _update_strategy_order_status(self) -> None:
-        orders_cache: Orders = self.get_orders()
-        order_not_found_in_cache = {}
-        order_to_remove_from_cache = []
-        for client_order_id in self._strategy_order_dict.copy():
-            exchange_order: Order = orders_cache.get_order_by_client_order_id(client_order_id=client_order_id)
-            strategy_order = self._strategy_order_dict[client_order_id]
-            if not exchange_order:
-                order_not_found_in_cache[client_order_id] = strategy_order
-
-            filled_size_from_update = Decimal(exchange_order.acc_fill_sz) - Decimal(strategy_order.filled_size)
-            side_flag = 1 if exchange_order.side == OrderSide.BUY else -1
-            self._strategy_measurement.net_filled_qty += filled_size_from_update * side_flag
-            self._strategy_measurement.trading_volume += filled_size_from_update
-            if side_flag == 1:
-                self._strategy_measurement.buy_filled_qty += filled_size_from_update
-            else:
-                self._strategy_measurement.sell_filled_qty += filled_size_from_update
-            if exchange_order.state == OrderState.LIVE:
+        """
+        Apply the order changes published by the OMS since the last call to the strategy orders and the fill
+        counters of the strategy measurement. Only changed orders are visited, an idle call costs nothing.
+        Terminal strategy orders are deleted and removed from the orders cache.
+        """
+        order_changes = self._order_changes
+        if not order_changes:
+            return
+        terminal_order_ids = []
+        while order_changes:
+            change: OrderChange = order_changes.popleft()
+            strategy_order = self._strategy_order_book.get(change.cl_ord_id)
+            if strategy_order is None:
+                continue
+            if change.ord_id:
+                self._strategy_order_book.set_order_id(change.cl_ord_id, change.ord_id)
+            filled_size_from_update = Decimal(change.acc_fill_sz) - Decimal(strategy_order.filled_size)
+            if filled_size_from_update > 0:
+                side_flag = 1 if strategy_order.side == OrderSide.BUY else -1
+                self._strategy_measurement.net_filled_qty += filled_size_from_update * side_flag
+                self._strategy_measurement.trading_volume += filled_size_from_update
+                if side_flag == 1:
+                    self._strategy_measurement.buy_filled_qty += filled_size_from_update
+                else:
+                    self._strategy_measurement.sell_filled_qty += filled_size_from_update
+                strategy_order.filled_size = change.acc_fill_sz
+                if change.fill_px:
+                    strategy_order.avg_fill_price = change.fill_px
+            if change.state == OrderState.LIVE:
                 strategy_order.strategy_order_status = StrategyOrderStatus.LIVE
-
-            if exchange_order.state == OrderState.PARTIALLY_FILLED:
+            elif change.state == OrderState.PARTIALLY_FILLED:
                 strategy_order.strategy_order_status = StrategyOrderStatus.PARTIALLY_FILLED
-                strategy_order.filled_size = exchange_order.acc_fill_sz
-                strategy_order.avg_fill_price = exchange_order.fill_px
-
-            if exchange_order.state == OrderState.CANCELED or exchange_order.state == OrderState.FILLED:
-                del self._strategy_order_dict[client_order_id]
-                order_to_remove_from_cache.append(exchange_order)
+            elif change.state in TERMINAL_ORDER_STATES:
+                del self._strategy_order_book[change.cl_ord_id]
+                terminal_order_ids.append(change.ord_id)
+        if terminal_order_ids and orders_container:
+            orders_cache: Orders = orders_container[0]
+            self.remove_orders_from_cache([order for order in map(orders_cache.get_order_by_order_id,
+                                                                  terminal_order_ids) if order is not None])
+
+    def _decide(self) -> Tuple[List[PlaceOrderRequest], List[AmendOrderRequest], List[CancelOrderRequest]]:
+        """
+        Run order_operation_decision and record the book_to_decision and decision latencies.
+        :return: place, amend and cancel requests
+        """
+        start = time.perf_counter_ns()
+        book_ns = get_book_received_ns(TRADING_INSTRUMENT_ID)
+        # 同一条订单簿消息只计入一次
+        if book_ns != self._decision_book_ns:
+            record_latency(BOOK_TO_DECISION, "", book_ns, start)
+        decision = self.order_operation_decision()
+        self._decision_end_ns = time.perf_counter_ns()
+        self._decision_book_ns = book_ns
+        record_latency(DECISION, "", start, self._decision_end_ns)
+        return decision
 
-        orders_cache.remove_orders(order_to_remove_from_cache)
-        if order_not_found_in_cache:
-            logger.warning(f"Strategy Orders not found in order cache: {order_not_found_in_cache}")
+    @staticmethod
+    def get_latency_summary() -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        返回订单生命周期各阶段的延迟统计（p50 / p99 / p999，微秒），见 LatencyUtil.get_latency_summary。
+        """
+        return get_latency_summary()
 
     def get_params(self) -> None:
         self.params_loader.load_params()
@@ -394,6 +679,13 @@ class BaseStrategy(ABC):
     def get_strategy_measurement(self) -> StrategyMeasurement:
         return self._strategy_measurement
 
+    def get_risk_inputs_version(self) -> Tuple[int, int, int]:
+        """
+        返回风险汇总输入的版本：(行情快照 version, 标记价格快照 version, 账户与持仓更新次数)，
+        三者均未变化时风险汇总的结果不会变化。
+        """
+        return tickers_container[0].version, mark_px_container[0].version, self._account_state_version
+
     def risk_summary(self) -> None:
         account = self.get_account()
         positions = self.get_positions()
@@ -422,6 +714,9 @@ class BaseStrategy(ABC):
         await self.mds.run_service()
         await self.oms.run_service()
         await self.pms.run_service()
+        if self.mark_px_service:
+            await self.mark_px_service.start()
+            await self.mark_px_service.run_service()
 
     def trading_instrument_type(self) -> InstType:
         guessed_inst_type = InstrumentUtil.get_inst_type_from_inst_id(TRADING_INSTRUMENT_ID)
@@ -466,13 +761,33 @@ class BaseStrategy(ABC):
         self.set_strategy_measurement(trading_instrument=TRADING_INSTRUMENT_ID,
                                       trading_instrument_type=self.trading_instrument_type)
         
+        if CAPTURE_DIR:
+            start_capture(CAPTURE_DIR)
         await self._create_ws_services(is_demo_trading=IS_DEMO_TRADING)
         await self._run_exchange_connection()
         # await self._wait_until_data_ready()
 
+        if self.watchdog is not None:
+            self.watchdog.start(asyncio.get_running_loop())
+        order_change_feeds.append(self._order_changes)
+        try:
+            if STRATEGY_LOOP_MODE == "event":
+                await self._run_event_driven_loop()
+            else:
+                await self._run_polling_loop()
+        finally:
+            order_change_feeds.remove(self._order_changes)
+            if self.watchdog is not None:
+                self.watchdog.stop()
+
+    async def _run_polling_loop(self):
+        loop = asyncio.get_running_loop()
         while 1:
+            self._beat()
             try:
-                exchange_normal = self.check_status()
+                self._update_strategy_order_status()
+                # 阻塞的 REST 请求放在线程池执行，避免事件循环停顿触发看门狗
+                exchange_normal = await loop.run_in_executor(None, self.check_status)
                 if not exchange_normal:
                     raise ValueError("There is a ongoing maintenance in OKX.")
                 self.get_params()
@@ -482,25 +797,133 @@ class BaseStrategy(ABC):
                     print(f"Health Check result is {result}")
                     await asyncio.sleep(5)
                     continue
-                # summary
-                self._update_strategy_order_status()
-                place_order_list, amend_order_list, cancel_order_list = self.order_operation_decision()
+                place_order_list, amend_order_list, cancel_order_list = self._decide()
                 # print(place_order_list)
                 # print(amend_order_list)
                 # print(cancel_order_list)
 
-                self.place_orders(place_order_list)
-                self.amend_orders(amend_order_list)
-                self.cancel_orders(cancel_order_list)
+                await self.execute_orders(place_order_list, amend_order_list, cancel_order_list)
 
                 await asyncio.sleep(1)
             except Exception as e:
                 print(traceback.format_exc())
+                self._record_error()
                 try:
-                    self.cancel_all()
+                    await self.cancel_all()
                 except:
                     print(f"Failed to cancel orders: {traceback.format_exc()}")
                 await asyncio.sleep(20)
 
+    def _on_state_change(self, channel: str, key: str) -> None:
+        """
+        WebSocket 回调写入数据后调用，相关状态变化时唤醒决策循环，并记录账户与持仓的更新次数。
+        """
+        if channel in RISK_INPUT_CHANNELS:
+            self._account_state_version += 1
+        if channel in ORDER_BOOK_CHANNELS:
+            if key != TRADING_INSTRUMENT_ID:
+                return
+        elif channel not in WAKEUP_CHANNELS:
+            return
+        self._wakeup_event.set()
+
+    async def _run_event_driven_loop(self):
+        """
+        事件驱动的决策循环：订单簿、订单、账户、持仓更新时唤醒并执行决策。
+        两次决策之间至少间隔 DECISION_MIN_INTERVAL_SEC，期间到达的多次更新合并为一次决策；
+        无更新时每 DECISION_MAX_INTERVAL_SEC 仍执行一次；健康检查失败后暂停 HEALTH_CHECK_BACKOFF_SEC。
+        交易所状态、参数和风险汇总由后台任务按各自周期更新。
+        """
+        loop = asyncio.get_running_loop()
+        self._wakeup_event = asyncio.Event()
+        self._exchange_normal = True
+        state_change_listeners.append(self._on_state_change)
+        slow_check_task = loop.create_task(self._run_slow_checks())
+        risk_summary_task = loop.create_task(self._run_risk_summary())
+        last_decision = 0
+        try:
+            while 1:
+                try:
+                    await asyncio.wait_for(self._wakeup_event.wait(), timeout=DECISION_MAX_INTERVAL_SEC)
+                except asyncio.TimeoutError:
+                    pass
+                wait = last_decision + DECISION_MIN_INTERVAL_SEC - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._wakeup_event.clear()
+                last_decision = loop.time()
+                self._beat()
+                try:
+                    if not await self._decision_step():
+                        # 健康检查失败时暂停决策，避免每条订单簿消息都重复检查并输出日志
+                        await asyncio.sleep(HEALTH_CHECK_BACKOFF_SEC)
+                except Exception:
+                    print(traceback.format_exc())
+                    self._record_error()
+                    try:
+                        await self.cancel_all()
+                    except:
+                        print(f"Failed to cancel orders: {traceback.format_exc()}")
+                    await asyncio.sleep(20)
+        finally:
+            state_change_listeners.remove(self._on_state_change)
+            slow_check_task.cancel()
+            risk_summary_task.cancel()
+
+    async def _decision_step(self) -> bool:
+        """
+        执行一次决策。
+
+        Returns:
+            bool: 健康检查失败、未执行决策时为 False。
+        """
+        # 订单变化在健康检查之前应用，成交不因行情延迟而滞后
+        self._update_strategy_order_status()
+        if not self._exchange_normal:
+            raise ValueError("There is a ongoing maintenance in OKX.")
+        result = await self._health_check()
+        if not result:
+            print(f"Health Check result is {result}")
+            return False
+        place_order_list, amend_order_list, cancel_order_list = self._decide()
+        await self.execute_orders(place_order_list, amend_order_list, cancel_order_list)
+        return True
+
+    async def _run_slow_checks(self) -> None:
+        """
+        后台按 SLOW_CHECK_INTERVAL_SEC 检查交易所状态并重新加载参数，阻塞的 REST 请求放在线程池执行。
+        """
+        loop = asyncio.get_running_loop()
+        while 1:
+            try:
+                self._exchange_normal = await loop.run_in_executor(None, self.check_status)
+                self.get_params()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(traceback.format_exc())
+            await asyncio.sleep(SLOW_CHECK_INTERVAL_SEC)
+
+    async def _run_risk_summary(self) -> None:
+        """
+        后台按 RISK_SUMMARY_INTERVAL_SEC 更新风险汇总，输入版本未变化时跳过。
+        """
+        last_version = None
+        while 1:
+            try:
+                version = self.get_risk_inputs_version()
+                if version != last_version:
+                    self.risk_summary()
+                    last_version = version
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"risk summary skipped: {e}")
+            await asyncio.sleep(RISK_SUMMARY_INTERVAL_SEC)
+
     def run(self) -> None:
-        asyncio.run(self._run_strategy_main())
+        try:
+            asyncio.run(self._run_strategy_main())
+        finally:
+            stop_capture()
+            dump_latency_summary(LATENCY_DUMP_PATH)
@@ -0,0 +1,127 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from okx_market_maker.strategy.model.StrategyOrder import StrategyOrder
+
+
+@dataclass
+class LadderAmend:
+    strategy_order: StrategyOrder
+    new_price: Optional[str] = None  # None: 价格不变
+    new_remaining_size: Optional[str] = None  # None: 剩余数量不变
+
+
+@dataclass
+class LadderDiffResult:
+    to_keep: List[StrategyOrder] = field(default_factory=list)
+    to_place: List[Tuple[str, str]] = field(default_factory=list)
+    to_amend: List[LadderAmend] = field(default_factory=list)
+    to_cancel: List[StrategyOrder] = field(default_factory=list)
+
+    def request_count(self) -> int:
+        return len(self.to_place) + len(self.to_amend) + len(self.to_cancel)
+
+
+class LadderDiff:
+    """
+    这个类对比同一方向的建议挂单 (价格, 数量) 与当前策略订单，计算需要的下单、改单、撤单操作，时间复杂度为线性。
+
+    按以下顺序匹配，每一步处理前一步剩下的全部建议挂单，前一步匹配上的订单不再参与后面的步骤：
+    1. 价格与剩余数量都相同：保持不变。
+    2. 价格相同、剩余数量不同：只改数量。
+    3. 价格相差不超过 amend_tolerance_ticks 个 tick：保留当前价格，数量不同时只改数量。
+    4. 剩余的建议挂单与当前订单按价格从优到劣配对改单，多出的建议挂单下单，多出的当前订单撤单。
+
+    整个阶梯平移一个 tick 时，只有移出和移入的一档需要一次改单，其余订单保持不变。
+    """
+    def __init__(self, tick_sz: Decimal = Decimal(0), amend_tolerance_ticks: int = 0) -> None:
+        """
+        初始化 LadderDiff 类。
+
+        Args:
+            tick_sz (Decimal): 下单价格精度，为 0 时不使用容忍区间。
+            amend_tolerance_ticks (int): 价格相差不超过这么多 tick 的订单不改价，0 表示不容忍。
+        """
+        self.tick_sz = Decimal(tick_sz)
+        self.amend_tolerance_ticks = amend_tolerance_ticks if self.tick_sz > 0 else 0
+
+    @staticmethod
+    def remaining_size(strategy_order: StrategyOrder) -> Decimal:
+        return Decimal(strategy_order.size) - Decimal(strategy_order.filled_size)
+
+    def _to_ticks(self, price: Decimal) -> int:
+        return int((price / self.tick_sz).to_integral_value())
+
+    def _price_key(self, price: Decimal) -> object:
+        return self._to_ticks(price) if self.tick_sz > 0 else price
+
+    def _reuse(self, result: LadderDiffResult, reused_ids: set, strategy_order: StrategyOrder, size: str,
+               size_dec: Decimal) -> None:
+        reused_ids.add(id(strategy_order))
+        if self.remaining_size(strategy_order) == size_dec:
+            result.to_keep.append(strategy_order)
+        else:
+            result.to_amend.append(LadderAmend(strategy_order, new_remaining_size=size))
+
+    def diff(self, proposed_orders: List[Tuple[str, str]], current_orders: List[StrategyOrder]) -> LadderDiffResult:
+        """
+        计算建议挂单与当前订单之间的差异。
+
+        Args:
+            proposed_orders (List[Tuple[str, str]]): 建议挂单 (价格, 数量)，按价格从优到劣排列。
+            current_orders (List[StrategyOrder]): 同一方向的当前策略订单，按价格从优到劣排列。
+        Returns:
+            LadderDiffResult: 保持不变、下单、改单、撤单的订单。
+        """
+        result = LadderDiffResult()
+
+        # 1. 价格与剩余数量都相同的订单保持不变
+        by_price_size: Dict[Tuple[Decimal, Decimal], List[StrategyOrder]] = defaultdict(list)
+        for strategy_order in current_orders:
+            by_price_size[(Decimal(strategy_order.price), self.remaining_size(strategy_order))].append(strategy_order)
+        unmatched_proposed: List[Tuple[str, str, Decimal, Decimal]] = []
+        for price, size in proposed_orders:
+            price_dec, size_dec = Decimal(price), Decimal(size)
+            matched = by_price_size.get((price_dec, size_dec))
+            if matched:
+                result.to_keep.append(matched.pop(0))
+            else:
+                unmatched_proposed.append((price, size, price_dec, size_dec))
+        kept_ids = {id(strategy_order) for strategy_order in result.to_keep}
+        unmatched_current = [o for o in current_orders if id(o) not in kept_ids]
+
+        # 2. 价格相同的订单只改数量，先于容忍区间匹配，避免容忍区间占用其他建议挂单同价位的订单
+        by_price: Dict[object, List[StrategyOrder]] = defaultdict(list)
+        for strategy_order in unmatched_current:
+            by_price[self._price_key(Decimal(strategy_order.price))].append(strategy_order)
+        reused_ids = set()
+        tolerance_proposed: List[Tuple[str, str, object, Decimal]] = []
+        for price, size, price_dec, size_dec in unmatched_proposed:
+            key = self._price_key(price_dec)
+            orders = by_price.get(key)
+            if orders:
+                self._reuse(result, reused_ids, orders.pop(0), size, size_dec)
+            else:
+                tolerance_proposed.append((price, size, key, size_dec))
+
+        # 3. 容忍区间内的订单保留原价格，优先价格最接近的订单
+        offsets = [o for d in range(1, self.amend_tolerance_ticks + 1) for o in (-d, d)]
+        remaining_proposed: List[Tuple[str, str]] = []
+        for price, size, key, size_dec in tolerance_proposed:
+            strategy_order = next((by_price[key + offset].pop(0) for offset in offsets if by_price.get(key + offset)),
+                                  None)
+            if strategy_order is None:
+                remaining_proposed.append((price, size))
+            else:
+                self._reuse(result, reused_ids, strategy_order, size, size_dec)
+        remaining_current = [o for o in unmatched_current if id(o) not in reused_ids]
+
+        # 4. 剩余订单按价格从优到劣配对改单，多出的下单或撤单
+        for (price, size), strategy_order in zip(remaining_proposed, remaining_current):
+            new_size = size if self.remaining_size(strategy_order) != Decimal(size) else None
+            result.to_amend.append(LadderAmend(strategy_order, new_price=price, new_remaining_size=new_size))
+        result.to_place.extend(remaining_proposed[len(remaining_current):])
+        result.to_cancel.extend(remaining_current[len(remaining_proposed):])
+        return result
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from okx.Trade import TradeAPI
+from okx_market_maker import order_books
+from okx_market_maker.config.settings import TRADING_INSTRUMENT_ID, WATCHDOG_CHECK_INTERVAL_SEC, \
+    WATCHDOG_LOOP_STALL_SEC, WATCHDOG_DECISION_STALL_SEC, WATCHDOG_BOOK_STALE_SEC, WATCHDOG_MAX_ERRORS, \
+    WATCHDOG_ERROR_WINDOW_SEC, WATCHDOG_CANCEL_TIMEOUT_SEC, WATCHDOG_CANCEL_ALL_AFTER_SEC, \
+    ORDER_MAX_CONCURRENT_BATCHES
+from okx_market_maker.order_management_service.WssOrderGateway import ORDER_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+CANCEL_ALL_AFTER_ENDPOINT = "/api/v5/trade/cancel-all-after"
+
+
+class Watchdog:
+    """
+    这个类在独立线程中监控策略的运行状态，异常时立即撤销所有订单（kill switch），不依赖事件循环与决策循环。
+
+    触发条件：
+    - 事件循环停顿超过 WATCHDOG_LOOP_STALL_SEC（事件循环内的定时心跳未更新）
+    - 决策循环超过 WATCHDOG_DECISION_STALL_SEC 没有执行（beat 未被调用）
+    - 交易产品的订单簿超过 WATCHDOG_BOOK_STALE_SEC 没有更新
+    - WATCHDOG_ERROR_WINDOW_SEC 内记录的错误数达到 WATCHDOG_MAX_ERRORS
+
+    触发后在本线程用 REST 按 20 个一批并发撤销 get_cancel_targets 返回的订单，最多等待 WATCHDOG_CANCEL_TIMEOUT_SEC；
+    所有条件恢复正常后自动解除。WATCHDOG_CANCEL_ALL_AFTER_SEC 不为 0 时还会定期续期交易所的 cancel-all-after 倒计时，
+    进程退出或本线程也停止时由交易所撤销账户内的全部订单；stop 时取消倒计时。
+    """
+    def __init__(self, trade_api: TradeAPI, get_cancel_targets: Callable[[], List[Dict]]) -> None:
+        """
+        初始化 Watchdog 类。
+
+        Args:
+            trade_api (TradeAPI): 用于撤单与 cancel-all-after 的 REST 客户端。
+            get_cancel_targets (Callable[[], List[Dict]]): 返回需要撤销的订单参数 {"instId", "clOrdId" / "ordId"}，
+                在 watchdog 线程中调用。
+        """
+        self.trade_api = trade_api
+        self.get_cancel_targets = get_cancel_targets
+        self.tripped_reasons: List[str] = []
+        self.trip_count = 0
+        self.last_cancel_ms: Optional[float] = None
+        now = time.monotonic()
+        self._loop_ts = now
+        self._decision_ts = now
+        self._errors: deque = deque()
+        self._errors_lock = threading.Lock()
+        self._cancel_all_after_ts: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_handle: Optional[asyncio.TimerHandle] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=ORDER_MAX_CONCURRENT_BATCHES,
+                                            thread_name_prefix="watchdog-cancel")
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        在 loop 内启动事件循环心跳，并启动 watchdog 线程。
+        """
+        self._loop = loop
+        self._loop_ts = self._decision_ts = time.monotonic()
+        loop.call_soon_threadsafe(self._tick_loop)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._loop_handle is not None:
+            self._loop_handle.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=WATCHDOG_CHECK_INTERVAL_SEC * 10)
+        # 正常停止时取消 cancel-all-after 倒计时，避免之后撤销账户内的全部订单
+        if self._cancel_all_after_ts is not None:
+            self._cancel_all_after_ts = None
+            self.set_cancel_all_after(0)
+        self._executor.shutdown(wait=False)
+
+    def _tick_loop(self) -> None:
+        self._loop_ts = time.monotonic()
+        if not self._stop.is_set():
+            self._loop_handle = self._loop.call_later(WATCHDOG_CHECK_INTERVAL_SEC, self._tick_loop)
+
+    def beat(self) -> None:
+        """
+        决策循环每次迭代调用。
+        """
+        self._decision_ts = time.monotonic()
+
+    def record_error(self) -> None:
+        """
+        记录一次错误（决策循环异常、下单请求异常等）。
+        """
+        with self._errors_lock:
+            self._errors.append(time.monotonic())
+
+    def is_tripped(self) -> bool:
+        return bool(self.tripped_reasons)
+
+    def check(self) -> List[str]:
+        """
+        返回当前触发的条件，全部正常时返回空列表。
+        """
+        now = time.monotonic()
+        reasons = []
+        if now - self._loop_ts > WATCHDOG_LOOP_STALL_SEC:
+            reasons.append(f"event loop stalled for {now - self._loop_ts:.2f}s")
+        if now - self._decision_ts > WATCHDOG_DECISION_STALL_SEC:
+            reasons.append(f"no decision for {now - self._decision_ts:.2f}s")
+        order_book = order_books.get(TRADING_INSTRUMENT_ID)
+        if order_book is not None and order_book.timestamp:
+            book_delay = time.time() - order_book.timestamp / 1000
+            if book_delay > WATCHDOG_BOOK_STALE_SEC:
+                reasons.append(f"{TRADING_INSTRUMENT_ID} order book stale for {book_delay:.2f}s")
+        with self._errors_lock:
+            while self._errors and now - self._errors[0] > WATCHDOG_ERROR_WINDOW_SEC:
+                self._errors.popleft()
+            error_count = len(self._errors)
+        if error_count >= WATCHDOG_MAX_ERRORS:
+            reasons.append(f"{error_count} errors in {WATCHDOG_ERROR_WINDOW_SEC}s")
+        return reasons
+
+    def _run(self) -> None:
+        while not self._stop.wait(WATCHDOG_CHECK_INTERVAL_SEC):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("watchdog check failed")
+
+    def poll(self) -> None:
+        """
+        执行一次检查：新触发时撤销所有订单，恢复正常时解除，并按需续期 cancel-all-after。
+        """
+        reasons = self.check()
+        if reasons and not self.tripped_reasons:
+            self.trip_count += 1
+            logger.error(f"watchdog tripped: {'; '.join(reasons)}, canceling all orders")
+            self.tripped_reasons = reasons
+            self.kill()
+        elif not reasons and self.tripped_reasons:
+            logger.warning(f"watchdog reset, previously tripped by: {'; '.join(self.tripped_reasons)}")
+            self.tripped_reasons = []
+        elif reasons:
+            self.tripped_reasons = reasons
+        now = time.monotonic()
+        if WATCHDOG_CANCEL_ALL_AFTER_SEC and (self._cancel_all_after_ts is None
+                                              or now - self._cancel_all_after_ts > WATCHDOG_CANCEL_ALL_AFTER_SEC / 3):
+            self._cancel_all_after_ts = now
+            self._executor.submit(self.set_cancel_all_after, WATCHDOG_CANCEL_ALL_AFTER_SEC)
+
+    def kill(self) -> int:
+        """
+        并发撤销所有目标订单，最多等待 WATCHDOG_CANCEL_TIMEOUT_SEC。
+
+        Returns:
+            int: 在时限内完成的撤单请求数。
+        """
+        start = time.perf_counter()
+        targets = self.get_cancel_targets()
+        futures = [self._executor.submit(self.trade_api.cancel_multiple_orders, targets[i:i + ORDER_BATCH_SIZE])
+                   for i in range(0, len(targets), ORDER_BATCH_SIZE)]
+        done, not_done = wait(futures, timeout=WATCHDOG_CANCEL_TIMEOUT_SEC)
+        self.last_cancel_ms = (time.perf_counter() - start) * 1000
+        failed = [f for f in done if f.exception() is not None or f.result().get("code") != "0"]
+        logger.error(f"watchdog canceled {len(targets)} orders in {len(futures)} requests within "
+                     f"{self.last_cancel_ms:.1f}ms, {len(failed)} failed, {len(not_done)} still pending")
+        return len(done)
+
+    def set_cancel_all_after(self, timeout_sec: int) -> Dict:
+        """
+        设置交易所的 cancel-all-after 倒计时，timeout_sec 秒内未再次设置时撤销全部订单；0 取消倒计时。
+        """
+        try:
+            result = self.trade_api._request_with_params("POST", CANCEL_ALL_AFTER_ENDPOINT,
+                                                         {"timeOut": str(timeout_sec)})
+        except Exception as e:
+            logger.warning(f"cancel-all-after failed: {e}")
+            return {}
+        if result.get("code") != "0":
+            logger.warning(f"cancel-all-after failed: {result}")
+        return result
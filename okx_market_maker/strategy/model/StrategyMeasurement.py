@@ -87,11 +87,15 @@ class StrategyMeasurement:
                 assumed_asset_value = asset_value_inst.asset_value
             # print(f"{key} assumed asset value {assumed_asset_value}")
             delta_map[ccy] -= assumed_asset_value
+        price_to_usd_snapshot = self._current_risk_snapshot.price_to_usd_snapshot
+        missing_ccy_list = [ccy for ccy in delta_map if not price_to_usd_snapshot.get(ccy)]
+        if missing_ccy_list:
+            tickers: Tickers = tickers_container[0]
+            usdt_prices = tickers.get_usdt_prices_by_ccy(missing_ccy_list)
         for ccy in delta_map:
-            price = self._current_risk_snapshot.price_to_usd_snapshot.get(ccy)
+            price = price_to_usd_snapshot.get(ccy)
             if not price:
-                tickers: Tickers = tickers_container[0]
-                price = tickers.get_usdt_price_by_ccy(ccy) * usdt_to_usd_rate
+                price = usdt_prices[ccy] * usdt_to_usd_rate
             pnl += price * delta_map[ccy]
         return pnl
 
@@ -0,0 +1,107 @@
+from bisect import bisect_left, insort
+from collections.abc import MutableMapping
+from itertools import count
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from okx_market_maker.strategy.model.StrategyOrder import StrategyOrder
+from okx_market_maker.utils.OkxEnum import OrderSide
+
+
+class StrategyOrderBook(MutableMapping):
+    """
+    策略订单容器，按 clOrdId 存取（MutableMapping），同时按方向维护价格有序的索引和 ordId 索引。
+    买单按价格从高到低、卖单按价格从低到高排列，同价位按加入先后排列。
+    下单、改单、成交、撤单时增量更新，读取某一方向的有序订单无需重新排序。
+
+    订单的价格只能通过 reprice 修改，交易所订单号只能通过 set_order_id 设置，否则索引不会更新。
+    """
+    def __init__(self) -> None:
+        self._orders: Dict[str, StrategyOrder] = {}
+        self._order_ids: Dict[str, str] = {}
+        # 方向 -> [(排序价格, 序号, clOrdId)]，买单的排序价格取负
+        self._sides: Dict[OrderSide, List[Tuple[float, int, str]]] = {OrderSide.BUY: [], OrderSide.SELL: []}
+        self._sort_keys: Dict[str, Tuple[float, int, str]] = {}
+        self._seq = count()
+
+    def __getitem__(self, client_order_id: str) -> StrategyOrder:
+        return self._orders[client_order_id]
+
+    def __setitem__(self, client_order_id: str, strategy_order: StrategyOrder) -> None:
+        if client_order_id in self._orders:
+            del self[client_order_id]
+        self._orders[client_order_id] = strategy_order
+        self._insert(client_order_id, strategy_order)
+        if strategy_order.order_id:
+            self._order_ids[strategy_order.order_id] = client_order_id
+
+    def __delitem__(self, client_order_id: str) -> None:
+        strategy_order = self._orders.pop(client_order_id)
+        self._remove_sort_key(client_order_id, strategy_order.side)
+        if self._order_ids.get(strategy_order.order_id) == client_order_id:
+            del self._order_ids[strategy_order.order_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._orders)
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, client_order_id) -> bool:
+        return client_order_id in self._orders
+
+    def get(self, client_order_id: str, default=None) -> Optional[StrategyOrder]:
+        return self._orders.get(client_order_id, default)
+
+    def copy(self) -> Dict[str, StrategyOrder]:
+        return dict(self._orders)
+
+    @staticmethod
+    def _sort_price(side: OrderSide, price: str) -> float:
+        # 市价单没有价格，排在同方向最后
+        if not price:
+            return float("inf")
+        return -float(price) if side == OrderSide.BUY else float(price)
+
+    def _insert(self, client_order_id: str, strategy_order: StrategyOrder) -> None:
+        key = (self._sort_price(strategy_order.side, strategy_order.price), next(self._seq), client_order_id)
+        self._sort_keys[client_order_id] = key
+        insort(self._sides[strategy_order.side], key)
+
+    def _remove_sort_key(self, client_order_id: str, side: OrderSide) -> None:
+        key = self._sort_keys.pop(client_order_id)
+        side_keys = self._sides[side]
+        del side_keys[bisect_left(side_keys, key)]
+
+    def get_by_order_id(self, order_id: str) -> Optional[StrategyOrder]:
+        client_order_id = self._order_ids.get(order_id)
+        return self._orders.get(client_order_id) if client_order_id is not None else None
+
+    def set_order_id(self, client_order_id: str, order_id: str) -> None:
+        strategy_order = self._orders[client_order_id]
+        if strategy_order.order_id == order_id:
+            return
+        if self._order_ids.get(strategy_order.order_id) == client_order_id:
+            del self._order_ids[strategy_order.order_id]
+        strategy_order.order_id = order_id
+        if order_id:
+            self._order_ids[order_id] = client_order_id
+
+    def reprice(self, client_order_id: str, new_price: str) -> None:
+        """
+        修改订单价格并调整其在方向索引中的位置，同价位内排到最后。
+        """
+        strategy_order = self._orders[client_order_id]
+        self._remove_sort_key(client_order_id, strategy_order.side)
+        strategy_order.price = new_price
+        self._insert(client_order_id, strategy_order)
+
+    def get_side_orders(self, side: OrderSide) -> List[StrategyOrder]:
+        """
+        返回某一方向的订单，买单按价格从高到低，卖单按价格从低到高。
+        """
+        orders = self._orders
+        return [orders[client_order_id] for _, _, client_order_id in self._sides[side]]
+
+    def get_best_order(self, side: OrderSide) -> Optional[StrategyOrder]:
+        side_keys = self._sides[side]
+        return self._orders[side_keys[0][2]] if side_keys else None
@@ -19,8 +19,9 @@ class RiskCalculator:
         risk_snapshot.asset_usd_value = account.total_eq
         usdt_to_usd_rate = mark_px_cache.get_usdt_to_usd_rate()
         account_detail = account.get_account_details()
+        usdt_prices = tickers.get_usdt_prices_by_ccy(account_detail)
         for ccy, detail in account_detail.items():
-            usdt_price = tickers.get_usdt_price_by_ccy(ccy)
+            usdt_price = usdt_prices[ccy]
             usd_price = usdt_price * usdt_to_usd_rate
             cash = detail.cash_bal
             cash_usd_value = cash * usd_price
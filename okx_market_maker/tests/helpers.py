@@ -0,0 +1,7 @@
+from okx_market_maker.order_management_service.model.OrderRequest import PlaceOrderRequest
+from okx_market_maker.utils.OkxEnum import TdMode, OrderSide, OrderType
+
+
+def place_request(client_order_id: str) -> PlaceOrderRequest:
+    return PlaceOrderRequest(inst_id="BTC-USDT-SWAP", td_mode=TdMode.CROSS, side=OrderSide.BUY,
+                             ord_type=OrderType.LIMIT, size="1", price="30000", client_order_id=client_order_id)
@@ -0,0 +1,71 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import httpx
+
+from okx_market_maker import tickers_container, mark_px_container
+from okx_market_maker.market_data_service.AsyncRESTMarketDataService import AsyncRESTMarketDataService
+
+
+class TestAsyncRESTMarketDataService(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        tickers_container.clear()
+        mark_px_container.clear()
+        self.requests = []
+        self.fail_swap = True
+        self.malformed_swap = False
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            inst_type = request.url.params["instType"]
+            self.requests.append((request.url.path, inst_type))
+            if inst_type == "SWAP" and self.fail_swap:
+                return httpx.Response(503)
+            if inst_type == "SWAP" and self.malformed_swap:
+                return httpx.Response(200, json={"code": "0", "msg": "", "data": None})
+            if request.url.path.endswith("tickers"):
+                data = [{"instType": "SPOT", "instId": "BTC-USDT", "last": "30000", "askPx": "30001",
+                         "bidPx": "29999", "ts": "1597026383085"}]
+            else:
+                data = [{"instType": inst_type, "instId": f"BTC-USDT-{inst_type}", "markPx": "30000",
+                         "ts": "1597026383085"}]
+            return httpx.Response(200, json={"code": "0", "msg": "", "data": data})
+
+        self.rest_mds = AsyncRESTMarketDataService(
+            interval_sec={"tickers-SPOT": 0.01, "mark-px-SWAP": 0.01, "mark-px-MARGIN": 0, "mark-px-FUTURES": 0,
+                          "mark-px-OPTION": 0},
+            transport=httpx.MockTransport(handler))
+
+    async def asyncTearDown(self) -> None:
+        await self.rest_mds.stop()
+
+    @patch("okx_market_maker.market_data_service.AsyncRESTMarketDataService.REST_MARKET_DATA_BACKOFF_SEC", 0.05)
+    async def test_independent_refresh_and_backoff(self):
+        self.assertEqual(set(self.rest_mds.endpoints), {"tickers-SPOT", "mark-px-SWAP"})
+        self.rest_mds.start()
+        await asyncio.sleep(0.1)
+        self.assertEqual(tickers_container[0].get_ticker_by_inst_id("BTC-USDT").last, 30000)
+        self.assertLess(self.rest_mds.get_data_age_sec("tickers-SPOT"), 1)
+        self.assertEqual(self.rest_mds.get_last_update_ts("mark-px-SWAP"), 0)
+        stats = self.rest_mds.get_stats()
+        # 失败的接口退避重试，不影响其他数据集按自身间隔刷新
+        self.assertGreater(stats["tickers-SPOT"]["requests"], stats["mark-px-SWAP"]["requests"])
+        self.assertGreater(stats["mark-px-SWAP"]["failures"], 0)
+
+        self.fail_swap = False
+        await asyncio.sleep(0.2)
+        self.assertEqual(mark_px_container[0].get_mark_px("BTC-USDT-SWAP").mark_px, 30000)
+        self.assertEqual(self.rest_mds.endpoints["mark-px-SWAP"].consecutive_failures, 0)
+
+    @patch("okx_market_maker.market_data_service.AsyncRESTMarketDataService.REST_MARKET_DATA_BACKOFF_SEC", 0.05)
+    async def test_malformed_payload_backs_off(self):
+        self.fail_swap = False
+        self.malformed_swap = True
+        self.rest_mds.start()
+        await asyncio.sleep(0.1)
+        # 异常数据计为失败并退避，刷新任务不会结束
+        self.assertGreater(self.rest_mds.get_stats()["mark-px-SWAP"]["failures"], 0)
+        self.assertFalse(any(task.done() for task in self.rest_mds._tasks))
+        self.malformed_swap = False
+        await asyncio.sleep(0.2)
+        self.assertEqual(mark_px_container[0].get_mark_px("BTC-USDT-SWAP").mark_px, 30000)
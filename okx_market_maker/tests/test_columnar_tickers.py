@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+from okx_market_maker.market_data_service.model.ColumnarTickers import ColumnarTickers
+from okx_market_maker.market_data_service.model.Tickers import Tickers
+
+
+def _tickers_response(*rows) -> dict:
+    return {"code": "0", "data": [{"instType": "SPOT", "instId": inst_id, "bidPx": bid, "askPx": ask, "last": last,
+                                   "vol24h": "10", "ts": ts} for inst_id, bid, ask, last, ts in rows]}
+
+
+class TestColumnarTickers(TestCase):
+    def setUp(self) -> None:
+        self.response = _tickers_response(
+            ("BTC-USDT", "29990", "30010", "30005", "1"), ("ETH-BTC", "0.05", "0.07", "0.06", "1"),
+            ("USDC-USDT", "1", "1", "1", "1"), ("SOL-USDC", "20", "22", "", "1"))
+        self.tickers = ColumnarTickers()
+        self.tickers.update_from_json(self.response)
+
+    def test_parity_with_tickers(self):
+        tickers = Tickers()
+        tickers.update_from_json(self.response)
+        for inst_id in ("BTC-USDT", "ETH-BTC", "SOL-USDC"):
+            self.assertEqual(self.tickers.get_ticker_by_inst_id(inst_id), tickers.get_ticker_by_inst_id(inst_id))
+        ccy_list = ["USDT", "BTC", "ETH", "SOL", "DOGE"]
+        for use_mid in (True, False):
+            expected = tickers.get_usdt_prices_by_ccy(ccy_list, use_mid)
+            prices = self.tickers.get_usdt_prices_by_ccy(ccy_list, use_mid)
+            for ccy in ccy_list:
+                self.assertAlmostEqual(prices[ccy], expected[ccy])
+                self.assertAlmostEqual(self.tickers.get_usdt_price_by_ccy(ccy, use_mid), expected[ccy])
+        self.assertIsNone(self.tickers.get_ticker_by_inst_id("DOGE-USDT"))
+
+    def test_skips_rows_with_unchanged_ts(self):
+        self.tickers.update_from_json(_tickers_response(("BTC-USDT", "1", "1", "1", "1"),
+                                                        ("ETH-BTC", "0.1", "0.1", "0.1", "2")))
+        self.assertEqual(self.tickers.get_ticker_by_inst_id("BTC-USDT").last, 30005)
+        self.assertEqual(self.tickers.get_ticker_by_inst_id("ETH-BTC").last, 0.1)
+        self.assertEqual(self.tickers.get_ticker_by_inst_id("ETH-BTC").ts, 2)
+
+    def test_columns_are_read_only_views(self):
+        columns = self.tickers.columns()
+        self.assertEqual(self.tickers.inst_ids(), ["BTC-USDT", "ETH-BTC", "USDC-USDT", "SOL-USDC"])
+        self.assertEqual(columns["bid_px"].tolist(), [29990, 0.05, 1, 20])
+        with self.assertRaises(ValueError):
+            columns["bid_px"][0] = 0
+        self.tickers.update_from_json(_tickers_response(("BTC-USDT", "39990", "40010", "40000", "2")))
+        self.assertEqual(columns["last"][0], 40000)
+
+    def test_universe_growth(self):
+        version = self.tickers.universe_version
+        path = self.tickers.get_conversion_path("ETH")
+        rows = [(f"C{i}-USDT", "1", "1", "1", "1") for i in range(100)]
+        self.tickers.update_from_json(_tickers_response(*rows))
+        self.assertEqual(self.tickers.universe_version, version + 1)
+        self.assertEqual(len(self.tickers), 104)
+        self.assertEqual(self.tickers.get_conversion_path("ETH"), path)
+        self.assertAlmostEqual(self.tickers.get_usdt_price_by_ccy("ETH"), 1800)
+        self.assertEqual(self.tickers.get_usdt_price_by_ccy("C99"), 1)
+
+    def test_unsuccessful_response(self):
+        with self.assertRaises(ValueError):
+            self.tickers.update_from_json({"code": "50011", "data": []})
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from okx_market_maker import state_change_listeners, tickers_container, mark_px_container
+from okx_market_maker.market_data_service.model.MarkPx import MarkPxCache
+from okx_market_maker.market_data_service.model.Tickers import Tickers
+from okx_market_maker.strategy.SampleMM import SampleMM, TRADING_INSTRUMENT_ID
+from okx_market_maker.utils.SnapshotUtil import publish_snapshot
+from okx_market_maker.utils.StateChangeUtil import notify_state_change
+
+
+@patch("okx_market_maker.strategy.BaseStrategy.DECISION_MAX_INTERVAL_SEC", 10)
+@patch("okx_market_maker.strategy.BaseStrategy.DECISION_MIN_INTERVAL_SEC", 0.05)
+class TestEventDrivenLoop(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.strategy = SampleMM()
+        self.strategy._decision_step = AsyncMock()
+        self.strategy._run_slow_checks = AsyncMock()
+        self.strategy._run_risk_summary = AsyncMock()
+        self.task = asyncio.get_running_loop().create_task(self.strategy._run_event_driven_loop())
+        await asyncio.sleep(0)
+
+    async def asyncTearDown(self) -> None:
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.assertNotIn(self.strategy._on_state_change, state_change_listeners)
+
+    async def test_wakeup_and_coalescing(self):
+        notify_state_change("books", TRADING_INSTRUMENT_ID)
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.strategy._decision_step.await_count, 1)
+        # 最小间隔内的多次更新合并为一次决策
+        for _ in range(10):
+            notify_state_change("books", TRADING_INSTRUMENT_ID)
+            notify_state_change("orders")
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.strategy._decision_step.await_count, 2)
+
+    async def test_irrelevant_updates_ignored(self):
+        notify_state_change("books", "ETH-USDT-SWAP")
+        notify_state_change("balance_and_position")
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.strategy._decision_step.await_count, 0)
+
+
+    @patch("okx_market_maker.strategy.BaseStrategy.HEALTH_CHECK_BACKOFF_SEC", 0.2)
+    async def test_backoff_after_failed_health_check(self):
+        self.strategy._decision_step.return_value = False
+        # 暂停期间的订单簿更新不触发决策
+        for _ in range(3):
+            notify_state_change("books", TRADING_INSTRUMENT_ID)
+            await asyncio.sleep(0.05)
+        self.assertEqual(self.strategy._decision_step.await_count, 1)
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.strategy._decision_step.await_count, 2)
+
+class TestPollingLoop(IsolatedAsyncioTestCase):
+    async def test_status_check_runs_in_executor(self):
+        strategy = SampleMM()
+        checked = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        threads = []
+
+        def check_status():
+            threads.append(threading.get_ident())
+            loop.call_soon_threadsafe(checked.set)
+            return False
+
+        strategy.check_status = check_status
+        strategy.cancel_all = AsyncMock()
+        task = loop.create_task(strategy._run_polling_loop())
+        try:
+            await asyncio.wait_for(checked.wait(), 1)
+            self.assertNotEqual(threads, [threading.get_ident()])
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+class TestRiskSummarySkip(IsolatedAsyncioTestCase):
+    @patch("okx_market_maker.strategy.BaseStrategy.RISK_SUMMARY_INTERVAL_SEC", 0.01)
+    async def test_skips_unchanged_inputs(self):
+        tickers_container.clear()
+        mark_px_container.clear()
+        tickers_container.append(Tickers())
+        mark_px_container.append(MarkPxCache())
+        strategy = SampleMM()
+        strategy.risk_summary = MagicMock()
+        strategy._wakeup_event = asyncio.Event()
+        task = asyncio.get_running_loop().create_task(strategy._run_risk_summary())
+        try:
+            await asyncio.sleep(0.05)
+            self.assertEqual(strategy.risk_summary.call_count, 1)
+            publish_snapshot(tickers_container, tickers_container[0].copy_and_update(
+                {"code": "0", "data": [{"instType": "SPOT", "instId": "BTC-USDT", "last": "30000", "ts": "1"}]}))
+            await asyncio.sleep(0.05)
+            self.assertEqual(strategy.risk_summary.call_count, 2)
+            strategy._on_state_change("account", "")
+            strategy._on_state_change("books", TRADING_INSTRUMENT_ID)
+            await asyncio.sleep(0.05)
+            self.assertEqual(strategy.risk_summary.call_count, 3)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,104 @@
+from decimal import Decimal
+from typing import List
+from unittest import TestCase
+from unittest.mock import patch
+
+from okx_market_maker import instruments, order_books
+from okx_market_maker.market_data_service.model.CompactOrderBook import CompactOrderBook
+from okx_market_maker.market_data_service.model.Instrument import Instrument
+from okx_market_maker.market_data_service.model.OrderBook import OrderBookLevel
+from okx_market_maker.strategy.LadderDiff import LadderDiff
+from okx_market_maker.strategy.SampleMM import SampleMM, TRADING_INSTRUMENT_ID
+from okx_market_maker.strategy.model.StrategyOrder import StrategyOrder
+from okx_market_maker.utils.OkxEnum import OrderSide, OrderType, InstType, AccountConfigMode
+
+
+def _bids(*prices: str, size: str = "1") -> List[StrategyOrder]:
+    return [StrategyOrder(inst_id="BTC-USDT-SWAP", side=OrderSide.BUY, ord_type=OrderType.LIMIT, size=size,
+                          price=price, client_order_id=f"c{price}") for price in prices]
+
+
+class TestLadderDiff(TestCase):
+    def setUp(self) -> None:
+        self.ladder_diff = LadderDiff(Decimal("0.1"))
+
+    def test_one_tick_shift_amends_one_order(self):
+        current = _bids("100", "99.9", "99.8", "99.7")
+        diff = self.ladder_diff.diff([("100.1", "1"), ("100", "1"), ("99.9", "1"), ("99.8", "1")], current)
+        self.assertEqual(len(diff.to_keep), 3)
+        self.assertEqual(diff.request_count(), 1)
+        self.assertIs(diff.to_amend[0].strategy_order, current[3])
+        self.assertEqual((diff.to_amend[0].new_price, diff.to_amend[0].new_remaining_size), ("100.1", None))
+
+    def test_same_price_amends_size_only(self):
+        current = _bids("100", "99.9")
+        current[0].filled_size = "0.4"
+        diff = self.ladder_diff.diff([("100.00", "1"), ("99.9", "2")], current)
+        self.assertEqual(diff.to_keep, [])
+        self.assertEqual([(a.strategy_order.price, a.new_price, a.new_remaining_size) for a in diff.to_amend],
+                         [("100", None, "1"), ("99.9", None, "2")])
+
+    def test_place_and_cancel_extras(self):
+        diff = self.ladder_diff.diff([("100", "1"), ("99", "1"), ("98", "1")], _bids("100", "97.5"))
+        self.assertEqual(diff.to_place, [("98", "1")])
+        self.assertEqual([a.new_price for a in diff.to_amend], ["99"])
+        diff = self.ladder_diff.diff([("99", "1")], _bids("100", "99", "98"))
+        self.assertEqual([o.price for o in diff.to_cancel], ["100", "98"])
+        self.assertEqual(diff.request_count(), 2)
+
+    def test_tolerance_band_skips_small_amends(self):
+        current = _bids("100", "99.5")
+        proposed = [("100.2", "1"), ("99.2", "2")]
+        self.assertEqual(len(LadderDiff(Decimal("0.1")).diff(proposed, current).to_amend), 2)
+        diff = LadderDiff(Decimal("0.1"), amend_tolerance_ticks=3).diff(proposed, current)
+        self.assertEqual(diff.to_keep, [current[0]])
+        self.assertEqual([(a.strategy_order.price, a.new_price, a.new_remaining_size) for a in diff.to_amend],
+                         [("99.5", None, "2")])
+
+
+    def test_exact_price_matched_before_tolerance(self):
+        current = _bids("100")
+        diff = LadderDiff(Decimal("1"), amend_tolerance_ticks=1).diff([("101", "1"), ("100", "2")], current)
+        self.assertEqual(diff.to_keep, [])
+        self.assertEqual([(a.strategy_order, a.new_price, a.new_remaining_size) for a in diff.to_amend],
+                         [(current[0], None, "2")])
+        self.assertEqual(diff.to_place, [("101", "1")])
+
+class TestSampleMMGetReq(TestCase):
+    def test_get_req_uses_ladder_diff(self):
+        strategy = SampleMM()
+        strategy.params_loader.params = {"strategy": {"amend_tolerance_ticks": 0}}
+        strategy.params_loader._inited = True
+        instrument = Instrument(inst_id="BTC-USDT-SWAP", inst_type=InstType.SWAP, tick_sz=Decimal("0.1"),
+                                lot_sz=Decimal("1"))
+        current = _bids("100", "99.9", "99.8")
+        current[1].filled_size = "0.5"
+        to_place, to_amend, to_cancel = strategy.get_req(
+            [("100.1", "1"), ("100", "1"), ("99.9", "1")], current, OrderSide.BUY, instrument)
+        self.assertEqual(to_place, [])
+        self.assertEqual(to_cancel, [])
+        self.assertEqual([(a.client_order_id, a.new_price, a.new_size) for a in to_amend],
+                         [("c99.9", "", "1.5"), ("c99.8", "100.1", "")])
+
+    def test_compact_decision_in_tick_space(self):
+        order_book = CompactOrderBook(TRADING_INSTRUMENT_ID, tick_sz=Decimal("0.1"), lot_sz=Decimal("1"))
+        order_book.set_bids_on_snapshot([OrderBookLevel(price=1000.0, quantity=1.0, order_count=1,
+                                                        price_string="1000", quantity_string="1", order_count_string="1")])
+        order_book.set_asks_on_snapshot([OrderBookLevel(price=1000.2, quantity=1.0, order_count=1,
+                                                        price_string="1000.2", quantity_string="1", order_count_string="1")])
+        instrument = Instrument(inst_id=TRADING_INSTRUMENT_ID, inst_type=InstType.SWAP, tick_sz=Decimal("0.1"),
+                                lot_sz=Decimal("1"), min_sz=Decimal("1"))
+        strategy = SampleMM()
+        strategy.trading_instrument_type = InstType.SWAP
+        strategy._account_mode = AccountConfigMode.SINGLE_CCY_MARGIN
+        strategy.set_strategy_measurement(TRADING_INSTRUMENT_ID, InstType.SWAP)
+        strategy.params_loader.params = {"strategy": {
+            "step_pct": 0.001, "num_of_order_each_side": 2, "single_size_as_multiple_of_lot_size": 1,
+            "maximum_net_buy": 20, "maximum_net_sell": 20}}
+        strategy.params_loader._inited = True
+        with patch.dict(order_books, {TRADING_INSTRUMENT_ID: order_book}), \
+                patch.dict(instruments, {f"{TRADING_INSTRUMENT_ID}:SWAP": instrument}), \
+                patch.object(CompactOrderBook, "ticks_from_price", side_effect=AssertionError):
+            to_place, to_amend, to_cancel = strategy.order_operation_decision()
+        self.assertEqual([(p.side, p.price) for p in to_place], [
+            (OrderSide.BUY, "999"), (OrderSide.BUY, "998"), (OrderSide.SELL, "1001.3"), (OrderSide.SELL, "1002.3")])
@@ -0,0 +1,84 @@
+import time
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import MagicMock
+
+from okx_market_maker.order_management_service.model.OrderRequest import PlaceOrderRequest
+from okx_market_maker.strategy.SampleMM import SampleMM, TRADING_INSTRUMENT_ID
+from okx_market_maker.utils import LatencyUtil
+from okx_market_maker.utils.LatencyUtil import LatencyHistogram, get_latency_summary, reset_latency, \
+    mark_book_received, mark_orders_decided, mark_orders_sent, mark_order_acked, mark_orders_updated
+from okx_market_maker.utils.OkxEnum import TdMode, OrderSide, OrderType
+
+
+class TestLatencyHistogram(TestCase):
+    def test_percentiles_within_bucket_precision(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 10001):
+            histogram.record(value)
+        self.assertAlmostEqual(histogram.percentile(0.5), 5000, delta=5000 / 32)
+        self.assertAlmostEqual(histogram.percentile(0.99), 9900, delta=9900 / 32)
+        self.assertEqual(histogram.percentile(0.999), 10000)
+        self.assertEqual(histogram.percentile(0.0001), 1)
+        summary = histogram.summary()
+        self.assertEqual((summary["count"], summary["min_us"], summary["max_us"]), (10000, 1, 10000))
+        # 内存与样本数无关
+        self.assertLess(len(histogram.counts), 300)
+
+
+class TestOrderLifecycleMarks(TestCase):
+    def setUp(self) -> None:
+        reset_latency()
+
+    def tearDown(self) -> None:
+        reset_latency()
+
+    def test_stages_per_op(self):
+        t0 = time.perf_counter_ns()
+        mark_orders_decided("batch-orders", ["c1", "c2"], t0 + 1000, t0)
+        mark_orders_sent("batch-orders", ["c1", "c2"], t0 + 3000)
+        # orders 频道推送先于确认到达
+        mark_orders_updated([{"clOrdId": "c1"}, {"clOrdId": "unknown"}])
+        mark_order_acked("c1")
+        mark_order_acked("c2")
+        summary = get_latency_summary()
+        self.assertEqual(list(summary), ["decision_to_send", "send_to_ack", "send_to_update", "book_to_ack"])
+        self.assertEqual(summary["decision_to_send"]["batch-orders"]["max_us"], 2)
+        self.assertEqual(summary["send_to_ack"]["batch-orders"]["count"], 2)
+        self.assertEqual(summary["send_to_update"]["batch-orders"]["count"], 1)
+        self.assertEqual(list(LatencyUtil._tracked_orders), ["c2"])
+        mark_orders_updated([{"clOrdId": "c2"}])
+        self.assertEqual(LatencyUtil._tracked_orders, {})
+
+
+class _AckGateway:
+    def is_ready(self) -> bool:
+        return True
+
+    async def request(self, op, args):
+        return {"code": "0", "msg": "", "data": [
+            {"clOrdId": arg["clOrdId"], "ordId": "1", "sCode": "0", "sMsg": ""} for arg in args]}
+
+
+class TestStrategyLatency(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        reset_latency()
+        self.strategy = SampleMM()
+        self.strategy.order_gateway = _AckGateway()
+
+    async def asyncTearDown(self) -> None:
+        reset_latency()
+
+    async def test_decision_to_ack(self):
+        place = PlaceOrderRequest(inst_id=TRADING_INSTRUMENT_ID, td_mode=TdMode.CROSS, side=OrderSide.BUY,
+                                  ord_type=OrderType.LIMIT, size="1", price="30000", client_order_id="c1")
+        self.strategy.order_operation_decision = MagicMock(return_value=([place], [], []))
+        mark_book_received(TRADING_INSTRUMENT_ID, time.perf_counter_ns())
+        await self.strategy.execute_orders(*self.strategy._decide())
+        self.assertEqual(self.strategy._decision_end_ns, 0)
+        # 同一条订单簿消息不重复计入
+        self.strategy._decide()
+        summary = self.strategy.get_latency_summary()
+        self.assertEqual(summary["book_to_decision"]["all"]["count"], 1)
+        self.assertEqual(summary["decision"]["all"]["count"], 2)
+        for stage in ("decision_to_send", "send_to_ack", "book_to_ack"):
+            self.assertEqual(summary[stage]["batch-orders"]["count"], 1)
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import time
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import AsyncMock, MagicMock
+
+from okx_market_maker import mark_px_container, positions_container, state_change_listeners
+from okx_market_maker.market_data_service.WssMarkPriceService import WssMarkPriceService
+from okx_market_maker.market_data_service.model.MarkPx import MarkPxCache
+from okx_market_maker.position_management_service.model.Positions import Positions, Position
+from okx_market_maker.utils.StateChangeUtil import notify_state_change
+
+
+def _positions(*inst_ids) -> Positions:
+    return Positions(_position_map={inst_id: Position(inst_id=inst_id, pos=1, position_id=inst_id)
+                                    for inst_id in inst_ids})
+
+
+def _mark_px_message(inst_id: str, mark_px: str, ts_ms: int) -> str:
+    return json.dumps({"arg": {"channel": "mark-price", "instId": inst_id},
+                       "data": [{"instType": "SWAP", "instId": inst_id, "markPx": mark_px, "ts": str(ts_ms)}]})
+
+
+class TestWssMarkPriceService(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        mark_px_container.clear()
+        positions_container.clear()
+        positions_container.append(_positions("ETH-USDT-SWAP"))
+        self.service = WssMarkPriceService(url="wss://example", inst_ids=["BTC-USDT-SWAP"], rest_fallback_sec=60)
+        self.service.subscribe = AsyncMock()
+        self.service.unsubscribe = AsyncMock()
+        self.service.factory.close = AsyncMock()
+        await self.service.run_service()
+
+    async def asyncTearDown(self) -> None:
+        await self.service.stop_service()
+        self.assertNotIn(self.service._on_state_change, state_change_listeners)
+        self.service.factory.close.assert_awaited_once()
+
+    async def test_follows_positions(self):
+        self.assertEqual(self.service.get_subscribed_inst_ids(), {"BTC-USD-SWAP", "BTC-USDT-SWAP", "ETH-USDT-SWAP"})
+        now_ms = int(time.time() * 1000)
+        self.service._callback(_mark_px_message("ETH-USDT-SWAP", "2000", now_ms))
+        self.assertEqual(mark_px_container[0].get_mark_px("ETH-USDT-SWAP").mark_px, 2000)
+
+        positions_container[0] = _positions("SOL-USDT-SWAP")
+        notify_state_change("positions")
+        notify_state_change("positions")
+        await asyncio.sleep(0)
+        self.service.subscribe.assert_awaited_with([{"channel": "mark-price", "instId": "SOL-USDT-SWAP"}],
+                                                   self.service._callback)
+        self.service.unsubscribe.assert_awaited_once_with([{"channel": "mark-price", "instId": "ETH-USDT-SWAP"}],
+                                                          self.service._callback)
+        self.assertIsNone(mark_px_container[0].get_mark_px("ETH-USDT-SWAP"))
+
+    async def test_rest_fallback_only_for_gaps(self):
+        now_ms = int(time.time() * 1000)
+        self.service._callback(_mark_px_message("BTC-USDT-SWAP", "30000", now_ms))
+        self.service._callback(_mark_px_message("BTC-USD-SWAP", "30010", now_ms - 60_000))
+        self.service.public_api.get_mark_price = MagicMock(return_value={"code": "0", "data": [
+            {"instType": "SWAP", "instId": "ETH-USDT-SWAP", "markPx": "2001", "ts": str(now_ms)}]})
+        self.assertEqual(await self.service.fill_gaps(), ["BTC-USD-SWAP", "ETH-USDT-SWAP"])
+        self.assertEqual(self.service.public_api.get_mark_price.call_count, 2)
+        self.assertEqual(mark_px_container[0].get_mark_px("ETH-USDT-SWAP").mark_px, 2001)
+
+
+class TestMarkPxCache(TestCase):
+    def test_usdt_to_usd_rate(self):
+        mark_px_cache = MarkPxCache()
+        self.assertEqual(mark_px_cache.get_usdt_to_usd_rate(), 1)
+        for inst_id, mark_px in (("BTC-USD-SWAP", "30300"), ("BTC-USDT-SWAP", "30000")):
+            mark_px_cache.update_from_json({"data": [{"instType": "SWAP", "instId": inst_id, "markPx": mark_px}]})
+        self.assertAlmostEqual(mark_px_cache.get_usdt_to_usd_rate(), 1.01)
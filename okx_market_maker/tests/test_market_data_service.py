@@ -0,0 +1,89 @@
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock
+
+from okx_market_maker import order_books
+from okx_market_maker.market_data_service.WssMarketDataService import WssMarketDataService
+
+INST_ID = "BTC-USDT-SWAP"
+
+
+def _book_message(action: str, seq_id: int, prev_seq_id: int, bids=None, asks=None, inst_id: str = INST_ID) -> str:
+    return json.dumps({
+        "arg": {"channel": "books", "instId": inst_id},
+        "action": action,
+        "data": [{"bids": bids or [], "asks": asks or [], "ts": "1597026383085",
+                  "seqId": seq_id, "prevSeqId": prev_seq_id}],
+    })
+
+
+class TestWssMarketDataServiceResync(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        order_books.clear()
+        self.mds = WssMarketDataService(url="wss://example", inst_id=INST_ID, channel="books")
+        self.mds.subscribe = AsyncMock()
+        self.mds.unsubscribe = AsyncMock()
+
+    async def test_gap_triggers_targeted_resync_and_replay(self):
+        self.mds._callback(_book_message("snapshot", 10, -1, bids=[["100", "1", "0", "1"]],
+                                         asks=[["101", "1", "0", "1"]]))
+        self.mds._callback(_book_message("update", 11, 10, bids=[["100", "2", "0", "1"]]))
+        self.assertEqual(order_books[INST_ID].seq_id, 11)
+
+        self.mds._callback(_book_message("update", 13, 12, bids=[["99", "3", "0", "1"]]))
+        await asyncio.sleep(0)
+        self.assertTrue(self.mds.is_resyncing(INST_ID))
+        expected_args = [{"channel": "books", "instId": INST_ID}]
+        self.mds.unsubscribe.assert_awaited_once_with(expected_args, self.mds._callback)
+        self.mds.subscribe.assert_awaited_once_with(expected_args, self.mds._callback)
+
+        self.mds._callback(_book_message("update", 14, 13, asks=[["102", "4", "0", "1"]]))
+        self.assertEqual(order_books[INST_ID].seq_id, 11)
+
+        self.mds._callback(_book_message("snapshot", 12, -1, bids=[["100", "2", "0", "1"]],
+                                         asks=[["101", "1", "0", "1"]]))
+        order_book = order_books[INST_ID]
+        self.assertFalse(self.mds.is_resyncing(INST_ID))
+        self.assertEqual(order_book.seq_id, 14)
+        self.assertEqual(order_book.bid_by_level(2).price_string, "99")
+        self.assertEqual(order_book.ask_by_level(2).price_string, "102")
+
+    async def test_subscribe_event_ignored(self):
+        self.mds._callback(json.dumps({"event": "subscribe", "arg": {"channel": "books", "instId": INST_ID}}))
+        self.assertEqual(order_books[INST_ID].seq_id, -1)
+
+
+class TestWssMarketDataServiceMultiInstrument(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        order_books.clear()
+        self.mds = WssMarketDataService(url="wss://example", channel="books",
+                                        inst_ids=[INST_ID, "ETH-USDT-SWAP"])
+        self.mds.subscribe = AsyncMock()
+        self.mds.unsubscribe = AsyncMock()
+
+    async def test_single_subscription_and_dispatch(self):
+        await self.mds.run_service()
+        self.mds.subscribe.assert_awaited_once_with(
+            [{"channel": "books", "instId": INST_ID}, {"channel": "books", "instId": "ETH-USDT-SWAP"}],
+            self.mds._callback)
+        self.mds._callback(_book_message("snapshot", 5, -1, bids=[["2000", "1", "0", "1"]],
+                                         asks=[["2001", "1", "0", "1"]], inst_id="ETH-USDT-SWAP"))
+        self.assertEqual(order_books["ETH-USDT-SWAP"].best_bid_price(), 2000)
+        self.assertEqual(order_books[INST_ID].seq_id, -1)
+        self.assertEqual(set(self.mds.get_order_books()), {INST_ID, "ETH-USDT-SWAP"})
+
+    async def test_add_and_remove_at_runtime(self):
+        await self.mds.run_service()
+        await self.mds.add_instruments(["SOL-USDT-SWAP", INST_ID], channel="books5")
+        self.mds.subscribe.assert_awaited_with([{"channel": "books5", "instId": "SOL-USDT-SWAP"}],
+                                               self.mds._callback)
+        self.assertIn("SOL-USDT-SWAP", order_books)
+
+        await self.mds.remove_instruments(["ETH-USDT-SWAP"])
+        self.mds.unsubscribe.assert_awaited_once_with([{"channel": "books", "instId": "ETH-USDT-SWAP"}],
+                                                      self.mds._callback)
+        self.assertNotIn("ETH-USDT-SWAP", order_books)
+        self.mds._callback(_book_message("snapshot", 5, -1, bids=[["2000", "1", "0", "1"]],
+                                         inst_id="ETH-USDT-SWAP"))
+        self.assertNotIn("ETH-USDT-SWAP", order_books)
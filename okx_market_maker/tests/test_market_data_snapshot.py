@@ -0,0 +1,69 @@
+from unittest import TestCase
+
+from okx_market_maker.market_data_service.model.ColumnarTickers import ColumnarTickers
+from okx_market_maker.market_data_service.model.MarkPx import MarkPxCache
+from okx_market_maker.market_data_service.model.Tickers import Tickers
+
+
+def _tickers_response(*rows) -> dict:
+    return {"code": "0", "data": [{"instType": "SPOT", "instId": inst_id, "bidPx": px, "askPx": px, "last": px,
+                                   "ts": ts} for inst_id, px, ts in rows]}
+
+
+class TestTickersSnapshot(TestCase):
+    def _check_snapshot(self, tickers):
+        tickers.update_from_json(_tickers_response(("BTC-USDT", "30000", "1"), ("ETH-BTC", "0.06", "1")))
+        self.assertAlmostEqual(tickers.get_usdt_price_by_ccy("ETH"), 1800)
+        snapshot = tickers.copy_and_update(_tickers_response(("BTC-USDT", "40000", "2"), ("ETH-BTC", "0.06", "1")))
+        # 已发布的快照保持不变
+        self.assertEqual(tickers.get_ticker_by_inst_id("BTC-USDT").last, 30000)
+        self.assertAlmostEqual(tickers.get_usdt_price_by_ccy("ETH"), 1800)
+        self.assertEqual(snapshot.get_ticker_by_inst_id("BTC-USDT").last, 40000)
+        self.assertAlmostEqual(snapshot.get_usdt_price_by_ccy("ETH"), 2400)
+        self.assertEqual(snapshot.version, tickers.version + 1)
+        self.assertEqual(snapshot.universe_version, tickers.universe_version)
+        grown = snapshot.copy_and_update(_tickers_response(("SOL-USDT", "20", "1")))
+        self.assertEqual(grown.universe_version, snapshot.universe_version + 1)
+        self.assertIsNone(snapshot.get_ticker_by_inst_id("SOL-USDT"))
+        self.assertEqual(grown.get_usdt_prices_by_ccy(["ETH", "SOL"]), {"ETH": 2400, "SOL": 20})
+        with self.assertRaises(ValueError):
+            grown.copy_and_update({"code": "50011", "data": []})
+
+    def test_tickers(self):
+        self._check_snapshot(Tickers())
+
+    def test_columnar_tickers(self):
+        self._check_snapshot(ColumnarTickers())
+
+    def test_snapshot_reads_do_not_write(self):
+        for tickers in (Tickers(), ColumnarTickers()):
+            snapshot = tickers.copy_and_update(_tickers_response(("BTC-USDT", "30000", "1"), ("ETH-BTC", "0.06", "1")))
+            conversion_paths = dict(snapshot._conversion_paths)
+            self.assertAlmostEqual(snapshot.get_usdt_price_by_ccy("ETH"), 1800)
+            self.assertEqual(snapshot.get_usdt_prices_by_ccy(["USDT", "BTC", "SOL"]), {"USDT": 1, "BTC": 30000, "SOL": 0})
+            # 查询不修改快照的换算路径，生成下一个快照的线程可以安全地读取
+            self.assertEqual(snapshot._conversion_paths, conversion_paths)
+            self.assertAlmostEqual(snapshot.copy_and_update(_tickers_response(("BTC-USDT", "40000", "2")))
+                                   .get_usdt_price_by_ccy("ETH"), 2400)
+
+    def test_unchanged_rows_are_shared(self):
+        tickers = Tickers()
+        tickers.update_from_json(_tickers_response(("BTC-USDT", "30000", "1"), ("ETH-USDT", "2000", "1")))
+        snapshot = tickers.copy_and_update(_tickers_response(("BTC-USDT", "30001", "2"), ("ETH-USDT", "2000", "1")))
+        self.assertIs(snapshot.get_ticker_by_inst_id("ETH-USDT"), tickers.get_ticker_by_inst_id("ETH-USDT"))
+        self.assertIsNot(snapshot.get_ticker_by_inst_id("BTC-USDT"), tickers.get_ticker_by_inst_id("BTC-USDT"))
+
+
+class TestMarkPxSnapshot(TestCase):
+    def test_copy_and_update(self):
+        mark_px_cache = MarkPxCache()
+        snapshot = mark_px_cache.copy_and_update(
+            {"code": "0", "data": [{"instType": "SWAP", "instId": "BTC-USDT-SWAP", "markPx": "30000"}]},
+            {"code": "0", "data": [{"instType": "FUTURES", "instId": "BTC-USDT-230929", "markPx": "30100"}]})
+        self.assertIsNone(mark_px_cache.get_mark_px("BTC-USDT-SWAP"))
+        self.assertEqual(snapshot.get_mark_px("BTC-USDT-230929").mark_px, 30100)
+        self.assertEqual(snapshot.version, 2)
+        removed = snapshot.copy()
+        removed.remove_mark_px("BTC-USDT-SWAP")
+        self.assertEqual(removed.version, 3)
+        self.assertEqual(snapshot.get_mark_px("BTC-USDT-SWAP").mark_px, 30000)
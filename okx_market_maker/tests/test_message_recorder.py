@@ -0,0 +1,47 @@
+import glob
+import os
+import tempfile
+from unittest import TestCase
+
+from okx_market_maker.capture.CaptureReader import CaptureReader
+from okx_market_maker.capture.MessageRecorder import MessageRecorder, CaptureSource, SEGMENT_SUFFIX, \
+    start_capture, stop_capture, record
+
+
+class TestMessageRecorder(TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self) -> None:
+        stop_capture()
+        self._tmp.cleanup()
+
+    def test_rotation_and_read_back(self):
+        recorder = MessageRecorder(self.directory, segment_bytes=1024, index_interval_bytes=256, run_id="r1")
+        payloads = [f'{{"arg":{{"channel":"books"}},"n":{i}}}'.encode() for i in range(100)]
+        for i, payload in enumerate(payloads):
+            recorder.write(CaptureSource.MDS if i % 2 else CaptureSource.OMS, payload, ts_ns=1000 + i)
+        recorder.close()
+        self.assertGreater(len(glob.glob(os.path.join(self.directory, f"*{SEGMENT_SUFFIX}"))), 3)
+
+        reader = CaptureReader(self.directory)
+        self.assertEqual(reader.run_id, "r1")
+        self.assertEqual([r.payload for r in reader.read()], payloads)
+        self.assertEqual([r.ts_ns for r in reader.read(start_ns=1050, end_ns=1059)], list(range(1050, 1060)))
+        self.assertEqual(len(list(reader.read(sources=[CaptureSource.OMS]))), 50)
+
+    def test_unclosed_segment_readable(self):
+        recorder = MessageRecorder(self.directory, segment_bytes=4096, run_id="r2")
+        recorder.write(CaptureSource.PMS, b'{"arg":{"channel":"account"}}', ts_ns=5)
+        recorder._mmap.flush()
+        records = list(CaptureReader(self.directory, run_id="r2").read())
+        self.assertEqual([(r.ts_ns, r.source) for r in records], [(5, CaptureSource.PMS)])
+        recorder.close()
+
+    def test_module_hook(self):
+        record(CaptureSource.MDS, "ignored while capture is off")
+        start_capture(self.directory, run_id="r3")
+        record(CaptureSource.MDS, '{"event":"subscribe"}')
+        stop_capture()
+        self.assertEqual([r.payload for r in CaptureReader(self.directory).read()], [b'{"event":"subscribe"}'])
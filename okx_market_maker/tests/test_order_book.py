@@ -0,0 +1,116 @@
+import sys
+from decimal import Decimal
+from unittest import TestCase
+
+from okx_market_maker.market_data_service.model.CompactOrderBook import CompactOrderBook
+from okx_market_maker.market_data_service.model.OrderBook import OrderBook, OrderBookLevel
+
+
+def _level(price: str, quantity: str, order_count: str = "1") -> OrderBookLevel:
+    return OrderBookLevel(price=float(price), quantity=float(quantity), order_count=int(order_count),
+                          price_string=price, quantity_string=quantity, order_count_string=order_count)
+
+
+class TestOrderBook(TestCase):
+    def setUp(self) -> None:
+        self.order_book = OrderBook("BTC-USDT-SWAP")
+        self.order_book.set_bids_on_snapshot([_level("99", "1"), _level("100", "2"), _level("98", "3")])
+        self.order_book.set_asks_on_snapshot([_level("102", "1"), _level("101", "2"), _level("103", "3")])
+
+    def test_snapshot_sorted(self):
+        self.assertEqual(self.order_book.best_bid_price(), 100)
+        self.assertEqual(self.order_book.best_ask_price(), 101)
+        self.assertEqual(self.order_book.bid_by_level(3).price, 98)
+        self.assertEqual(self.order_book.ask_by_level(3).price, 103)
+        self.assertEqual(self.order_book.middle_price(), 100.5)
+
+    def test_update_insert_replace_delete(self):
+        self.order_book.set_bids_on_update(_level("100.5", "4"))
+        self.order_book.set_bids_on_update(_level("99", "7"))
+        self.order_book.set_bids_on_update(_level("98", "0"))
+        self.order_book.set_asks_on_update(_level("101", "0"))
+        self.order_book.set_asks_on_update(_level("104", "5"))
+        self.assertEqual([level[0] for level in self.order_book._bids], ["100.5", "100", "99"])
+        self.assertEqual(self.order_book.bid_by_level(3).quantity, 7)
+        self.assertEqual([level[0] for level in self.order_book._asks], ["102", "103", "104"])
+
+    def test_delete_missing_level_ignored(self):
+        self.order_book.set_bids_on_update(_level("97", "0"))
+        self.order_book.set_asks_on_update(_level("100.7", "0"))
+        self.assertEqual(len(self.order_book._bids), 3)
+        self.assertEqual(len(self.order_book._asks), 3)
+        self.assertEqual(self.order_book.best_ask_price(), 101)
+
+    def test_check_sum(self):
+        order_book = OrderBook("BTC-USDT")
+        order_book.set_bids_on_snapshot([_level("3366.1", "7"), _level("3366", "6")])
+        order_book.set_asks_on_snapshot([_level("3366.8", "9"), _level("3368", "8")])
+        order_book.set_exch_check_sum(order_book._current_check_sum())
+        self.assertTrue(order_book.do_check_sum())
+        order_book.set_asks_on_update(_level("3366.8", "10"))
+        self.assertFalse(order_book.do_check_sum())
+
+    def test_check_sum_cached_below_top_levels(self):
+        order_book = OrderBook("BTC-USDT")
+        order_book.apply_bids_snapshot([[str(1000 - i), "1", "0", "1"] for i in range(30)])
+        order_book.apply_asks_snapshot([[str(1001 + i), "1", "0", "1"] for i in range(30)])
+        check_sum = order_book._current_check_sum()
+        order_book.apply_bids_update([["972", "5", "0", "1"], ["900", "1", "0", "1"]])
+        self.assertFalse(order_book._check_sum_dirty)
+        self.assertEqual(order_book._current_check_sum(), check_sum)
+        order_book.apply_asks_update([["1010", "0", "0", "0"]])
+        self.assertTrue(order_book._check_sum_dirty)
+        self.assertNotEqual(order_book._current_check_sum(), check_sum)
+
+
+class TestOrderBookRawIngest(TestCase):
+    def test_apply_raw_levels(self):
+        for order_book in (OrderBook("BTC-USDT-SWAP"),
+                           CompactOrderBook("BTC-USDT-SWAP", tick_sz=Decimal("0.1"), lot_sz=Decimal("1"))):
+            order_book.apply_bids_snapshot([["100", "5", "0", "2"], ["99.5", "1", "0", "1"]])
+            order_book.apply_asks_snapshot([["101", "3", "0", "1"], ["100.5", "2", "0", "1"]])
+            self.assertEqual(order_book.best_ask_price(), 100.5)
+            top = order_book.apply_bids_update([["99.5", "0", "0", "0"], ["99.7", "4", "0", "3"],
+                                                ["98", "0", "0", "0"]])
+            self.assertEqual(top, 1)
+            self.assertEqual(order_book.bid_by_level(2).price_string, "99.7")
+            self.assertEqual(order_book.bid_by_level(2).order_count, 3)
+            self.assertEqual(order_book.apply_asks_update([]), sys.maxsize)
+            self.assertEqual(order_book.middle_price(), 100.25)
+
+    def test_raw_levels_stored_without_copy(self):
+        order_book = OrderBook("BTC-USDT-SWAP")
+        level_info = ["100", "5", "0", "2"]
+        order_book.apply_bids_update([level_info])
+        self.assertIs(order_book._bids[0], level_info)
+
+
+class TestCompactOrderBook(TestCase):
+    def setUp(self) -> None:
+        self.order_book = CompactOrderBook("BTC-USDT-SWAP", tick_sz=Decimal("0.1"), lot_sz=Decimal("0.01"))
+        self.reference = OrderBook("BTC-USDT-SWAP")
+        bids = [_level("30000.1", "1.5"), _level("30000", "2"), _level("29999.9", "0.03")]
+        asks = [_level("30000.2", "4"), _level("30000.5", "0.01")]
+        for order_book in (self.order_book, self.reference):
+            order_book.set_bids_on_snapshot(bids)
+            order_book.set_asks_on_snapshot(asks)
+
+    def test_ticks_and_levels(self):
+        self.assertEqual(self.order_book.best_bid_tick(), 300001)
+        self.assertEqual(self.order_book.best_ask_tick(), 300002)
+        self.assertEqual(self.order_book.best_bid_price(), 30000.1)
+        self.assertEqual(self.order_book.bid_by_level(3).price_string, "29999.9")
+        self.assertEqual(self.order_book.bid_by_level(3).quantity_string, "0.03")
+        self.assertEqual(self.order_book.price_from_ticks(300000), "30000")
+
+    def test_update_matches_reference(self):
+        for order_book in (self.order_book, self.reference):
+            order_book.set_bids_on_update(_level("30000", "0"))
+            order_book.set_asks_on_update(_level("30000.3", "0.2"))
+            order_book.set_asks_on_update(_level("30000.2", "3.5"))
+        self.assertEqual(self.order_book._current_check_sum(), self.reference._current_check_sum())
+        self.assertEqual(self.order_book.middle_price(), self.reference.middle_price())
+        self.assertEqual(self.order_book.ask_by_level(2).price_string, "30000.3")
+
+    def test_memory_bytes(self):
+        self.assertEqual(self.order_book.memory_bytes(), 5 * 3 * 8)
@@ -0,0 +1,97 @@
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock
+
+from websockets.protocol import State
+
+from okx_market_maker.order_management_service.WssOrderGateway import WssOrderGateway
+from okx_market_maker.order_management_service.WssOrderManagementService import WssOrderManagementService
+from okx_market_maker.order_management_service.model.OrderRequest import CancelOrderRequest
+from okx_market_maker.tests.helpers import place_request
+from okx_market_maker.utils.OkxEnum import OrderOp
+
+
+class _ClosingWebSocket:
+    """
+    消息迭代立即结束，模拟连接被关闭。
+    """
+    state = State.CLOSED
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+
+class TestWssOrderGateway(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.oms = WssOrderManagementService(url="wss://example")
+        self.oms.websocket = MagicMock(send=AsyncMock(), state=State.OPEN)
+        self.gateway = WssOrderGateway(self.oms, request_timeout_sec=0.05)
+
+    def _sent(self, i: int = -1) -> dict:
+        return json.loads(self.oms.websocket.send.await_args_list[i].args[0])
+
+    def _respond(self, payload: dict) -> None:
+        # OKX 推送为紧凑 JSON
+        self.oms._callback(json.dumps(payload, separators=(",", ":")))
+
+    async def test_request_correlates_by_id(self):
+        task = asyncio.ensure_future(self.gateway.request(OrderOp.BATCH_CANCEL, [
+            CancelOrderRequest("BTC-USDT-SWAP", client_order_id="c1").to_dict()]))
+        await asyncio.sleep(0)
+        sent = self._sent()
+        self.assertEqual(sent["op"], "batch-cancel-orders")
+        response = {"id": sent["id"], "op": "batch-cancel-orders", "code": "0", "msg": "",
+                    "data": [{"clOrdId": "c1", "ordId": "1", "sCode": "0", "sMsg": ""}]}
+        self._respond({**response, "id": "unknown"})
+        self.assertFalse(task.done())
+        self._respond(response)
+        self.assertEqual(await task, response)
+        self.assertEqual(self.gateway.get_pending_count(), 0)
+
+    async def test_per_order_futures_and_batching(self):
+        futures = await self.gateway.place_orders([place_request(f"c{i}") for i in range(25)])
+        self.assertEqual(len(futures), 25)
+        first, second = self._sent(0), self._sent(1)
+        self.assertEqual((first["op"], len(first["args"]), len(second["args"])), ("batch-orders", 20, 5))
+        # 响应中的订单顺序与请求不同，按 clOrdId 对应
+        self._respond({"id": second["id"], "op": "batch-orders", "code": "2", "msg": "",
+                       "data": [{"clOrdId": f"c{i}", "ordId": str(i), "sCode": "0" if i % 2 else "51008",
+                                 "sMsg": ""} for i in reversed(range(20, 25))]})
+        self.assertEqual([f.result()["ordId"] for f in futures[20:]], ["20", "21", "22", "23", "24"])
+        self.assertEqual(futures[20].result()["sCode"], "51008")
+        self._respond({"id": first["id"], "op": "batch-orders", "code": "60013", "msg": "Invalid args", "data": []})
+        self.assertEqual(futures[0].result(), {"clOrdId": "c0", "ordId": "", "sCode": "60013", "sMsg": "Invalid args"})
+
+    async def test_timeout(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.gateway.request(OrderOp.BATCH_AMEND, [{"instId": "BTC-USDT-SWAP", "clOrdId": "c1"}])
+        self.assertEqual(self.gateway.get_pending_count(), 0)
+
+    async def test_not_ready_after_close(self):
+        self.assertTrue(self.gateway.is_ready())
+        self.oms.websocket.state = State.CLOSED
+        self.assertFalse(self.gateway.is_ready())
+        with self.assertRaises(ConnectionError):
+            await self.gateway.request(OrderOp.BATCH_CANCEL, [{"instId": "BTC-USDT-SWAP", "clOrdId": "c1"}])
+
+    async def test_consume_end_fails_pending_requests(self):
+        futures = await self.gateway.place_orders([place_request("c1")])
+        task = asyncio.ensure_future(self.gateway.request(OrderOp.BATCH_CANCEL, [
+            CancelOrderRequest("BTC-USDT-SWAP", client_order_id="c2").to_dict()]))
+        await asyncio.sleep(0)
+        self.oms.websocket = _ClosingWebSocket()
+        await self.oms.consume()
+        self.assertEqual(self.gateway.get_pending_count(), 0)
+        self.assertIsInstance(futures[0].exception(), ConnectionError)
+        with self.assertRaises(ConnectionError):
+            await task
+
+    async def test_orders_push_still_reaches_order_cache(self):
+        callback = MagicMock()
+        self.oms.op_response_handler = callback
+        self.oms._callback(json.dumps({"arg": {"channel": "orders", "instType": "ANY"}, "data": []}))
+        callback.assert_not_called()
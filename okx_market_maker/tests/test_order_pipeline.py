@@ -0,0 +1,122 @@
+import asyncio
+import threading
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from websockets.exceptions import ConnectionClosedError
+
+from okx_market_maker.config.settings import ORDER_RECONCILE_ATTEMPTS
+from okx_market_maker.order_management_service.model.OrderRequest import CancelOrderRequest
+from okx_market_maker.strategy.SampleMM import SampleMM
+from okx_market_maker.strategy.model.StrategyOrder import StrategyOrder, StrategyOrderStatus
+from okx_market_maker.tests.helpers import place_request
+from okx_market_maker.utils.OkxEnum import OrderSide, OrderType
+
+
+class _FakeGateway:
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.release = asyncio.Event()
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def request(self, op, args):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await self.release.wait()
+        self.in_flight -= 1
+        return {"code": "0", "msg": "", "data": [
+            {"clOrdId": arg["clOrdId"], "ordId": arg["clOrdId"][1:], "sCode": "0", "sMsg": ""} for arg in args]}
+
+
+class TestOrderPipeline(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.strategy = SampleMM()
+
+    async def test_batches_in_flight_concurrently(self):
+        gateway = self.strategy.order_gateway = _FakeGateway()
+        task = asyncio.ensure_future(self.strategy.place_orders([place_request(f"c{i}") for i in range(45)]))
+        ticks = 0
+        # 批次等待确认期间事件循环继续运行
+        while gateway.max_in_flight < 3:
+            await asyncio.sleep(0)
+            ticks += 1
+        self.assertEqual(gateway.in_flight, 3)
+        self.assertEqual(self.strategy.get_strategy_orders()["c0"].strategy_order_status, StrategyOrderStatus.SENT)
+        gateway.release.set()
+        await task
+        self.assertGreater(ticks, 0)
+        self.assertEqual(self.strategy.get_strategy_orders()["c44"].strategy_order_status, StrategyOrderStatus.ACK)
+        self.assertEqual(self.strategy.get_strategy_orders()["c44"].order_id, "44")
+        stats = self.strategy.get_order_batch_stats()["batch-orders"]
+        self.assertEqual((stats["batches"], stats["failures"]), (3, 0))
+        self.assertGreater(stats["max_latency_ms"], 0)
+
+    async def test_rest_fallback_runs_in_executor(self):
+        threads = []
+
+        def cancel_multiple_orders(data):
+            threads.append(threading.get_ident())
+            return {"code": "1", "msg": "", "data": [
+                {"clOrdId": d["clOrdId"], "ordId": "", "sCode": "51400", "sMsg": ""} for d in data]}
+
+        self.strategy.trade_api.cancel_multiple_orders = cancel_multiple_orders
+        self.strategy._strategy_order_book["c1"] = StrategyOrder(
+            inst_id="BTC-USDT-SWAP", ord_type=OrderType.LIMIT, side=OrderSide.BUY, size="1", price="30000",
+            client_order_id="c1", strategy_order_status=StrategyOrderStatus.LIVE)
+        await self.strategy.cancel_orders([CancelOrderRequest("BTC-USDT-SWAP", client_order_id="c1")])
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
+        self.assertEqual(self.strategy.get_order_batch_stats()["batch-cancel-orders"]["failures"], 1)
+        self.assertEqual(self.strategy.get_order_batch_stats()["batch-orders"]["batches"], 0)
+
+    async def test_rest_fallback_after_disconnect(self):
+        gateway = self.strategy.order_gateway = _FakeGateway()
+        gateway.request = AsyncMock(side_effect=ConnectionClosedError(None, None))
+        self.strategy.trade_api.place_multiple_orders = MagicMock(return_value={"code": "0", "msg": "", "data": [
+            {"clOrdId": "c1", "ordId": "1", "sCode": "0", "sMsg": ""}]})
+        await self.strategy.place_orders([place_request("c1")])
+        gateway.request.assert_awaited_once()
+        self.strategy.trade_api.place_multiple_orders.assert_called_once()
+        self.assertEqual(self.strategy.get_strategy_orders()["c1"].strategy_order_status, StrategyOrderStatus.ACK)
+
+    async def test_rest_retry_keeps_delivered_placement(self):
+        gateway = self.strategy.order_gateway = _FakeGateway()
+        # WebSocket 请求已送达，响应到达前连接断开
+        gateway.request = AsyncMock(side_effect=ConnectionError("private WebSocket connection closed"))
+        self.strategy.trade_api.place_multiple_orders = MagicMock(return_value={"code": "1", "msg": "", "data": [
+            {"clOrdId": "c1", "ordId": "", "sCode": "51016", "sMsg": "Duplicated clOrdId"}]})
+        await self.strategy.place_orders([place_request("c1")])
+        self.strategy.trade_api.place_multiple_orders.assert_called_once()
+        self.assertEqual(self.strategy.get_strategy_orders()["c1"].strategy_order_status, StrategyOrderStatus.ACK)
+        self.assertEqual(self.strategy.get_strategy_orders()["c1"].order_id, "")
+
+    async def test_duplicate_client_order_id_without_retry_is_rejected(self):
+        self.strategy.trade_api.place_multiple_orders = MagicMock(return_value={"code": "1", "msg": "", "data": [
+            {"clOrdId": "c1", "ordId": "", "sCode": "51016", "sMsg": "Duplicated clOrdId"}]})
+        await self.strategy.place_orders([place_request("c1")])
+        self.assertNotIn("c1", self.strategy.get_strategy_orders())
+
+    async def test_timed_out_placements_are_reconciled(self):
+        gateway = self.strategy.order_gateway = _FakeGateway()
+        gateway.request = AsyncMock(side_effect=asyncio.TimeoutError("batch-orders id 1 not answered in 5s"))
+        lookups = {"c1": {"code": "0", "msg": "", "data": [{"clOrdId": "c1", "ordId": "1", "state": "live"}]},
+                   "c2": {"code": "51603", "msg": "Order does not exist", "data": []}}
+        self.strategy.trade_api.get_order = MagicMock(side_effect=lambda instId, clOrdId: lookups[clOrdId])
+        await self.strategy.place_orders([place_request("c1"), place_request("c2")])
+        await asyncio.gather(*self.strategy._reconcile_tasks)
+        self.assertEqual(self.strategy.get_strategy_orders()["c1"].strategy_order_status, StrategyOrderStatus.ACK)
+        self.assertEqual(self.strategy.get_strategy_orders()["c1"].order_id, "1")
+        self.assertNotIn("c2", self.strategy.get_strategy_orders())
+
+    @patch("okx_market_maker.strategy.BaseStrategy.ORDER_REQUEST_TIMEOUT_SEC", 0)
+    async def test_unconfirmed_placement_is_dropped(self):
+        gateway = self.strategy.order_gateway = _FakeGateway()
+        gateway.request = AsyncMock(side_effect=asyncio.TimeoutError("batch-orders id 1 not answered in 5s"))
+        self.strategy.trade_api.get_order = MagicMock(side_effect=ConnectionError("lookup failed"))
+        await self.strategy.place_orders([place_request("c1")])
+        await asyncio.gather(*self.strategy._reconcile_tasks)
+        self.assertEqual(self.strategy.trade_api.get_order.call_count, ORDER_RECONCILE_ATTEMPTS)
+        self.assertNotIn("c1", self.strategy.get_strategy_orders())
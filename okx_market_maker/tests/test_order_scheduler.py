@@ -0,0 +1,96 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from okx_market_maker.order_management_service.OrderScheduler import OrderScheduler, TokenBucket, SUPERSEDED_CODE, \
+    CANCELED_BEFORE_SENT_MSG
+from okx_market_maker.utils.OkxEnum import OrderOp
+
+
+def _ack(args):
+    return {"code": "0", "msg": "", "data": [
+        {"clOrdId": arg.get("clOrdId", ""), "ordId": arg.get("ordId", ""), "sCode": "0", "sMsg": ""} for arg in args]}
+
+
+class TestTokenBucket(TestCase):
+    def test_refill(self):
+        bucket = TokenBucket(2, 1)
+        now = bucket.last_ts
+        self.assertTrue(bucket.try_consume(now))
+        self.assertTrue(bucket.try_consume(now))
+        self.assertFalse(bucket.try_consume(now))
+        self.assertAlmostEqual(bucket.wait_time(now), 0.5)
+        self.assertTrue(bucket.try_consume(now + 0.5))
+
+
+class TestOrderScheduler(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.sent = []
+        self.scheduler = OrderScheduler(self._send_batch)
+
+    async def _send_batch(self, op, args):
+        self.sent.append((op, [dict(arg) for arg in args]))
+        await asyncio.sleep(0)
+        return _ack(args)
+
+    async def test_cancels_before_amends_before_places(self):
+        places = self.scheduler.submit(OrderOp.BATCH_ORDER, [{"instId": "A", "clOrdId": "p1", "px": "1"}])
+        amends = self.scheduler.submit(OrderOp.BATCH_AMEND, [{"instId": "A", "clOrdId": "a1", "newPx": "2"}])
+        cancels = self.scheduler.submit(OrderOp.BATCH_CANCEL, [{"instId": "A", "clOrdId": "c1"}])
+        await asyncio.gather(*places, *amends, *cancels)
+        self.assertEqual([op for op, _ in self.sent], [OrderOp.BATCH_CANCEL, OrderOp.BATCH_AMEND, OrderOp.BATCH_ORDER])
+        self.assertEqual(places[0].result()["sCode"], "0")
+
+    async def test_merge_and_drop_by_client_order_id(self):
+        place = self.scheduler.submit(OrderOp.BATCH_ORDER, [{"instId": "A", "clOrdId": "p1", "px": "1", "sz": "1"},
+                                                            {"instId": "A", "clOrdId": "p2", "px": "1", "sz": "1"}])
+        amend_place = self.scheduler.submit(OrderOp.BATCH_AMEND, [{"instId": "A", "clOrdId": "p1", "newPx": "2"}])
+        amends = self.scheduler.submit(OrderOp.BATCH_AMEND, [{"instId": "A", "clOrdId": "x", "newPx": "3"},
+                                                             {"instId": "A", "clOrdId": "x", "newSz": "5"},
+                                                             {"instId": "A", "clOrdId": "y", "newPx": "3"}])
+        cancels = self.scheduler.submit(OrderOp.BATCH_CANCEL, [{"instId": "A", "clOrdId": "p2"},
+                                                               {"instId": "A", "clOrdId": "y"}])
+        await asyncio.gather(*place, *amend_place, *amends, *cancels)
+        sent = {op: args for op, args in self.sent}
+        # 改单合并进排队中的下单
+        self.assertEqual(sent[OrderOp.BATCH_ORDER], [{"instId": "A", "clOrdId": "p1", "px": "2", "sz": "1"}])
+        self.assertEqual(amend_place[0].result()["sCode"], "0")
+        # 同一订单的两次改单合并为一次
+        self.assertEqual(sent[OrderOp.BATCH_AMEND],
+                         [{"instId": "A", "clOrdId": "x", "newPx": "3", "newSz": "5", "cxlOnFail": False}])
+        self.assertIs(amends[0].result(), amends[1].result())
+        # 撤单取代排队中的改单；下单未发出时撤单也不再发送
+        self.assertEqual(amends[2].result()["sCode"], SUPERSEDED_CODE)
+        self.assertEqual(place[1].result()["sCode"], SUPERSEDED_CODE)
+        self.assertEqual(cancels[0].result()["sMsg"], CANCELED_BEFORE_SENT_MSG)
+        self.assertEqual(sent[OrderOp.BATCH_CANCEL], [{"instId": "A", "clOrdId": "y"}])
+        stats = self.scheduler.get_stats()
+        self.assertEqual((stats["batch-amend-orders"]["merged"], stats["batch-amend-orders"]["superseded"]), (2, 1))
+        self.assertEqual(stats["batch-orders"]["superseded"], 1)
+
+    async def test_rate_limit_per_instrument(self):
+        scheduler = OrderScheduler(self._send_batch, rate_limits={"batch-orders": (2, 0.2)})
+        futures = scheduler.submit(OrderOp.BATCH_ORDER, [{"instId": "A", "clOrdId": f"a{i}"} for i in range(3)] +
+                                   [{"instId": "B", "clOrdId": f"b{i}"} for i in range(2)])
+        await asyncio.sleep(0.01)
+        # A 的第三个订单等待令牌，不阻塞 B
+        self.assertEqual(scheduler.get_queue_depth(), {"batch-cancel-orders": 0, "batch-amend-orders": 0,
+                                                       "batch-orders": 1})
+        self.assertEqual([arg["clOrdId"] for arg in self.sent[0][1]], ["a0", "a1", "b0", "b1"])
+        await asyncio.gather(*futures)
+        self.assertEqual([arg["clOrdId"] for arg in self.sent[1][1]], ["a2"])
+        stats = scheduler.get_stats()["batch-orders"]
+        self.assertEqual((stats["sent"], stats["queue_depth"]), (5, 0))
+        self.assertGreater(stats["max_wait_ms"], 50)
+
+    async def test_unknown_and_failed_batches(self):
+        async def send_batch(op, args):
+            if op == OrderOp.BATCH_CANCEL:
+                raise ConnectionError("down")
+            return None
+
+        scheduler = OrderScheduler(send_batch)
+        amend = scheduler.submit(OrderOp.BATCH_AMEND, [{"instId": "A", "clOrdId": "a"}])
+        cancel = scheduler.submit(OrderOp.BATCH_CANCEL, [{"instId": "A", "clOrdId": "c"}])
+        self.assertIsNone(await amend[0])
+        with self.assertRaises(ConnectionError):
+            await cancel[0]
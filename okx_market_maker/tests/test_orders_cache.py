@@ -0,0 +1,92 @@
+from collections import deque
+from unittest import TestCase
+
+from okx_market_maker import order_change_feeds, orders_container
+from okx_market_maker.order_management_service.WssOrderManagementService import on_orders_update
+from okx_market_maker.order_management_service.model.Order import Orders, Order, OrderChange
+from okx_market_maker.utils.OkxEnum import OrderState
+
+
+def _order_json(order_id: str, state: str, client_order_id: str = "") -> dict:
+    return {"accFillSz": "0", "amendResult": "", "avgPx": "0", "cTime": "1695190491421", "category": "normal",
+            "ccy": "", "clOrdId": client_order_id, "execType": "", "fee": "0", "feeCcy": "USDT", "fillFee": "0",
+            "fillFeeCcy": "", "fillNotionalUsd": "", "fillPx": "", "fillSz": "0", "fillTime": "",
+            "instId": "BTC-USDT-SWAP", "instType": "SWAP", "lever": "3", "notionalUsd": "30", "ordId": order_id,
+            "ordType": "post_only", "pnl": "0", "posSide": "net", "px": "30000", "rebate": "0", "rebateCcy": "USDT",
+            "reduceOnly": "false", "reqId": "", "side": "buy", "state": state, "sz": "1", "tag": "",
+            "tradeId": "", "uTime": "1695190491421"}
+
+
+class TestOrdersCache(TestCase):
+    def test_compact_order(self):
+        order = Order.init_from_json(_order_json("1", "live"))
+        self.assertFalse(hasattr(order, "__dict__"))
+        self.assertIs(order.reduce_only, False)
+
+    def test_terminal_orders_evicted_after_grace(self):
+        orders = Orders(terminal_grace_sec=10)
+        orders.update_from_json({"data": [_order_json("1", "live", "c1"), _order_json("2", "live")]}, now=0)
+        orders.update_from_json({"data": [_order_json("1", "filled", "c1"), _order_json("2", "canceled")]}, now=1)
+        orders.update_from_json({"data": [_order_json("3", "mmp_canceled")]}, now=5)
+        self.assertEqual(orders.get_order_by_client_order_id("c1").state, OrderState.FILLED)
+        orders.update_from_json({"data": [_order_json("4", "live")]}, now=11)
+        self.assertIsNone(orders.get_order_by_client_order_id("c1"))
+        self.assertIsNone(orders.get_order_by_order_id("2"))
+        self.assertNotIn("2", orders.get_non_client_order())
+        self.assertEqual(list(orders.get_active_orders()), ["4"])
+        self.assertEqual(orders.get_memory_stats()["evicted"], 2)
+        self.assertEqual(orders.evict(now=15), 1)
+
+    def test_max_orders_evicts_terminal_then_least_recently_updated(self):
+        orders = Orders(max_orders=3)
+        orders.update_from_json({"data": [_order_json("1", "live"), _order_json("2", "live"),
+                                          _order_json("3", "canceled")]}, now=0)
+        orders.update_from_json({"data": [_order_json("4", "live")]}, now=1)
+        self.assertEqual(list(orders.get_active_orders()), ["1", "2", "4"])
+        # 1 的更新使 2 成为最久未更新的订单
+        orders.update_from_json({"data": [_order_json("1", "partially_filled"), _order_json("5", "live")]}, now=2)
+        self.assertEqual(list(orders.get_active_orders()), ["4", "1", "5"])
+
+    def test_memory_flat_over_long_run(self):
+        orders = Orders(terminal_grace_sec=60)
+        sizes = []
+        for i in range(8000):
+            now = i * 0.1
+            orders.update_from_json({"data": [_order_json(str(i), "live", f"c{i}")]}, now=now)
+            orders.update_from_json({"data": [_order_json(str(i), "canceled", f"c{i}")]}, now=now + 0.05)
+            if i % 2000 == 1999:
+                sizes.append(orders.get_memory_stats()["orders"])
+        self.assertEqual(len(set(sizes)), 1)
+        self.assertLessEqual(sizes[0], 601)
+
+    def test_copy_on_write_snapshot(self):
+        orders = Orders()
+        orders.update_from_json({"data": [_order_json("1", "live", "c1"), _order_json("2", "live", "c2")]}, now=0)
+        snapshot = orders.snapshot()
+        self.assertIs(orders.snapshot(), snapshot)
+        self.assertIs(snapshot._order_map, orders._order_map)
+        orders.update_from_json({"data": [_order_json("1", "filled", "c1")]}, now=1)
+        orders.remove_orders([orders.get_order_by_order_id("2")])
+        # 快照内容不随缓存变化
+        self.assertEqual(snapshot.get_order_by_client_order_id("c1").state, OrderState.LIVE)
+        self.assertIsNotNone(snapshot.get_order_by_order_id("2"))
+        self.assertEqual(orders.get_order_by_client_order_id("c1").state, OrderState.FILLED)
+        self.assertIsNone(orders.get_order_by_order_id("2"))
+        self.assertGreater(orders.snapshot().version, snapshot.version)
+        with self.assertRaises(ValueError):
+            snapshot.remove_orders([snapshot.get_order_by_order_id("1")])
+
+
+class TestOrderChangeFeed(TestCase):
+    def tearDown(self) -> None:
+        order_change_feeds.clear()
+        orders_container.clear()
+
+    def test_on_orders_update_publishes_changes(self):
+        feed = deque()
+        order_change_feeds.append(feed)
+        filled = {**_order_json("1", "filled", "c1"), "accFillSz": "1", "fillPx": "30000"}
+        on_orders_update({"arg": {"channel": "orders"}, "data": [filled, _order_json("2", "live")]})
+        self.assertEqual(list(feed), [OrderChange(cl_ord_id="c1", ord_id="1", state=OrderState.FILLED,
+                                                  acc_fill_sz="1", fill_px=30000.0)])
+        self.assertEqual(orders_container[0].get_order_by_order_id("2").state, OrderState.LIVE)
@@ -1,18 +1,19 @@
 from decimal import Decimal
-from unittest import TestCase
-from unittest.mock import patch, MagicMock
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch, MagicMock, AsyncMock
 
 from okx_market_maker.market_data_service.model.OrderBook import OrderBookLevel
-from okx_market_maker.order_management_service.model.Order import Orders, Order
+from okx_market_maker.order_management_service.model.Order import OrderChange
 from okx_market_maker.position_management_service.model.Account import Account
-from okx_market_maker.config.settings import ORDER_BOOK_DELAYED_SEC, ACCOUNT_DELAYED_SEC
+from okx_market_maker.config.settings import ORDER_BOOK_DELAYED_SEC, ACCOUNT_DELAYED_SEC, \
+    ORDER_BOOK_RESYNC_TIMEOUT_SEC
 from okx_market_maker.strategy.SampleMM import SampleMM, OrderBook, TRADING_INSTRUMENT_ID
 from okx_market_maker.strategy.model.StrategyOrder import StrategyOrder, StrategyOrderStatus
 from okx_market_maker.utils.OkxEnum import OrderState, OrderSide, OrderType, AccountConfigMode, InstType, TdMode
 from okx_market_maker.utils.TdModeUtil import TdModeUtil
 
 
-class TestStrategy(TestCase):
+class TestStrategy(IsolatedAsyncioTestCase):
     def setUp(self) -> None:
         strategy = SampleMM()
         self.strategy = strategy
@@ -25,12 +26,13 @@ class TestStrategy(TestCase):
         order_book.set_timestamp(1234000)
         self.order_book = order_book
         account = Account()
-        account.u_time = 1234
+        account.u_time = 1234000
         self.account = account
         self.strategy.get_order_book = MagicMock(return_value=order_book)
         self.strategy.get_account = MagicMock(return_value=account)
-        self.strategy.mds.stop_service = MagicMock(return_value=None)
-        self.strategy.mds.run_service = MagicMock(return_value=None)
+        self.strategy.mds = MagicMock()
+        self.strategy.mds.resync = AsyncMock(return_value=None)
+        self.strategy.mds.is_resyncing = MagicMock(return_value=False)
 
     def test_check_status(self):
         self.strategy.status_api.status = MagicMock(return_value={
@@ -61,33 +63,34 @@ class TestStrategy(TestCase):
         self.assertTrue(self.strategy.check_status())
 
     @patch("time.time", return_value=1234+ORDER_BOOK_DELAYED_SEC+1)
-    def test_health_check_orderbook_timeout(self, time_mock):
-        self.assertFalse(self.strategy._health_check())
+    async def test_health_check_orderbook_timeout(self, time_mock):
+        self.assertFalse(await self.strategy._health_check())
 
     @patch("time.time", return_value=1235)
-    def test_health_check_checksum_failed(self, time_mock):
+    async def test_health_check_checksum_failed(self, time_mock):
         self.order_book.do_check_sum = MagicMock(return_value=False)
-        self.assertFalse(self.strategy._health_check())
-        self.strategy.mds.stop_service.assert_called_once()
-        self.strategy.mds.run_service.assert_called_once()
+        self.assertFalse(await self.strategy._health_check())
+        self.strategy.mds.resync.assert_awaited_once_with(TRADING_INSTRUMENT_ID)
+
+    @patch("time.time", return_value=1235)
+    async def test_health_check_resync_timeout(self, time_mock):
+        # 同步进行中：不重复发起
+        self.strategy.mds.is_resyncing = MagicMock(return_value=True)
+        self.assertFalse(await self.strategy._health_check())
+        self.strategy.mds.resync.assert_not_awaited()
+        # 快照超时未到达：重新发起同步
+        self.strategy.mds.is_resyncing = MagicMock(side_effect=lambda inst_id, timeout_sec=None: timeout_sec is None)
+        self.assertFalse(await self.strategy._health_check())
+        self.strategy.mds.is_resyncing.assert_called_with(TRADING_INSTRUMENT_ID, ORDER_BOOK_RESYNC_TIMEOUT_SEC)
+        self.strategy.mds.resync.assert_awaited_once_with(TRADING_INSTRUMENT_ID)
 
     @patch("time.time", return_value=1234 + ACCOUNT_DELAYED_SEC + 1)
-    def test_health_check_account_timeout(self, time_mock):
-        self.order_book.timestamp = 1234 + ACCOUNT_DELAYED_SEC
-        self.assertFalse(self.strategy._health_check())
+    async def test_health_check_account_timeout(self, time_mock):
+        self.order_book.timestamp = (1234 + ACCOUNT_DELAYED_SEC) * 1000
+        self.assertFalse(await self.strategy._health_check())
 
     def test_update_strategy_order(self):
-        order1 = Order(cl_ord_id="order1", ord_id='1', state=OrderState.LIVE, side=OrderSide.BUY)
-        order2 = Order(cl_ord_id="order2", ord_id='2', state=OrderState.CANCELED, side=OrderSide.BUY)
-        order3 = Order(cl_ord_id="order3", ord_id='3', state=OrderState.FILLED, acc_fill_sz="1", side=OrderSide.BUY)
-        order4 = Order(cl_ord_id="order4", ord_id='4', state=OrderState.PARTIALLY_FILLED, acc_fill_sz="0.5",
-                       side=OrderSide.BUY)
-        orders = Orders(
-            _order_map={'1': order1, "2": order2, "3": order3, "4": order4},
-            _client_order_map={"order1": order1, "order2": order2, "order3": order3, "order4": order4,}
-        )
-        self.strategy.get_orders = MagicMock(side_effect=lambda: orders)
-        self.strategy._strategy_order_dict = {
+        for client_order_id, strategy_order in {
             "order1": StrategyOrder(inst_id=TRADING_INSTRUMENT_ID, side=OrderSide.BUY, ord_type=OrderType.LIMIT,
                                     size="1", price="1", strategy_order_status=StrategyOrderStatus.SENT),
             "order2": StrategyOrder(inst_id=TRADING_INSTRUMENT_ID, side=OrderSide.BUY, ord_type=OrderType.LIMIT,
@@ -96,16 +99,32 @@ class TestStrategy(TestCase):
                                     size="1", price="1", strategy_order_status=StrategyOrderStatus.LIVE),
             "order4": StrategyOrder(inst_id=TRADING_INSTRUMENT_ID, side=OrderSide.BUY, ord_type=OrderType.LIMIT,
                                     size="1", price="1", strategy_order_status=StrategyOrderStatus.LIVE),
-        }
+        }.items():
+            self.strategy._strategy_order_book[client_order_id] = strategy_order
+        self.strategy._order_changes.extend([
+            OrderChange(cl_ord_id="order1", ord_id="1", state=OrderState.LIVE),
+            OrderChange(cl_ord_id="order2", ord_id="2", state=OrderState.CANCELED),
+            OrderChange(cl_ord_id="order3", ord_id="3", state=OrderState.PARTIALLY_FILLED, acc_fill_sz="0.4",
+                        fill_px=1),
+            OrderChange(cl_ord_id="order3", ord_id="3", state=OrderState.FILLED, acc_fill_sz="1", fill_px=1),
+            OrderChange(cl_ord_id="order4", ord_id="4", state=OrderState.PARTIALLY_FILLED, acc_fill_sz="0.5",
+                        fill_px=1),
+            OrderChange(cl_ord_id="unknown", ord_id="5", state=OrderState.FILLED, acc_fill_sz="1"),
+        ])
         self.strategy._update_strategy_order_status()
-        self.assertIn("order1", self.strategy._strategy_order_dict)
-        self.assertEqual(self.strategy._strategy_order_dict["order1"].strategy_order_status, StrategyOrderStatus.LIVE)
-        self.assertNotIn("order2", self.strategy._strategy_order_dict)
-        self.assertNotIn("order3", self.strategy._strategy_order_dict)
-        self.assertIn("order4", self.strategy._strategy_order_dict)
-        self.assertEqual(self.strategy._strategy_order_dict["order4"].strategy_order_status,
+        self.assertEqual(len(self.strategy._order_changes), 0)
+        self.assertIn("order1", self.strategy._strategy_order_book)
+        self.assertEqual(self.strategy._strategy_order_book["order1"].strategy_order_status, StrategyOrderStatus.LIVE)
+        self.assertEqual(self.strategy._strategy_order_book["order1"].order_id, "1")
+        self.assertNotIn("order2", self.strategy._strategy_order_book)
+        self.assertNotIn("order3", self.strategy._strategy_order_book)
+        self.assertIn("order4", self.strategy._strategy_order_book)
+        self.assertEqual(self.strategy._strategy_order_book["order4"].strategy_order_status,
                          StrategyOrderStatus.PARTIALLY_FILLED)
-        self.assertEqual(self.strategy._strategy_order_dict["order4"].filled_size, order4.acc_fill_sz)
+        self.assertEqual(self.strategy._strategy_order_book["order4"].filled_size, "0.5")
+        self.assertEqual(self.strategy._strategy_measurement.net_filled_qty, Decimal("1.5"))
+        # 没有新的变化时不做任何处理
+        self.strategy._update_strategy_order_status()
         self.assertEqual(self.strategy._strategy_measurement.net_filled_qty, Decimal("1.5"))
 
     def test_decide_td_mode(self):
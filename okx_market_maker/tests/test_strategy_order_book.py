@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from okx_market_maker.strategy.model.StrategyOrder import StrategyOrder
+from okx_market_maker.strategy.model.StrategyOrderBook import StrategyOrderBook
+from okx_market_maker.utils.OkxEnum import OrderSide, OrderType
+
+
+def _strategy_order(client_order_id: str, side: OrderSide, price: str) -> StrategyOrder:
+    return StrategyOrder(inst_id="BTC-USDT-SWAP", side=side, ord_type=OrderType.LIMIT, size="1", price=price,
+                         client_order_id=client_order_id)
+
+
+class TestStrategyOrderBook(TestCase):
+    def setUp(self) -> None:
+        self.book = StrategyOrderBook()
+        for client_order_id, side, price in [("b1", OrderSide.BUY, "99.5"), ("b2", OrderSide.BUY, "100"),
+                                             ("b3", OrderSide.BUY, "99.5"), ("a1", OrderSide.SELL, "101"),
+                                             ("a2", OrderSide.SELL, "100.5")]:
+            self.book[client_order_id] = _strategy_order(client_order_id, side, price)
+
+    @staticmethod
+    def _ids(orders):
+        return [order.client_order_id for order in orders]
+
+    def test_side_orders_sorted_by_price(self):
+        self.assertEqual(self._ids(self.book.get_side_orders(OrderSide.BUY)), ["b2", "b1", "b3"])
+        self.assertEqual(self._ids(self.book.get_side_orders(OrderSide.SELL)), ["a2", "a1"])
+        self.assertEqual(self.book.get_best_order(OrderSide.SELL).client_order_id, "a2")
+        self.assertEqual(len(self.book), 5)
+        self.assertEqual(set(self.book.copy()), {"b1", "b2", "b3", "a1", "a2"})
+
+    def test_reprice_and_delete(self):
+        self.book.reprice("b1", "100.5")
+        self.book.reprice("a1", "100")
+        self.assertEqual(self.book["b1"].price, "100.5")
+        self.assertEqual(self._ids(self.book.get_side_orders(OrderSide.BUY)), ["b1", "b2", "b3"])
+        self.assertEqual(self._ids(self.book.get_side_orders(OrderSide.SELL)), ["a1", "a2"])
+        del self.book["b2"]
+        self.book.pop("a1")
+        self.assertNotIn("b2", self.book)
+        self.assertEqual(self._ids(self.book.get_side_orders(OrderSide.BUY)), ["b1", "b3"])
+        self.assertEqual(self._ids(self.book.get_side_orders(OrderSide.SELL)), ["a2"])
+        # 同一 clOrdId 重新写入时替换原订单
+        self.book["b3"] = _strategy_order("b3", OrderSide.SELL, "102")
+        self.assertEqual(self._ids(self.book.get_side_orders(OrderSide.BUY)), ["b1"])
+        self.assertEqual(self._ids(self.book.get_side_orders(OrderSide.SELL)), ["a2", "b3"])
+
+    def test_lookup_by_order_id(self):
+        self.book.set_order_id("b1", "1001")
+        self.assertIs(self.book.get_by_order_id("1001"), self.book["b1"])
+        self.assertEqual(self.book["b1"].order_id, "1001")
+        del self.book["b1"]
+        self.assertIsNone(self.book.get_by_order_id("1001"))
+        self.assertIsNone(self.book.get_by_order_id("unknown"))
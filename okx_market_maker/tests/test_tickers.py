@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from okx_market_maker.market_data_service.model.Tickers import Tickers
+
+
+def _tickers_response(*rows) -> dict:
+    return {"code": "0", "data": [{"instType": "SPOT", "instId": inst_id, "bidPx": bid, "askPx": ask, "last": last}
+                                  for inst_id, bid, ask, last in rows]}
+
+
+class TestTickersConversion(TestCase):
+    def setUp(self) -> None:
+        self.tickers = Tickers()
+        self.tickers.update_from_json(_tickers_response(
+            ("BTC-USDT", "29990", "30010", "30005"), ("ETH-BTC", "0.05", "0.07", "0.06"), ("USDC-USDT", "1", "1", "1")))
+
+    def test_direct_bridge_and_missing(self):
+        self.assertEqual(self.tickers.get_usdt_price_by_ccy("USDT"), 1)
+        self.assertEqual(self.tickers.get_usdt_price_by_ccy("BTC"), 30000)
+        self.assertEqual(self.tickers.get_usdt_price_by_ccy("BTC", use_mid=False), 30005)
+        self.assertAlmostEqual(self.tickers.get_usdt_price_by_ccy("ETH"), 1800)
+        self.assertEqual(self.tickers.get_usdt_price_by_ccy("SOL"), 0)
+        self.assertEqual(self.tickers.get_usdt_prices_by_ccy(["USDT", "BTC", "SOL"]), {"USDT": 1, "BTC": 30000, "SOL": 0})
+
+    def test_cached_path_follows_price_updates(self):
+        path = self.tickers.get_conversion_path("ETH")
+        self.tickers.update_from_json(_tickers_response(("BTC-USDT", "39990", "40010", "40000")))
+        self.assertIs(self.tickers.get_conversion_path("ETH"), path)
+        self.assertAlmostEqual(self.tickers.get_usdt_price_by_ccy("ETH"), 2400)
+
+    def test_universe_change_rebuilds_paths(self):
+        version = self.tickers.universe_version
+        self.assertEqual(self.tickers.get_usdt_price_by_ccy("SOL"), 0)
+        self.tickers.update_from_json(_tickers_response(("ETH-USDT", "2000", "2000", "2000"),
+                                                        ("SOL-USDC", "20", "20", "20")))
+        self.assertEqual(self.tickers.universe_version, version + 1)
+        self.assertEqual(self.tickers.get_usdt_price_by_ccy("ETH"), 2000)
+        self.assertEqual(self.tickers.get_usdt_price_by_ccy("SOL"), 20)
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import MagicMock, patch
+
+from okx_market_maker import order_books
+from okx_market_maker.strategy.SampleMM import SampleMM
+from okx_market_maker.strategy.Watchdog import Watchdog, CANCEL_ALL_AFTER_ENDPOINT, TRADING_INSTRUMENT_ID
+from okx_market_maker.strategy.model.StrategyOrder import StrategyOrder, StrategyOrderStatus
+from okx_market_maker.utils.OkxEnum import OrderSide, OrderType
+
+
+class _SlowTradeAPI:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.requests = []
+        self._request_with_params = MagicMock(return_value={"code": "0", "msg": "", "data": []})
+
+    def cancel_multiple_orders(self, data):
+        self.requests.append(data)
+        time.sleep(self.delay)
+        return {"code": "0", "msg": "", "data": []}
+
+
+@patch("okx_market_maker.strategy.Watchdog.WATCHDOG_CANCEL_ALL_AFTER_SEC", 0)
+class TestWatchdog(TestCase):
+    def setUp(self) -> None:
+        self.trade_api = _SlowTradeAPI(0.05)
+        self.targets = [{"instId": TRADING_INSTRUMENT_ID, "clOrdId": f"c{i}"} for i in range(45)]
+        self.watchdog = Watchdog(self.trade_api, lambda: self.targets)
+
+    def tearDown(self) -> None:
+        order_books.pop(TRADING_INSTRUMENT_ID, None)
+        self.watchdog.stop()
+
+    def test_stale_book_trips_concurrent_cancel(self):
+        order_books[TRADING_INSTRUMENT_ID] = MagicMock(timestamp=int(time.time() * 1000))
+        self.watchdog.poll()
+        self.assertFalse(self.watchdog.is_tripped())
+        order_books[TRADING_INSTRUMENT_ID].timestamp -= 60 * 1000
+        self.watchdog.poll()
+        self.assertTrue(self.watchdog.is_tripped())
+        self.assertEqual([len(r) for r in self.trade_api.requests], [20, 20, 5])
+        # 三个撤单请求并发执行
+        self.assertLess(self.watchdog.last_cancel_ms, 140)
+        # 仍然触发时不重复撤单，恢复后解除
+        self.watchdog.poll()
+        self.assertEqual(self.watchdog.trip_count, 1)
+        order_books[TRADING_INSTRUMENT_ID].timestamp = int(time.time() * 1000)
+        self.watchdog.poll()
+        self.assertFalse(self.watchdog.is_tripped())
+
+    @patch("okx_market_maker.strategy.Watchdog.WATCHDOG_CANCEL_TIMEOUT_SEC", 0.01)
+    def test_cancel_is_time_bounded(self):
+        self.trade_api.delay = 0.5
+        self.watchdog.kill()
+        self.assertLess(self.watchdog.last_cancel_ms, 100)
+
+    def test_error_rate(self):
+        for _ in range(4):
+            self.watchdog.record_error()
+        self.assertEqual(self.watchdog.check(), [])
+        self.watchdog.record_error()
+        self.assertEqual(len(self.watchdog.check()), 1)
+
+    def test_renews_cancel_all_after(self):
+        renewed = threading.Event()
+        self.trade_api._request_with_params.side_effect = lambda *args: renewed.set() or {"code": "0"}
+        with patch("okx_market_maker.strategy.Watchdog.WATCHDOG_CANCEL_ALL_AFTER_SEC", 60):
+            self.watchdog.poll()
+            self.watchdog.poll()
+        self.assertTrue(renewed.wait(1))
+        self.trade_api._request_with_params.assert_called_once_with("POST", CANCEL_ALL_AFTER_ENDPOINT,
+                                                                    {"timeOut": "60"})
+
+        # 停止时取消倒计时
+        self.watchdog.stop()
+        self.trade_api._request_with_params.assert_called_with("POST", CANCEL_ALL_AFTER_ENDPOINT, {"timeOut": "0"})
+
+    def test_stop_without_cancel_all_after(self):
+        self.watchdog.poll()
+        self.watchdog.stop()
+        self.trade_api._request_with_params.assert_not_called()
+
+
+class TestKillSwitchTargets(TestCase):
+    def setUp(self) -> None:
+        self.strategy = SampleMM()
+        self.strategy._strategy_order_book["c1"] = StrategyOrder(
+            inst_id=TRADING_INSTRUMENT_ID, ord_type=OrderType.LIMIT, side=OrderSide.BUY, size="1", price="30000",
+            client_order_id="c1", strategy_order_status=StrategyOrderStatus.LIVE)
+        orders = MagicMock()
+        orders.get_active_orders.return_value = {
+            "1": MagicMock(inst_id=TRADING_INSTRUMENT_ID, cl_ord_id="c1", ord_id="1"),
+            "2": MagicMock(inst_id=TRADING_INSTRUMENT_ID, cl_ord_id="", ord_id="2"),
+        }
+        self.orders_container = [orders]
+
+    def test_only_strategy_orders_by_default(self):
+        with patch("okx_market_maker.strategy.BaseStrategy.orders_container", self.orders_container):
+            targets = self.strategy._get_kill_switch_targets()
+        self.assertEqual([(t["clOrdId"], t["ordId"]) for t in targets], [("c1", "")])
+
+    @patch("okx_market_maker.strategy.BaseStrategy.WATCHDOG_CANCEL_UNTRACKED_ORDERS", True)
+    def test_untracked_orders_opt_in(self):
+        with patch("okx_market_maker.strategy.BaseStrategy.orders_container", self.orders_container):
+            targets = self.strategy._get_kill_switch_targets()
+        self.assertEqual([(t["clOrdId"], t["ordId"]) for t in targets], [("c1", ""), ("", "2")])
+
+
+@patch("okx_market_maker.strategy.Watchdog.WATCHDOG_CANCEL_ALL_AFTER_SEC", 0)
+@patch("okx_market_maker.strategy.Watchdog.WATCHDOG_CHECK_INTERVAL_SEC", 0.01)
+@patch("okx_market_maker.strategy.Watchdog.WATCHDOG_LOOP_STALL_SEC", 0.1)
+class TestWatchdogThread(IsolatedAsyncioTestCase):
+    async def test_blocked_event_loop_trips(self):
+        trade_api = _SlowTradeAPI(0)
+        watchdog = Watchdog(trade_api, lambda: [{"instId": TRADING_INSTRUMENT_ID, "clOrdId": "c1"}])
+        watchdog.start(asyncio.get_running_loop())
+        try:
+            await asyncio.sleep(0.05)
+            self.assertFalse(watchdog.is_tripped())
+            # 阻塞事件循环，watchdog 线程仍然撤单
+            time.sleep(0.3)
+            self.assertTrue(watchdog.is_tripped())
+            self.assertEqual(trade_api.requests, [[{"instId": TRADING_INSTRUMENT_ID, "clOrdId": "c1"}]])
+            await asyncio.sleep(0.05)
+            self.assertFalse(watchdog.is_tripped())
+        finally:
+            watchdog.stop()
@@ -0,0 +1,39 @@
+import json
+from unittest import TestCase
+
+from okx_market_maker.utils import WsMessageUtil
+
+CHANNELS = frozenset(["books"])
+BOOK_MESSAGE = {"arg": {"channel": "books", "instId": "BTC-USDT-SWAP"}, "action": "update",
+                "data": [{"bids": [["100", "1", "0", "1"]], "asks": [], "seqId": 2, "prevSeqId": 1}]}
+
+
+class TestWsMessageUtil(TestCase):
+    def tearDown(self) -> None:
+        WsMessageUtil.set_json_backend("auto")
+
+    def test_peek_event_and_channel(self):
+        self.assertEqual(WsMessageUtil.peek_event_and_channel(json.dumps(BOOK_MESSAGE, separators=(",", ":"))),
+                         (None, "books"))
+        self.assertEqual(WsMessageUtil.peek_event_and_channel(
+            '{"event":"subscribe","arg":{"channel":"books","instId":"BTC-USDT-SWAP"}}'), ("subscribe", "books"))
+        # 数据中的字段不会被误认为消息头
+        self.assertEqual(WsMessageUtil.peek_event_and_channel('{"data":[{"channel":"x"}]}'), (None, None))
+
+    def test_decode_message_all_backends(self):
+        for backend in ("json", "orjson", "msgspec"):
+            WsMessageUtil.set_json_backend(backend)
+            for raw in (json.dumps(BOOK_MESSAGE), json.dumps(BOOK_MESSAGE, separators=(",", ":")),
+                        json.dumps(BOOK_MESSAGE).encode(), BOOK_MESSAGE):
+                self.assertEqual(WsMessageUtil.decode_message(raw, CHANNELS), BOOK_MESSAGE)
+
+    def test_drops_events_and_other_channels(self):
+        for backend in ("json", "orjson"):
+            WsMessageUtil.set_json_backend(backend)
+            self.assertIsNone(WsMessageUtil.decode_message(
+                '{"event":"subscribe","arg":{"channel":"books","instId":"BTC-USDT-SWAP"}}', CHANNELS))
+            self.assertIsNone(WsMessageUtil.decode_message(
+                '{"event": "unsubscribe", "arg": {"channel": "books"}}', CHANNELS))
+            self.assertIsNone(WsMessageUtil.decode_message('{"arg":{"channel":"tickers"},"data":[]}', CHANNELS))
+            self.assertIsNone(WsMessageUtil.decode_message(b'{"arg":{"channel":"tickers"},"data":[]}', CHANNELS))
+            self.assertIsNone(WsMessageUtil.decode_message("pong", CHANNELS))
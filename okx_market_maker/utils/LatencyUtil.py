@@ -0,0 +1,223 @@
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from okx_market_maker.config.settings import LATENCY_TRACKING
+
+logger = logging.getLogger(__name__)
+
+# 这个文件提供订单生命周期各阶段的延迟统计
+# 时间戳均为 time.perf_counter_ns()，各阶段耗时以微秒计入 LatencyHistogram，按 (阶段, 操作) 分别统计：
+#   book_to_decision  订单簿消息到达 -> 决策开始
+#   decision          order_operation_decision 开始 -> 结束
+#   decision_to_send  决策结束 -> 请求发出（含调度器排队），按操作
+#   send_to_ack       请求发出 -> 下单 / 改单 / 撤单确认，按操作
+#   send_to_update    请求发出 -> orders 频道第一次推送该订单，按操作
+#   book_to_ack       触发决策的订单簿消息到达 -> 确认，按操作
+
+BOOK_TO_DECISION = "book_to_decision"
+DECISION = "decision"
+DECISION_TO_SEND = "decision_to_send"
+SEND_TO_ACK = "send_to_ack"
+SEND_TO_UPDATE = "send_to_update"
+BOOK_TO_ACK = "book_to_ack"
+STAGES = (BOOK_TO_DECISION, DECISION, DECISION_TO_SEND, SEND_TO_ACK, SEND_TO_UPDATE, BOOK_TO_ACK)
+# 同时跟踪的订单数上限，超过时丢弃最早的
+MAX_TRACKED_ORDERS = 10000
+
+
+class LatencyHistogram:
+    """
+    对数分桶的延迟直方图，内存固定，分位数的相对误差不超过 1/32。
+    64 微秒以下每微秒一个桶，之后每个 2 的幂区间分为 32 个桶。
+    """
+    SUB_BUCKETS = 32
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us: Optional[int] = None
+
+    @classmethod
+    def _index(cls, value_us: int) -> int:
+        if value_us < 2 * cls.SUB_BUCKETS:
+            return value_us
+        shift = value_us.bit_length() - 6
+        return cls.SUB_BUCKETS * (shift + 1) + (value_us >> shift) - cls.SUB_BUCKETS
+
+    @classmethod
+    def _upper_bound(cls, index: int) -> int:
+        if index < 2 * cls.SUB_BUCKETS:
+            return index
+        shift = index // cls.SUB_BUCKETS - 1
+        mantissa = index % cls.SUB_BUCKETS + cls.SUB_BUCKETS
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value_us: int) -> None:
+        value_us = max(int(value_us), 0)
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value_us
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = value_us if self.max_us is None else max(self.max_us, value_us)
+
+    def percentile(self, q: float) -> int:
+        """
+        返回分位数 q（0-1）所在桶的上界（微秒），不超过最大值。
+        """
+        if not self.count:
+            return 0
+        rank = max(math.ceil(q * self.count), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._upper_bound(index), self.max_us)
+        return self.max_us
+
+    def summary(self) -> Dict[str, float]:
+        return {"count": self.count, "min_us": self.min_us or 0,
+                "avg_us": self.total_us / self.count if self.count else 0,
+                "p50_us": self.percentile(0.5), "p99_us": self.percentile(0.99),
+                "p999_us": self.percentile(0.999), "max_us": self.max_us or 0}
+
+
+@dataclass(slots=True)
+class _OrderMarks:
+    op: str
+    decision_end_ns: int
+    book_ns: int
+    sent_ns: int = 0
+    acked: bool = False
+    updated: bool = False
+
+
+_histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+_book_received_ns: Dict[str, int] = {}
+# clOrdId -> 最近一次请求的时间戳，确认与 orders 频道推送都记录后删除
+_tracked_orders: Dict[str, _OrderMarks] = {}
+
+
+def record_latency(stage: str, op: str, start_ns: int, end_ns: int = None) -> None:
+    if not LATENCY_TRACKING or not start_ns:
+        return
+    if end_ns is None:
+        end_ns = time.perf_counter_ns()
+    histogram = _histograms.get((stage, op))
+    if histogram is None:
+        histogram = _histograms[(stage, op)] = LatencyHistogram()
+    histogram.record((end_ns - start_ns) // 1000)
+
+
+def mark_book_received(inst_id: str, recv_ns: int) -> None:
+    """
+    订单簿消息应用后调用，recv_ns 为回调开始处理该消息的时间。
+    """
+    if LATENCY_TRACKING:
+        _book_received_ns[inst_id] = recv_ns
+
+
+def get_book_received_ns(inst_id: str) -> int:
+    return _book_received_ns.get(inst_id, 0)
+
+
+def mark_orders_decided(op: str, client_order_ids: Iterable[str], decision_end_ns: int, book_ns: int) -> None:
+    """
+    决策生成的订单请求交给调度器时调用，同一 clOrdId 之前的记录被替换。
+    """
+    if not LATENCY_TRACKING:
+        return
+    for client_order_id in client_order_ids:
+        _tracked_orders.pop(client_order_id, None)
+        _tracked_orders[client_order_id] = _OrderMarks(op, decision_end_ns, book_ns)
+    while len(_tracked_orders) > MAX_TRACKED_ORDERS:
+        del _tracked_orders[next(iter(_tracked_orders))]
+
+
+def mark_orders_sent(op: str, client_order_ids: Iterable[str], sent_ns: int) -> None:
+    if not LATENCY_TRACKING:
+        return
+    for client_order_id in client_order_ids:
+        marks = _tracked_orders.get(client_order_id)
+        if marks is None or marks.op != op or marks.sent_ns:
+            continue
+        marks.sent_ns = sent_ns
+        record_latency(DECISION_TO_SEND, op, marks.decision_end_ns, sent_ns)
+
+
+def mark_order_acked(client_order_id: str) -> None:
+    """
+    收到某个订单的成功确认时调用。
+    """
+    marks = _tracked_orders.get(client_order_id) if LATENCY_TRACKING else None
+    if marks is None or not marks.sent_ns or marks.acked:
+        return
+    now = time.perf_counter_ns()
+    record_latency(SEND_TO_ACK, marks.op, marks.sent_ns, now)
+    record_latency(BOOK_TO_ACK, marks.op, marks.book_ns, now)
+    marks.acked = True
+    if marks.updated:
+        del _tracked_orders[client_order_id]
+
+
+def mark_orders_updated(data: List[Dict]) -> None:
+    """
+    orders 频道推送写入缓存后调用，data 为推送中的订单列表。推送可能先于确认到达。
+    """
+    if not LATENCY_TRACKING or not _tracked_orders:
+        return
+    now = time.perf_counter_ns()
+    for order in data:
+        client_order_id = order.get("clOrdId")
+        marks = _tracked_orders.get(client_order_id)
+        if marks is None or not marks.sent_ns or marks.updated:
+            continue
+        record_latency(SEND_TO_UPDATE, marks.op, marks.sent_ns, now)
+        marks.updated = True
+        if marks.acked:
+            del _tracked_orders[client_order_id]
+
+
+def get_latency_summary() -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    返回各阶段、各操作的延迟统计 {阶段: {操作: {"count", "min_us", "avg_us", "p50_us", "p99_us", "p999_us",
+    "max_us"}}}，不区分操作的阶段操作为 "all"。
+    """
+    summary: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for (stage, op), histogram in sorted(_histograms.items(), key=lambda item: (STAGES.index(item[0][0]), item[0][1])):
+        summary.setdefault(stage, {})[op or "all"] = histogram.summary()
+    return summary
+
+
+def format_latency_summary() -> str:
+    lines = [f"{'stage':<18}{'op':<22}{'count':>8}{'p50_us':>10}{'p99_us':>10}{'p999_us':>10}{'max_us':>10}"]
+    for stage, ops in get_latency_summary().items():
+        for op, s in ops.items():
+            lines.append(f"{stage:<18}{op:<22}{s['count']:>8}{s['p50_us']:>10}{s['p99_us']:>10}{s['p999_us']:>10}"
+                         f"{s['max_us']:>10}")
+    return "\n".join(lines)
+
+
+def dump_latency_summary(path: str = None) -> None:
+    """
+    打印延迟统计，path 不为空时同时写入 JSON 文件，供退出时调用。
+    """
+    if not _histograms:
+        return
+    print(format_latency_summary())
+    if path:
+        with open(path, "w") as f:
+            json.dump(get_latency_summary(), f, indent=2)
+        logger.info(f"latency summary written to {path}")
+
+
+def reset_latency() -> None:
+    _histograms.clear()
+    _book_received_ns.clear()
+    _tracked_orders.clear()
@@ -73,6 +73,7 @@ class OrderState(Enum):
     LIVE = "live"
     PARTIALLY_FILLED = "partially_filled"
     FILLED = "filled"
+    MMP_CANCELED = "mmp_canceled"
 
 
 class ListEnumMeta(EnumMeta):
@@ -86,7 +87,7 @@ class OrderOp(Enum, metaclass=ListEnumMeta):
     CANCEL = "cancel-order"
     BATCH_CANCEL = "batch-cancel-orders"
     AMEND = "amend-order"
-    BATCH_AMEND = "batch-amend-order"
+    BATCH_AMEND = "batch-amend-orders"
 
 
 class TdMode(Enum, metaclass=ListEnumMeta):
@@ -0,0 +1,19 @@
+from typing import List
+
+# 这个文件提供行情快照的发布函数
+# REST 行情在事件循环之外生成新的 Tickers / MarkPxCache 快照，通过一次引用替换发布到全局容器；
+# 读取方取 container[0] 后得到的对象不会再被修改，无需加锁或复制。每个容器同一时间只应有一个写入方。
+
+
+def publish_snapshot(container: List, snapshot) -> None:
+    """
+    将新快照发布到容器，替换 container[0]。
+
+    Args:
+        container (List): 全局容器，如 tickers_container、mark_px_container。
+        snapshot: 新的快照对象。
+    """
+    if container:
+        container[0] = snapshot
+    else:
+        container.append(snapshot)
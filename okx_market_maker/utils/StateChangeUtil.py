@@ -0,0 +1,16 @@
+from okx_market_maker import state_change_listeners
+
+# 这个文件提供行情、订单、持仓状态变化的通知函数
+# WebSocket 回调在数据写入缓存后调用 notify_state_change，事件驱动模式下的策略据此被唤醒。
+
+
+def notify_state_change(channel: str, key: str = "") -> None:
+    """
+    通知所有监听者某个频道的数据已更新。
+
+    Args:
+        channel (str): 频道，如 "books"、"orders"、"account"、"positions"。
+        key (str): 具体的对象，订单簿为 instId，其他频道为空。
+    """
+    for listener in state_change_listeners:
+        listener(channel, key)
@@ -0,0 +1,173 @@
+import json
+import logging
+from typing import Callable, Collection, Dict, Optional, Tuple, Union
+
+from okx_market_maker.config.settings import JSON_DECODER
+
+# 这个文件提供 WebSocket 推送消息的统一解码层
+# JSON 解码后端可插拔：优先使用已安装的 orjson / msgspec，否则退回标准库 json；
+# 使用 orjson / msgspec 时，完整解码前先从消息头部取出 event 与 arg.channel，订阅确认和不关心的频道无需完整解码即可丢弃。
+
+logger = logging.getLogger(__name__)
+
+# 消息头部（"data" 字段之前）中的字段前缀，OKX 推送为紧凑 JSON
+_EVENT_KEY = '"event":"'
+_CHANNEL_KEY = '"channel":"'
+_OP_KEY = '"op":"'
+_DATA_KEY = '"data"'
+# 数据推送以 arg.channel 开头，读出频道只需一次前缀比较，无需查找 "data"
+_ARG_CHANNEL_PREFIX = '{"arg":{"channel":"'
+_ARG_CHANNEL_PREFIX_BYTES = _ARG_CHANNEL_PREFIX.encode()
+
+
+def _load_backend(name: str) -> Tuple[str, Callable, Tuple[type, ...]]:
+    """
+    按名称加载 JSON 解码后端。
+
+    Args:
+        name (str): "auto"、"orjson"、"msgspec" 或 "json"。"auto" 依次尝试 orjson、msgspec、json。
+    Returns:
+        Tuple[str, Callable, Tuple[type, ...]]: 实际使用的后端名称、解码函数以及解码失败时抛出的异常类型。
+    """
+    if name in ("auto", "orjson"):
+        try:
+            import orjson
+            return "orjson", orjson.loads, (orjson.JSONDecodeError,)
+        except ImportError:
+            if name == "orjson":
+                logger.warning("orjson 未安装，使用标准库 json 解码")
+    if name in ("auto", "msgspec"):
+        try:
+            import msgspec
+            return "msgspec", msgspec.json.Decoder().decode, (msgspec.DecodeError,)
+        except ImportError:
+            if name == "msgspec":
+                logger.warning("msgspec 未安装，使用标准库 json 解码")
+    return "json", json.loads, (json.JSONDecodeError,)
+
+
+_backend_name, _loads, _decode_errors = _load_backend(JSON_DECODER)
+# 标准库 json 下预先查找头部字段的开销超过它在丢弃消息上省下的时间，直接完整解码
+_peek_before_decode = _backend_name != "json"
+
+
+def set_json_backend(name: str) -> str:
+    """
+    切换 JSON 解码后端。
+
+    Args:
+        name (str): "auto"、"orjson"、"msgspec" 或 "json"。
+    Returns:
+        str: 实际使用的后端名称。
+    """
+    global _backend_name, _loads, _decode_errors, _peek_before_decode
+    _backend_name, _loads, _decode_errors = _load_backend(name)
+    _peek_before_decode = _backend_name != "json"
+    return _backend_name
+
+
+def get_json_backend() -> str:
+    """
+    返回当前使用的 JSON 解码后端名称。
+    """
+    return _backend_name
+
+
+def loads(raw: Union[str, bytes]):
+    """
+    使用当前后端解码 JSON。
+    """
+    return _loads(raw)
+
+
+def _peek_field(head: str, key: str) -> Optional[str]:
+    i = head.find(key)
+    if i < 0:
+        return None
+    i += len(key)
+    j = head.find('"', i)
+    return head[i:j] if j >= 0 else None
+
+
+def peek_event_and_channel(raw: Union[str, bytes]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    不做完整解码，从消息头部（"data" 之前）取出 event 与 arg.channel。
+
+    Args:
+        raw (str | bytes): 原始 WebSocket 消息。
+    Returns:
+        Tuple[Optional[str], Optional[str]]: (event, channel)，头部中不存在的字段为 None。
+    """
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode()
+    end = raw.find(_DATA_KEY)
+    head = raw if end < 0 else raw[:end]
+    return _peek_field(head, _EVENT_KEY), _peek_field(head, _CHANNEL_KEY)
+
+
+def peek_op(raw: Union[str, bytes]) -> Optional[str]:
+    """
+    不做完整解码，从消息头部取出下单 / 改单 / 撤单响应的 op，数据推送与 event 消息返回 None。
+
+    Args:
+        raw (str | bytes): 原始 WebSocket 消息。
+    Returns:
+        Optional[str]: op，如 "batch-orders"。
+    """
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode()
+    end = raw.find(_DATA_KEY)
+    return _peek_field(raw if end < 0 else raw[:end], _OP_KEY)
+
+
+def _leading_channel(raw: Union[str, bytes]) -> Optional[str]:
+    """
+    消息以 {"arg":{"channel":" 开头时返回该频道，否则返回 None。
+    """
+    if isinstance(raw, str):
+        if not raw.startswith(_ARG_CHANNEL_PREFIX):
+            return None
+        start = len(_ARG_CHANNEL_PREFIX)
+        end = raw.find('"', start)
+        return raw[start:end] if end >= 0 else None
+    if not raw.startswith(_ARG_CHANNEL_PREFIX_BYTES):
+        return None
+    start = len(_ARG_CHANNEL_PREFIX_BYTES)
+    end = raw.find(b'"', start)
+    return raw[start:end].decode() if end >= 0 else None
+
+
+def decode_message(message: Union[str, bytes, Dict], channels: Collection[str]) -> Optional[Dict]:
+    """
+    解码 WebSocket 消息，只返回 channels 中频道的数据推送。
+    event 消息（subscribe / unsubscribe / error 等）与其他频道的消息在完整解码前即被丢弃；
+    以 {"arg":{"channel":" 开头的数据推送只做一次前缀比较，关心的频道直接完整解码；
+    头部不是紧凑格式、无法确定频道时，退回完整解码后再判断。使用标准库 json 时不做预先查找，与完整解码后判断相同。
+
+    Args:
+        message (str | bytes | dict): WebSocket 消息。
+        channels (Collection[str]): 需要处理的频道。
+    Returns:
+        Optional[Dict]: 解码后的消息，需要丢弃时返回 None。
+    """
+    if isinstance(message, (str, bytes, bytearray)):
+        if _peek_before_decode:
+            channel = _leading_channel(message)
+            if channel is None:
+                # 不以 arg.channel 开头的消息（event 等）才需要查找头部字段
+                event, channel = peek_event_and_channel(message)
+                if event is not None:
+                    return None
+            if channel is not None and channel not in channels:
+                return None
+        try:
+            message = _loads(message)
+        except _decode_errors:
+            logger.warning("非 JSON 消息：%s", message)
+            return None
+    if not isinstance(message, dict) or message.get("event"):
+        return None
+    arg = message.get("arg")
+    if not arg or arg.get("channel") not in channels:
+        return None
+    return message